@@ -0,0 +1,40 @@
+"""add_query_indexes
+
+Revision ID: 7c1e9a4b2d53
+Revises: 432e11afa4ba
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e9a4b2d53'
+down_revision = '432e11afa4ba'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Índices de pagos: rangos por fecha (dashboard, sumas mensuales/anuales)
+    # y último pago activo por miembro (membresías vencidas)
+    op.create_index('idx_pagos_fecha_pago', 'pagos', ['fecha_pago'])
+    op.create_index('idx_pagos_estado_fecha', 'pagos', ['estado', 'fecha_pago'])
+    op.create_index('idx_pagos_miembro_estado_fecha', 'pagos', ['id_miembro', 'estado', 'fecha_pago'])
+
+    # Índices de miembros: orden por fecha de registro y filtros por estado/tipo
+    op.create_index('idx_miembros_fecha_registro', 'miembros', ['fecha_registro'])
+    op.create_index('idx_miembros_estado_tipo', 'miembros', ['estado', 'tipo_membresia'])
+
+    # Índice de comprobantes: filtro y orden por fecha de emisión
+    op.create_index('idx_comprobantes_fecha_emision', 'comprobantes_pago', ['fecha_emision'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_comprobantes_fecha_emision', table_name='comprobantes_pago')
+    op.drop_index('idx_miembros_estado_tipo', table_name='miembros')
+    op.drop_index('idx_miembros_fecha_registro', table_name='miembros')
+    op.drop_index('idx_pagos_miembro_estado_fecha', table_name='pagos')
+    op.drop_index('idx_pagos_estado_fecha', table_name='pagos')
+    op.drop_index('idx_pagos_fecha_pago', table_name='pagos')
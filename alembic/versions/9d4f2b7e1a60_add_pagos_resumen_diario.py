@@ -0,0 +1,43 @@
+"""add_pagos_resumen_diario
+
+Revision ID: 9d4f2b7e1a60
+Revises: 7c1e9a4b2d53
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4f2b7e1a60'
+down_revision = '7c1e9a4b2d53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Crear tabla pagos_resumen_diario
+    op.create_table('pagos_resumen_diario',
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('id_metodo_pago', sa.Integer(), nullable=False),
+        sa.Column('tipo_membresia', sa.String(length=20), nullable=False),
+        sa.Column('cantidad', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['id_metodo_pago'], ['metodos_pago.id_metodo_pago'], ),
+        sa.PrimaryKeyConstraint('fecha', 'id_metodo_pago', 'tipo_membresia')
+    )
+
+    # Cargar el resumen con el historial de pagos activos
+    op.execute("""
+        INSERT INTO pagos_resumen_diario (fecha, id_metodo_pago, tipo_membresia, cantidad, total)
+        SELECT DATE(p.fecha_pago), p.id_metodo_pago, m.tipo_membresia, COUNT(p.id_pago), SUM(p.monto)
+        FROM pagos p
+        JOIN miembros m ON m.id_miembro = p.id_miembro
+        WHERE p.estado = 1
+        GROUP BY DATE(p.fecha_pago), p.id_metodo_pago, m.tipo_membresia
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('pagos_resumen_diario')
@@ -0,0 +1,34 @@
+"""add_backup_manifest
+
+Revision ID: a2d6e8f1c4b7
+Revises: f7c2a9d4e1b8
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2d6e8f1c4b7'
+down_revision = 'f7c2a9d4e1b8'
+branch_labels = None
+depends_on = None
+
+
+def _has_backups_table() -> bool:
+    # La tabla backups la crea la aplicación con create_all, no la migración inicial
+    return 'backups' in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade() -> None:
+    if not _has_backups_table():
+        return
+    # Manifiesto de integridad: SHA-256 del archivo y filas/hashes por tabla
+    op.add_column('backups', sa.Column('manifest', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    if not _has_backups_table():
+        return
+    op.drop_column('backups', 'manifest')
@@ -0,0 +1,38 @@
+"""add_backup_compression
+
+Revision ID: b3e8d5c0f217
+Revises: 9d4f2b7e1a60
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e8d5c0f217'
+down_revision = '9d4f2b7e1a60'
+branch_labels = None
+depends_on = None
+
+
+def _has_backups_table() -> bool:
+    # La tabla backups la crea la aplicación con create_all, no la migración inicial
+    return 'backups' in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade() -> None:
+    if not _has_backups_table():
+        return
+    # Tamaño sin comprimir y códec de compresión de cada backup
+    op.add_column('backups', sa.Column('uncompressed_size_mb', sa.Float(), nullable=True))
+    op.add_column('backups', sa.Column('compression', sa.String(length=10), nullable=False, server_default='none'))
+    # Los backups existentes son .sql sin comprimir
+    op.execute("UPDATE backups SET uncompressed_size_mb = size_mb")
+
+
+def downgrade() -> None:
+    if not _has_backups_table():
+        return
+    op.drop_column('backups', 'compression')
+    op.drop_column('backups', 'uncompressed_size_mb')
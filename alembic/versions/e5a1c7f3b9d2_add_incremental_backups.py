@@ -0,0 +1,42 @@
+"""add_incremental_backups
+
+Revision ID: e5a1c7f3b9d2
+Revises: b3e8d5c0f217
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a1c7f3b9d2'
+down_revision = 'b3e8d5c0f217'
+branch_labels = None
+depends_on = None
+
+
+def _has_backups_table() -> bool:
+    # La tabla backups la crea la aplicación con create_all, no la migración inicial
+    return 'backups' in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade() -> None:
+    if not _has_backups_table():
+        return
+    # Tipo de backup, backup base de un incremental y marcas de agua por tabla
+    op.add_column('backups', sa.Column('backup_type', sa.String(length=20), nullable=False, server_default='full'))
+    op.add_column('backups', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.add_column('backups', sa.Column('table_marks', sa.Text(), nullable=True))
+    op.create_foreign_key('fk_backups_parent', 'backups', 'backups', ['parent_id'], ['id'])
+    op.create_check_constraint('check_backup_type', 'backups', "backup_type IN ('full', 'incremental')")
+
+
+def downgrade() -> None:
+    if not _has_backups_table():
+        return
+    op.drop_constraint('check_backup_type', 'backups', type_='check')
+    op.drop_constraint('fk_backups_parent', 'backups', type_='foreignkey')
+    op.drop_column('backups', 'table_marks')
+    op.drop_column('backups', 'parent_id')
+    op.drop_column('backups', 'backup_type')
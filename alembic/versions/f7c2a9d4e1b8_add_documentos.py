@@ -0,0 +1,86 @@
+"""add_documentos
+
+Revision ID: f7c2a9d4e1b8
+Revises: e5a1c7f3b9d2
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7c2a9d4e1b8'
+down_revision = 'e5a1c7f3b9d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # La aplicación puede haber creado la tabla con create_all antes de migrar
+    if 'documentos' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table('documentos',
+            sa.Column('id_documento', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('hash', sa.String(length=64), nullable=False),
+            sa.Column('contenido', sa.LargeBinary(length=16777216), nullable=False),
+            sa.Column('compresion', sa.String(length=10), nullable=False),
+            sa.Column('tamano', sa.Integer(), nullable=False),
+            sa.Column('referencias', sa.Integer(), nullable=False),
+            sa.Column('fecha_creacion', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id_documento'),
+            sa.UniqueConstraint('hash')
+        )
+
+    # Comprobantes y rutinas guardan el hash del documento; el contenido en
+    # línea queda para las filas anteriores (DocumentStore.migrate_inline_documents las mueve)
+    op.add_column('comprobantes_pago', sa.Column('hash_contenido', sa.String(length=64), nullable=True))
+    op.alter_column('comprobantes_pago', 'contenido', existing_type=sa.LargeBinary(), nullable=True)
+    op.create_index('idx_comprobantes_hash_contenido', 'comprobantes_pago', ['hash_contenido'], unique=False)
+    op.create_foreign_key('fk_comprobantes_documento', 'comprobantes_pago', 'documentos', ['hash_contenido'], ['hash'])
+
+    op.add_column('rutinas', sa.Column('hash_documento', sa.String(length=64), nullable=True))
+    op.create_index('ix_rutinas_hash_documento', 'rutinas', ['hash_documento'], unique=False)
+    op.create_foreign_key('fk_rutinas_documento', 'rutinas', 'documentos', ['hash_documento'], ['hash'])
+
+
+def _restore_inline_documents(bind, table_name, inline, hash_column) -> None:
+    """Copia el contenido descomprimido de cada documento a la columna en línea de las filas que lo usan"""
+    table = sa.table(table_name, sa.column(inline, sa.LargeBinary()), sa.column(hash_column, sa.String()))
+    documents = sa.table('documentos', sa.column('hash', sa.String()),
+                         sa.column('contenido', sa.LargeBinary()), sa.column('compresion', sa.String()))
+
+    digests = bind.execute(
+        sa.select(table.c[hash_column]).where(table.c[hash_column].isnot(None)).distinct()
+    ).scalars().all()
+    # Un documento por vez para no cargar todo el almacén en memoria
+    for digest in digests:
+        row = bind.execute(
+            sa.select(documents.c.contenido, documents.c.compresion).where(documents.c.hash == digest)
+        ).first()
+        if row is None:
+            raise RuntimeError(f"No se puede revertir: {table_name} referencia el documento {digest}, que no existe")
+        data = zlib.decompress(row.contenido) if row.compresion == 'zlib' else row.contenido
+        bind.execute(sa.update(table).where(table.c[hash_column] == digest).values({inline: data}))
+
+
+def downgrade() -> None:
+    # Los documentos vuelven a las columnas en línea antes de borrar el almacén
+    bind = op.get_bind()
+    _restore_inline_documents(bind, 'comprobantes_pago', 'contenido', 'hash_contenido')
+    _restore_inline_documents(bind, 'rutinas', 'documento_rutina', 'hash_documento')
+    missing = bind.execute(sa.text("SELECT COUNT(*) FROM comprobantes_pago WHERE contenido IS NULL")).scalar()
+    if missing:
+        raise RuntimeError(f"No se puede revertir: {missing} comprobantes no tienen contenido para la columna en línea")
+
+    op.drop_constraint('fk_rutinas_documento', 'rutinas', type_='foreignkey')
+    op.drop_index('ix_rutinas_hash_documento', table_name='rutinas')
+    op.drop_column('rutinas', 'hash_documento')
+
+    op.drop_constraint('fk_comprobantes_documento', 'comprobantes_pago', type_='foreignkey')
+    op.drop_index('idx_comprobantes_hash_contenido', table_name='comprobantes_pago')
+    op.alter_column('comprobantes_pago', 'contenido', existing_type=sa.LargeBinary(), nullable=False)
+    op.drop_column('comprobantes_pago', 'hash_contenido')
+
+    op.drop_table('documentos')
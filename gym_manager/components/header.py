@@ -1,5 +1,12 @@
 import flet as ft
 
+def _format_section_title(section_title: str = None) -> str:
+    return f"  |  {section_title}" if section_title else ""
+
+def set_header_title(header: ft.Container, section_title: str = None):
+    """Cambia el título de sección de un header ya creado (sin reconstruirlo)"""
+    header.content.controls[0].controls[2].value = _format_section_title(section_title)
+
 def create_header(page: ft.Page, user_name: str, user_role: str, on_logout=None, section_title: str = None):
     return ft.Container(
         content=ft.Row(
@@ -19,7 +26,7 @@ def create_header(page: ft.Page, user_name: str, user_role: str, on_logout=None,
                             color=ft.colors.WHITE,
                         ),
                         ft.Text(
-                            f"  |  {section_title}" if section_title else "",
+                            _format_section_title(section_title),
                             size=24,
                             weight=ft.FontWeight.BOLD,
                             color=ft.colors.WHITE,
@@ -1,12 +1,12 @@
-from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
 from gym_manager.config import DATABASE_URL
+from gym_manager.utils.engines import get_engine
 
 db_url = DATABASE_URL
 print("Intentando conectar a:", db_url)
 
 try:
-    engine = create_engine(db_url, pool_recycle=3600, pool_pre_ping=True)
+    engine = get_engine(db_url)
     with engine.connect() as conn:
         print("¡Conexión exitosa!")
 except SQLAlchemyError as e:
@@ -12,4 +12,14 @@ DB_NAME = "gym_manager"
 DB_USER = "root"
 DB_PASSWORD = "root"  # Cambiar por tu contraseña de MySQL
 
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}" 
\ No newline at end of file
+DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}" 
+
+# Pool de conexiones compartido por toda la aplicación (ver utils/engines.py):
+# una sola instancia abre como máximo DB_POOL_SIZE + DB_MAX_OVERFLOW conexiones
+DB_POOL_SIZE = 5
+DB_MAX_OVERFLOW = 10
+DB_POOL_TIMEOUT = 30  # segundos de espera por una conexión libre
+DB_POOL_RECYCLE = 3600  # reciclar conexiones cada hora
+
+# Registro de depuración (sesiones, autenticación, vistas): GYM_MANAGER_DEBUG=1 lo activa
+DEBUG_LOGGING = os.getenv('GYM_MANAGER_DEBUG', '') == '1'
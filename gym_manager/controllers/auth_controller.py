@@ -1,45 +1,44 @@
+import logging
 from sqlalchemy.orm import Session
 from gym_manager.models.user import Usuario
+from gym_manager.utils.log import get_logger
+from gym_manager.utils.startup import wait_for_schema, schema_error
 import bcrypt
 
+log = get_logger(__name__)
+
 class AuthController:
     def __init__(self, db_session: Session):
         self.db_session = db_session
 
     def authenticate_user(self, nombre: str, contraseña: str) -> tuple[bool, str]:
         try:
-            print(f"Intentando autenticar usuario: {nombre}")
-            
-            # Primero verificamos si podemos hacer una consulta simple
-            total_users = self.db_session.query(Usuario).count()
-            print(f"Total de usuarios en la base de datos: {total_users}")
-            
-            # Hacemos la consulta y mostramos los resultados
+            log.event(logging.DEBUG, 'auth.attempt', user=nombre)
+
+            # El esquema se prepara en segundo plano al arrancar (ver utils/startup.py)
+            if not wait_for_schema():
+                log.event(logging.ERROR, 'auth.schema_unavailable', error=str(schema_error()))
+                return False, ""
+
             user = self.db_session.query(Usuario).filter(
                 Usuario.nombre == nombre,
                 Usuario.estado == True
             ).first()
-            
-            print(f"Resultado de la consulta: {user}")
-            
+
             if user:
-                print(f"Usuario encontrado: ID={user.id_usuario}, Nombre={user.nombre}, Rol={user.rol}")
-                print(f"Contraseña ingresada: {contraseña}")
-                print(f"Contraseña en BD: {user.contraseña}")
-                
                 # Verificar la contraseña usando bcrypt
                 if bcrypt.checkpw(contraseña.encode('utf-8'), user.contraseña.encode('utf-8')):
-                    print("¡Contraseña correcta!")
+                    log.event(logging.INFO, 'auth.success', user=nombre, user_id=user.id_usuario, rol=user.rol)
                     return True, user.rol
-                else:
-                    print("Contraseña incorrecta")
+                log.event(logging.INFO, 'auth.failure', user=nombre, reason='password')
             else:
-                print("Usuario no encontrado")
-                
+                log.event(logging.INFO, 'auth.failure', user=nombre, reason='unknown_user')
+
             return False, ""
-            
+
         except Exception as e:
-            print(f"Error en autenticación: {e}")
-            import traceback
-            print(traceback.format_exc())
-            return False, "" 
\ No newline at end of file
+            log.event(logging.ERROR, 'auth.error', exc_info=True, user=nombre, error=str(e))
+            return False, ""
+        finally:
+            # La sesión solo se usa durante el intento (una UnitOfWork la vuelve a abrir en el siguiente)
+            self.db_session.close()
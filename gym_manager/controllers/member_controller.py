@@ -1,5 +1,7 @@
 from gym_manager.models.member import Miembro
 from gym_manager.models.payment import Pago
+from gym_manager.services.payment_rollup_service import PaymentRollupService
+from gym_manager.utils.keyset import keyset_paginate
 from datetime import datetime, timedelta
 from sqlalchemy import func, and_
 from sqlalchemy.exc import SQLAlchemyError
@@ -10,6 +12,31 @@ class MemberController:
         self.db_session = db_session
         self.logger = logging.getLogger(__name__)
 
+    def _apply_member_filters(self, query, filters):
+        """
+        Aplica los filtros de búsqueda comunes a una consulta de miembros
+        """
+        if not filters:
+            return query
+
+        if filters.get('search'):
+            search = f"%{filters['search']}%"
+            query = query.filter(
+                (Miembro.nombre.ilike(search)) |
+                (Miembro.apellido.ilike(search)) |
+                (Miembro.documento.ilike(search)) |
+                (Miembro.correo_electronico.ilike(search))
+            )
+        if filters.get('status') is not None:
+            query = query.filter(Miembro.estado == filters['status'])
+        if filters.get('membership_type'):
+            query = query.filter(Miembro.tipo_membresia == filters['membership_type'])
+        if filters.get('fecha_registro_desde'):
+            query = query.filter(Miembro.fecha_registro >= filters['fecha_registro_desde'])
+        if filters.get('fecha_registro_hasta'):
+            query = query.filter(Miembro.fecha_registro <= filters['fecha_registro_hasta'])
+        return query
+
     def get_members(self, filters=None):
         """
         Obtiene la lista de todos los miembros con filtros opcionales
@@ -18,22 +45,7 @@ class MemberController:
             query = self.db_session.query(Miembro)
             
             if filters:
-                if filters.get('search'):
-                    search = f"%{filters['search']}%"
-                    query = query.filter(
-                        (Miembro.nombre.ilike(search)) |
-                        (Miembro.apellido.ilike(search)) |
-                        (Miembro.documento.ilike(search)) |
-                        (Miembro.correo_electronico.ilike(search))
-                    )
-                if filters.get('status') is not None:
-                    query = query.filter(Miembro.estado == filters['status'])
-                if filters.get('membership_type'):
-                    query = query.filter(Miembro.tipo_membresia == filters['membership_type'])
-                if filters.get('fecha_registro_desde'):
-                    query = query.filter(Miembro.fecha_registro >= filters['fecha_registro_desde'])
-                if filters.get('fecha_registro_hasta'):
-                    query = query.filter(Miembro.fecha_registro <= filters['fecha_registro_hasta'])
+                query = self._apply_member_filters(query, filters)
                 
                 # Ordenamiento
                 if filters.get('order_by'):
@@ -45,14 +57,17 @@ class MemberController:
                             query = query.order_by(order_column.asc())
                 else:
                     # Ordenamiento por defecto: fecha de registro descendente (más recientes primero)
-                    query = query.order_by(Miembro.fecha_registro.desc())
+                    query = query.order_by(Miembro.fecha_registro.desc(), Miembro.id_miembro.desc())
                 
+                # Paginación en la base de datos
+                if filters.get('offset'):
+                    query = query.offset(filters['offset'])
                 # Límite de resultados
                 if filters.get('limit'):
                     query = query.limit(filters['limit'])
             else:
                 # Ordenamiento por defecto cuando no hay filtros: fecha de registro descendente
-                query = query.order_by(Miembro.fecha_registro.desc())
+                query = query.order_by(Miembro.fecha_registro.desc(), Miembro.id_miembro.desc())
             
             return query.all()
         except SQLAlchemyError as e:
@@ -60,6 +75,35 @@ class MemberController:
             self.db_session.rollback()
             raise Exception("Error al conectar con la base de datos. Por favor, intente nuevamente.")
 
+    def count_members(self, filters=None):
+        """
+        Cuenta los miembros que cumplen los filtros (sin cargar las filas)
+        """
+        try:
+            query = self.db_session.query(func.count(Miembro.id_miembro))
+            query = self._apply_member_filters(query, filters)
+            return query.scalar() or 0
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error al contar miembros: {str(e)}")
+            self.db_session.rollback()
+            raise Exception("Error al conectar con la base de datos. Por favor, intente nuevamente.")
+
+    def get_members_page(self, cursor=None, limit=20, filters=None):
+        """
+        Obtiene una página de miembros por cursor (keyset) en orden
+        (fecha_registro DESC, id_miembro DESC).
+
+        Returns:
+            dict: {'items': [...], 'next_cursor': str | None, 'prev_cursor': str | None}
+        """
+        try:
+            query = self._apply_member_filters(self.db_session.query(Miembro), filters)
+            return keyset_paginate(query, [Miembro.fecha_registro, Miembro.id_miembro], cursor, limit)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error de base de datos: {str(e)}")
+            self.db_session.rollback()
+            raise Exception("Error al conectar con la base de datos. Por favor, intente nuevamente.")
+
     def get_member(self, member_id):
         """
         Obtiene un miembro por su ID
@@ -120,13 +164,21 @@ class MemberController:
             if not member:
                 return False, "Miembro no encontrado"
 
+            # Sin tipo de membresía en los datos se conserva el actual (la columna no admite NULL)
+            tipo_membresia = member_data.get('tipo_membresia')
+            if tipo_membresia is not None:
+                # Mantener el resumen diario de pagos alineado con el nuevo tipo de membresía
+                PaymentRollupService(self.db_session).move_member(
+                    member_id, member.tipo_membresia, tipo_membresia
+                )
+                member.tipo_membresia = tipo_membresia
+
             member.nombre = member_data['nombre']
             member.apellido = member_data['apellido']
             member.documento = member_data['documento']
             member.fecha_nacimiento = member_data['fecha_nacimiento']
             member.genero = member_data['genero']
             member.correo_electronico = member_data.get('correo_electronico')
-            member.tipo_membresia = member_data.get('tipo_membresia')
             member.direccion = member_data.get('direccion')
             member.telefono = member_data.get('telefono')
             member.informacion_medica = member_data.get('informacion_medica')
@@ -179,6 +231,20 @@ class MemberController:
             self.logger.error(f"Error al contar miembros activos: {str(e)}")
             return 0
 
+    def get_new_members_count(self, start, end):
+        """
+        Obtiene el conteo de miembros registrados en el rango [start, end)
+        """
+        try:
+            count = self.db_session.query(func.count(Miembro.id_miembro)).filter(
+                Miembro.fecha_registro >= start,
+                Miembro.fecha_registro < end
+            ).scalar()
+            return count or 0
+        except Exception as e:
+            self.logger.error(f"Error al contar miembros nuevos: {str(e)}")
+            return 0
+
     def get_expired_memberships_count(self):
         """
         Obtiene el conteo de membresías vencidas (último pago hace más de 30 días)
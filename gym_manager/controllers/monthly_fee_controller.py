@@ -1,19 +1,36 @@
+from dataclasses import dataclass
 from datetime import datetime
 from gym_manager.models.monthly_fee import CuotaMensual
 from sqlalchemy.orm import Session
+from gym_manager.utils.cache import query_cache
 from gym_manager.utils.database import session_scope
 from sqlalchemy.exc import DBAPIError, PendingRollbackError
 
+@dataclass(frozen=True)
+class CuotaVigente:
+    """Datos de la cuota mensual activa (independiente de la sesión)"""
+    id_cuota: int
+    monto: float
+    fecha_actualizacion: datetime
+
 class MonthlyFeeController:
     def __init__(self, db_session: Session):
         self.db_session = db_session
 
+    def _load_current_fee(self):
+        fee = self.db_session.query(CuotaMensual).filter_by(activo=1).first()
+        if not fee:
+            return None
+        return CuotaVigente(fee.id_cuota, fee.monto, fee.fecha_actualizacion)
+
     def get_current_fee(self):
         """
-        Obtiene la cuota mensual actual
+        Obtiene la cuota mensual actual (en cache hasta que se modifique la tabla)
         """
         try:
-            return self.db_session.query(CuotaMensual).filter_by(activo=1).first()
+            return query_cache.get_or_load(
+                "monthly_fee.current", self._load_current_fee, tags=('cuota_mensual',), ttl=3600
+            )
         except (DBAPIError, PendingRollbackError):
             self.db_session.rollback()
             return self.get_current_fee()
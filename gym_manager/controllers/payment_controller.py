@@ -3,69 +3,132 @@ from gym_manager.models.payment import Pago
 from gym_manager.models.member import Miembro
 from gym_manager.models.payment_method import MetodoPago
 from gym_manager.models.payment_receipt import ComprobantePago
+from gym_manager.services.document_store import DocumentStore
+from gym_manager.services.payment_rollup_service import PaymentRollupService
 from gym_manager.utils.database import session_scope
+from gym_manager.utils.keyset import keyset_paginate
+from gym_manager.utils.date_ranges import day_range, month_range, year_range
 from sqlalchemy.exc import DBAPIError, PendingRollbackError
-from sqlalchemy import func, extract
+from sqlalchemy import func
 from sqlalchemy.orm import joinedload
 
 class PaymentController:
     def __init__(self, db_session=None):
         self.db_session = db_session
 
+    def _apply_payment_filters(self, query, filters):
+        """
+        Aplica los filtros de búsqueda comunes a una consulta de pagos
+        """
+        if not filters:
+            return query
+
+        if filters.get('member_name') or filters.get('membership_type'):
+            query = query.join(Miembro, Pago.id_miembro == Miembro.id_miembro)
+            if filters.get('member_name'):
+                query = query.filter(Miembro.nombre.ilike(f"%{filters['member_name']}%"))
+            if filters.get('membership_type'):
+                query = query.filter(Miembro.tipo_membresia == filters['membership_type'])
+        if filters.get('date_from'):
+            query = query.filter(Pago.fecha_pago >= filters['date_from'])
+        if filters.get('date_to'):
+            query = query.filter(Pago.fecha_pago <= filters['date_to'])
+        if filters.get('estado') is not None:
+            query = query.filter(Pago.estado == bool(filters['estado']))
+        if filters.get('payment_method'):
+            query = query.join(MetodoPago, Pago.id_metodo_pago == MetodoPago.id_metodo_pago).filter(
+                MetodoPago.descripcion == filters['payment_method']
+            )
+        return query
+
+    def _read_with_retry(self, load):
+        """
+        Ejecuta una consulta de solo lectura. Ante un error de conexión hace
+        rollback y la reintenta una sola vez; si vuelve a fallar, o ante
+        cualquier otro error, hace rollback y propaga la excepción.
+        """
+        for attempt in range(2):
+            try:
+                return load()
+            except (DBAPIError, PendingRollbackError):
+                self.db_session.rollback()
+                if attempt:
+                    raise
+            except Exception:
+                self.db_session.rollback()
+                raise
+
     def get_payments(self, filters=None):
         """
         Obtiene la lista de pagos con filtros opcionales
         """
-        try:
-            # Cargar eagerly las relaciones necesarias para evitar DetachedInstanceError
-            query = self.db_session.query(Pago).options(
-                joinedload(Pago.miembro),
-                joinedload(Pago.metodo_pago)
-            )
+        return self._read_with_retry(lambda: self._query_payments(filters))
+
+    def _query_payments(self, filters):
+        """Consulta de get_payments: pagos filtrados y ordenados"""
+        # Cargar eagerly las relaciones necesarias para evitar DetachedInstanceError
+        query = self.db_session.query(Pago).options(
+            joinedload(Pago.miembro),
+            joinedload(Pago.metodo_pago)
+        )
+        
+        if filters:
+            query = self._apply_payment_filters(query, filters)
             
-            if filters:
-                if filters.get('member_name'):
-                    query = query.join(Miembro).filter(
-                        Miembro.nombre.ilike(f"%{filters['member_name']}%")
-                    )
-                if filters.get('date_from'):
-                    query = query.filter(Pago.fecha_pago >= filters['date_from'])
-                if filters.get('date_to'):
-                    query = query.filter(Pago.fecha_pago <= filters['date_to'])
-                if filters.get('payment_method'):
-                    query = query.join(MetodoPago).filter(
-                        MetodoPago.descripcion == filters['payment_method']
-                    )
-                
-                # Ordenamiento
-                if filters.get('order_by'):
-                    order_column = getattr(Pago, filters['order_by'], None)
-                    if order_column is not None:
-                        if filters.get('order_direction') == 'desc':
-                            query = query.order_by(order_column.desc())
-                        else:
-                            query = query.order_by(order_column.asc())
-                else:
-                    # Ordenamiento por defecto: fecha de pago descendente (más reciente primero)
-                    # Usar ID como criterio de desempate para mantener orden consistente
-                    query = query.order_by(Pago.fecha_pago.desc(), Pago.id_pago.desc())
-                
-                # Límite de resultados
-                if filters.get('limit'):
-                    query = query.limit(filters['limit'])
+            # Ordenamiento
+            if filters.get('order_by'):
+                order_column = getattr(Pago, filters['order_by'], None)
+                if order_column is not None:
+                    if filters.get('order_direction') == 'desc':
+                        query = query.order_by(order_column.desc())
+                    else:
+                        query = query.order_by(order_column.asc())
             else:
-                # Si no hay filtros, aplicar ordenamiento por defecto
+                # Ordenamiento por defecto: fecha de pago descendente (más reciente primero)
                 # Usar ID como criterio de desempate para mantener orden consistente
                 query = query.order_by(Pago.fecha_pago.desc(), Pago.id_pago.desc())
             
-            return query.all()
-        except (DBAPIError, PendingRollbackError):
-            # Si hay un error de conexión, hacer rollback y reintentar
-            self.db_session.rollback()
-            return self.get_payments(filters)
-        except Exception as e:
-            self.db_session.rollback()
-            raise
+            # Paginación en la base de datos
+            if filters.get('offset'):
+                query = query.offset(filters['offset'])
+            # Límite de resultados
+            if filters.get('limit'):
+                query = query.limit(filters['limit'])
+        else:
+            # Si no hay filtros, aplicar ordenamiento por defecto
+            # Usar ID como criterio de desempate para mantener orden consistente
+            query = query.order_by(Pago.fecha_pago.desc(), Pago.id_pago.desc())
+        
+        return query.all()
+
+    def count_payments(self, filters=None):
+        """
+        Cuenta los pagos que cumplen los filtros (sin cargar las filas)
+        """
+        def load():
+            query = self.db_session.query(func.count(Pago.id_pago))
+            query = self._apply_payment_filters(query.select_from(Pago), filters)
+            return query.scalar() or 0
+
+        return self._read_with_retry(load)
+
+    def get_payments_page(self, cursor=None, limit=20, filters=None):
+        """
+        Obtiene una página de pagos por cursor (keyset) en orden
+        (fecha_pago DESC, id_pago DESC).
+
+        Returns:
+            dict: {'items': [...], 'next_cursor': str | None, 'prev_cursor': str | None}
+        """
+        def load():
+            query = self.db_session.query(Pago).options(
+                joinedload(Pago.miembro),
+                joinedload(Pago.metodo_pago)
+            )
+            query = self._apply_payment_filters(query, filters)
+            return keyset_paginate(query, [Pago.fecha_pago, Pago.id_pago], cursor, limit)
+
+        return self._read_with_retry(load)
 
     def create_payment(self, payment_data):
         """
@@ -84,6 +147,8 @@ class PaymentController:
                 )
                 session.add(new_payment)
                 session.flush()  # Esto asegura que se genere el ID
+                # Actualizar el resumen diario en la misma transacción
+                PaymentRollupService(session).add_payment(new_payment)
                 return True, {"message": "Pago registrado exitosamente", "id_pago": new_payment.id_pago}
         except Exception as e:
             return False, f"Error al crear el pago: {str(e)}"
@@ -98,8 +163,12 @@ class PaymentController:
                 if not payment:
                     return False, "Pago no encontrado"
                 
+                # Quitar el aporte anterior del resumen diario y sumar el nuevo
+                rollup = PaymentRollupService(session)
+                rollup.remove_payment(payment)
                 for key, value in payment_data.items():
                     setattr(payment, key, value)
+                rollup.add_payment(payment)
                 
                 return True, "Pago actualizado exitosamente"
         except Exception as e:
@@ -115,7 +184,11 @@ class PaymentController:
                 if not payment:
                     return False, "Pago no encontrado"
                 
+                PaymentRollupService(session).remove_payment(payment)
+                receipt_hash = payment.comprobante.hash_contenido if payment.comprobante else None
                 session.delete(payment)
+                # El comprobante se elimina en cascada: liberar su documento
+                DocumentStore(session).release(receipt_hash)
                 return True, "Pago eliminado exitosamente"
         except Exception as e:
             return False, f"Error al eliminar el pago: {str(e)}"
@@ -129,12 +202,11 @@ class PaymentController:
             pending_payments = self.db_session.query(Pago).filter_by(estado=False).count()
             
             # Obtener el total recaudado en el mes actual
-            current_month = datetime.now().month
-            current_year = datetime.now().year
-            monthly_total = self.db_session.query(Pago).filter(
-                extract('month', Pago.fecha_pago) == current_month,
-                extract('year', Pago.fecha_pago) == current_year
-            ).with_entities(func.sum(Pago.monto)).scalar() or 0
+            month_start, month_end = month_range()
+            monthly_total = self.db_session.query(func.sum(Pago.monto)).filter(
+                Pago.fecha_pago >= month_start,
+                Pago.fecha_pago < month_end
+            ).scalar() or 0
             
             return {
                 'total_payments': total_payments,
@@ -155,17 +227,14 @@ class PaymentController:
                 'monthly_total': 0
             }
 
-    def get_current_month_payments_sum(self):
+    def get_payments_sum(self, start, end):
         """
-        Obtiene la suma total de los pagos del mes actual
+        Obtiene la suma de los pagos activos en el rango [start, end)
         """
         try:
-            current_month = datetime.now().month
-            current_year = datetime.now().year
-            
             total = self.db_session.query(func.sum(Pago.monto)).filter(
-                extract('month', Pago.fecha_pago) == current_month,
-                extract('year', Pago.fecha_pago) == current_year,
+                Pago.fecha_pago >= start,
+                Pago.fecha_pago < end,
                 Pago.estado == True  # Solo pagos activos
             ).scalar() or 0
             
@@ -173,39 +242,56 @@ class PaymentController:
         except Exception:
             return 0
 
-    def get_current_year_payments_sum(self):
+    def _get_rollup_sum(self, start, end):
         """
-        Obtiene la suma total de los pagos del año actual
+        Obtiene la suma de pagos activos en [start, end) desde el resumen diario
         """
         try:
-            current_year = datetime.now().year
-            
-            total = self.db_session.query(func.sum(Pago.monto)).filter(
-                extract('year', Pago.fecha_pago) == current_year,
-                Pago.estado == True  # Solo pagos activos
-            ).scalar() or 0
-            
-            return total
+            return PaymentRollupService(self.db_session).sum_between(start, end)
         except Exception:
             return 0
 
+    def get_today_payments_sum(self):
+        """
+        Obtiene la suma total de los pagos de hoy
+        """
+        return self._get_rollup_sum(*day_range())
+
+    def get_current_month_payments_sum(self):
+        """
+        Obtiene la suma total de los pagos del mes actual
+        """
+        return self._get_rollup_sum(*month_range())
+
+    def get_current_year_payments_sum(self):
+        """
+        Obtiene la suma total de los pagos del año actual
+        """
+        return self._get_rollup_sum(*year_range())
+
     def save_payment_receipt(self, payment_id: int, pdf_content: bytes):
         """
-        Guarda el comprobante de pago en la base de datos
+        Guarda el comprobante de pago en la base de datos (el PDF va al
+        almacén de documentos y el comprobante guarda solo su hash)
         """
         try:
             with session_scope() as session:
+                store = DocumentStore(session)
+                content_hash = store.put(pdf_content)
                 # Verificar si ya existe un comprobante para este pago
                 existing_receipt = session.query(ComprobantePago).filter_by(id_pago=payment_id).first()
                 
                 if existing_receipt:
-                    # Actualizar el comprobante existente
-                    existing_receipt.contenido = pdf_content
+                    # Actualizar el comprobante existente y liberar el documento anterior
+                    previous_hash = existing_receipt.hash_contenido
+                    existing_receipt.hash_contenido = content_hash
+                    existing_receipt.contenido = None
                     existing_receipt.fecha_emision = datetime.now()
+                    store.release(previous_hash)
                 else:
                     # Crear nuevo comprobante
                     new_receipt = ComprobantePago(
-                        contenido=pdf_content,
+                        hash_contenido=content_hash,
                         fecha_emision=datetime.now(),
                         id_pago=payment_id
                     )
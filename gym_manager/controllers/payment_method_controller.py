@@ -1,8 +1,11 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
 from sqlalchemy.exc import DBAPIError, PendingRollbackError
 
+from gym_manager.models.member import Miembro
 from gym_manager.models.payment_method import MetodoPago
 from gym_manager.models.payment import Pago
+from gym_manager.utils.cache import query_cache
 from gym_manager.utils.database import session_scope
 
 class PaymentMethodController:
@@ -11,13 +14,22 @@ class PaymentMethodController:
 
     def get_payment_methods(self, filters=None):
         """
-        Obtiene la lista de métodos de pago con filtros opcionales
+        Obtiene la lista de métodos de pago con filtros opcionales, junto con
+        la cantidad de pagos, el total acumulado y el porcentaje sobre el total
+        de pagos (agregados en la base de datos con GROUP BY)
         """
         try:
             with session_scope() as session:
-                # Cargar explícitamente la relación pagos y sus relaciones
-                query = session.query(MetodoPago).options(
-                    joinedload(MetodoPago.pagos).joinedload(Pago.miembro)
+                total_general = select(func.count(Pago.id_pago)).scalar_subquery()
+                query = session.query(
+                    MetodoPago.id_metodo_pago,
+                    MetodoPago.descripcion,
+                    MetodoPago.estado,
+                    func.count(Pago.id_pago),
+                    func.coalesce(func.sum(Pago.monto), 0),
+                    total_general
+                ).outerjoin(
+                    Pago, Pago.id_metodo_pago == MetodoPago.id_metodo_pago
                 )
                 
                 if filters:
@@ -27,25 +39,20 @@ class PaymentMethodController:
                     if filters.get('status') is not None:
                         query = query.filter(MetodoPago.estado == filters['status'])
                 
-                # Obtener los métodos y asegurarse de que estén adjuntos a la sesión
-                methods = query.all()
+                rows = query.group_by(
+                    MetodoPago.id_metodo_pago, MetodoPago.descripcion, MetodoPago.estado
+                ).order_by(MetodoPago.id_metodo_pago).all()
                 
-                # Convertir los objetos a diccionarios para evitar problemas de sesión
+                # Convertir las filas a diccionarios para evitar problemas de sesión
                 result = []
-                for method in methods:
+                for id_metodo_pago, descripcion, estado, cantidad, total, total_general in rows:
                     result.append({
-                        'id_metodo_pago': method.id_metodo_pago,
-                        'descripcion': method.descripcion,
-                        'estado': method.estado,
-                        'pagos': [{
-                            'id_pago': pago.id_pago,
-                            'monto': pago.monto,
-                            'fecha_pago': pago.fecha_pago,
-                            'miembro': {
-                                'nombre': pago.miembro.nombre,
-                                'apellido': pago.miembro.apellido
-                            } if pago.miembro else None
-                        } for pago in method.pagos]
+                        'id_metodo_pago': id_metodo_pago,
+                        'descripcion': descripcion,
+                        'estado': estado,
+                        'cantidad_pagos': cantidad,
+                        'total_pagos': float(total or 0),
+                        'porcentaje': (cantidad / total_general * 100) if total_general else 0,
                     })
                 
                 return result
@@ -57,6 +64,58 @@ class PaymentMethodController:
                 pass
             raise Exception("Error al conectar con la base de datos. Por favor, intente nuevamente.")
 
+    def get_active_payment_methods(self):
+        """
+        Obtiene los métodos de pago activos (en cache hasta que se modifique la tabla)
+        """
+        def load():
+            with session_scope() as session:
+                methods = session.query(
+                    MetodoPago.id_metodo_pago, MetodoPago.descripcion
+                ).filter(
+                    MetodoPago.estado == True
+                ).order_by(MetodoPago.id_metodo_pago).all()
+                return [
+                    {'id_metodo_pago': id_metodo_pago, 'descripcion': descripcion}
+                    for id_metodo_pago, descripcion in methods
+                ]
+
+        return query_cache.get_or_load(
+            "payment_methods.active", load, tags=('metodos_pago',), ttl=3600
+        )
+
+    def get_recent_payments(self, method_id, limit=5):
+        """
+        Obtiene los últimos `limit` pagos realizados con un método de pago
+        """
+        try:
+            with session_scope() as session:
+                rows = session.query(
+                    Pago.id_pago,
+                    Pago.monto,
+                    Pago.fecha_pago,
+                    Miembro.nombre,
+                    Miembro.apellido
+                ).outerjoin(
+                    Miembro, Pago.id_miembro == Miembro.id_miembro
+                ).filter(
+                    Pago.id_metodo_pago == method_id
+                ).order_by(
+                    Pago.fecha_pago.desc(), Pago.id_pago.desc()
+                ).limit(limit).all()
+                
+                return [{
+                    'id_pago': id_pago,
+                    'monto': monto,
+                    'fecha_pago': fecha_pago,
+                    'miembro': {
+                        'nombre': nombre,
+                        'apellido': apellido
+                    } if nombre is not None else None
+                } for id_pago, monto, fecha_pago, nombre, apellido in rows]
+        except (DBAPIError, PendingRollbackError):
+            raise Exception("Error al conectar con la base de datos. Por favor, intente nuevamente.")
+
     def create_payment_method(self, payment_method_data):
         """
         Crea un nuevo método de pago
@@ -117,8 +176,11 @@ class PaymentMethodController:
                 if not method:
                     return False, "Método de pago no encontrado"
 
-                # Verificar si el método está en uso
-                if method.pagos:
+                # Verificar si el método está en uso (sin cargar los pagos)
+                in_use = session.query(Pago.id_pago).filter(
+                    Pago.id_metodo_pago == method_id
+                ).first() is not None
+                if in_use:
                     return False, "No se puede eliminar el método de pago porque está siendo utilizado en pagos existentes"
 
                 session.delete(method)
@@ -1,6 +1,11 @@
 import logging
 
+from sqlalchemy import func
+from sqlalchemy.orm import defer, joinedload
+
+from gym_manager.models.payment import Pago
 from gym_manager.models.payment_receipt import ComprobantePago
+from gym_manager.services.document_store import DocumentStore
 from gym_manager.utils.database import session_scope
 
 class PaymentReceiptController:
@@ -8,22 +13,38 @@ class PaymentReceiptController:
         self.db_session = db_session
         self.logger = logging.getLogger(__name__)
 
+    def _apply_receipt_filters(self, query, filters):
+        """
+        Aplica los filtros de búsqueda comunes a una consulta de comprobantes
+        """
+        if filters:
+            if filters.get('fecha_desde'):
+                query = query.filter(ComprobantePago.fecha_emision >= filters['fecha_desde'])
+            if filters.get('fecha_hasta'):
+                query = query.filter(ComprobantePago.fecha_emision <= filters['fecha_hasta'])
+        return query
+
     def get_receipts(self, filters=None):
         """
         Obtiene la lista de comprobantes con filtros opcionales
         """
         try:
             with session_scope() as session:
-                query = session.query(ComprobantePago).join(ComprobantePago.pago)
-                
-                if filters:
-                    if filters.get('fecha_desde'):
-                        query = query.filter(ComprobantePago.fecha_emision >= filters['fecha_desde'])
-                    if filters.get('fecha_hasta'):
-                        query = query.filter(ComprobantePago.fecha_emision <= filters['fecha_hasta'])
+                query = session.query(ComprobantePago).join(ComprobantePago.pago).options(
+                    defer(ComprobantePago.contenido),
+                    joinedload(ComprobantePago.pago).joinedload(Pago.miembro),
+                    joinedload(ComprobantePago.pago).joinedload(Pago.metodo_pago)
+                )
+                query = self._apply_receipt_filters(query, filters)
                 
                 # Ordenar por fecha de emisión descendente
-                query = query.order_by(ComprobantePago.fecha_emision.desc())
+                query = query.order_by(ComprobantePago.fecha_emision.desc(), ComprobantePago.id_comprobante.desc())
+
+                # Paginación en la base de datos
+                if filters and filters.get('offset'):
+                    query = query.offset(filters['offset'])
+                if filters and filters.get('limit'):
+                    query = query.limit(filters['limit'])
                 
                 receipts = query.all()
                 return [
@@ -41,16 +62,32 @@ class PaymentReceiptController:
             self.logger.error(f"Error al obtener comprobantes: {str(e)}")
             return []
 
+    def count_receipts(self, filters=None):
+        """
+        Cuenta los comprobantes que cumplen los filtros (sin cargar las filas)
+        """
+        try:
+            with session_scope() as session:
+                query = session.query(func.count(ComprobantePago.id_comprobante))
+                return self._apply_receipt_filters(query, filters).scalar() or 0
+        except Exception as e:
+            self.logger.error(f"Error al contar comprobantes: {str(e)}")
+            return 0
+
     def get_receipt_content(self, receipt_id):
         """
         Obtiene el contenido del comprobante
         """
         try:
             with session_scope() as session:
-                receipt = session.query(ComprobantePago).filter_by(id_comprobante=receipt_id).first()
-                if receipt:
-                    return receipt.contenido
-                return None
+                row = session.query(ComprobantePago.hash_contenido, ComprobantePago.contenido).filter_by(
+                    id_comprobante=receipt_id
+                ).first()
+                if row is None:
+                    return None
+                content_hash, inline_content = row
+                # Los comprobantes anteriores al almacén conservan el PDF en línea
+                return DocumentStore(session).get(content_hash) if content_hash else inline_content
         except Exception as e:
             self.logger.error(f"Error al obtener contenido del comprobante: {str(e)}")
             return None 
\ No newline at end of file
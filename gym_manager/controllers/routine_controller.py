@@ -1,40 +1,157 @@
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+from sqlalchemy import func, or_, select
 from sqlalchemy.exc import SQLAlchemyError
 import datetime
 
+from gym_manager.models.member import Miembro
 from gym_manager.models.routine import Rutina
-from gym_manager.utils.database import get_db_session
+from gym_manager.services.document_store import DocumentStore
+from gym_manager.utils.database import new_session
+
+# Tamaño de cada bloque al leer el documento de una rutina
+DOCUMENT_CHUNK_SIZE = 256 * 1024
+
+@dataclass(frozen=True)
+class RoutineSummary:
+    """Datos de una rutina para listados (sin el documento)"""
+    id_rutina: int
+    nombre: str
+    descripcion: Optional[str]
+    nivel_dificultad: str
+    fecha_creacion: Optional[datetime.datetime]
+    fecha_horario: Optional[datetime.datetime]
+    tiene_documento: bool
+    miembros_asignados: int
 
 class RoutineController:
     def __init__(self):
         pass  # Ya no se guarda una sesión
 
+    def _apply_routine_filters(self, query, filters):
+        """
+        Aplica los filtros de búsqueda comunes a una consulta de rutinas
+        """
+        if filters:
+            if filters.get('search'):
+                search = f"%{filters['search']}%"
+                query = query.filter(Rutina.nombre.ilike(search))
+
+            if filters.get('nivel_dificultad'):
+                query = query.filter(Rutina.nivel_dificultad == filters['nivel_dificultad'])
+        return query
+
+    def _summary_query(self, session):
+        """
+        Consulta de RoutineSummary: columnas livianas, si tiene documento y
+        cantidad de miembros asignados, sin leer el BLOB
+        """
+        miembros_asignados = select(func.count(Miembro.id_miembro)).where(
+            Miembro.id_rutina == Rutina.id_rutina
+        ).correlate(Rutina).scalar_subquery()
+        return session.query(
+            Rutina.id_rutina,
+            Rutina.nombre,
+            Rutina.descripcion,
+            Rutina.nivel_dificultad,
+            Rutina.fecha_creacion,
+            Rutina.fecha_horario,
+            or_(Rutina.hash_documento.isnot(None), Rutina.documento_rutina.isnot(None)),
+            miembros_asignados
+        )
+
     def get_routines(self, filters=None):
         """
-        Obtiene todas las rutinas, opcionalmente filtradas
+        Obtiene todas las rutinas (como RoutineSummary), opcionalmente filtradas
         """
-        session = get_db_session()
+        session = new_session()
         try:
-            query = session.query(Rutina)
+            query = self._apply_routine_filters(self._summary_query(session), filters)
 
-            if filters:
-                if filters.get('search'):
-                    search = f"%{filters['search']}%"
-                    query = query.filter(Rutina.nombre.ilike(search))
+            if filters and (filters.get('offset') or filters.get('limit')):
+                # Orden estable para paginar en la base de datos
+                query = query.order_by(Rutina.id_rutina)
+                if filters.get('offset'):
+                    query = query.offset(filters['offset'])
+                if filters.get('limit'):
+                    query = query.limit(filters['limit'])
 
-                if filters.get('nivel_dificultad'):
-                    query = query.filter(Rutina.nivel_dificultad == filters['nivel_dificultad'])
+            return [RoutineSummary(*row) for row in query.all()]
+        finally:
+            session.close()
 
-            return query.all()
+    def count_routines(self, filters=None):
+        """
+        Cuenta las rutinas que cumplen los filtros (sin cargar las filas)
+        """
+        session = new_session()
+        try:
+            query = self._apply_routine_filters(session.query(func.count(Rutina.id_rutina)), filters)
+            return query.scalar() or 0
         finally:
             session.close()
 
     def get_routine_by_id(self, routine_id: int):
         """
-        Obtiene una rutina por su ID
+        Obtiene una rutina (como RoutineSummary) por su ID
+        """
+        session = new_session()
+        try:
+            row = self._summary_query(session).filter(Rutina.id_rutina == routine_id).first()
+            return RoutineSummary(*row) if row else None
+        finally:
+            session.close()
+
+    def get_routine_document(self, routine_id: int) -> Optional[bytes]:
         """
-        session = get_db_session()
+        Obtiene el documento de una rutina desde el almacén de documentos
+        (o la columna en línea de las rutinas anteriores al almacén)
+        """
+        session = new_session()
         try:
-            return session.query(Rutina).filter(Rutina.id_rutina == routine_id).first()
+            document_hash = session.query(Rutina.hash_documento).filter(
+                Rutina.id_rutina == routine_id
+            ).scalar()
+            if document_hash:
+                return DocumentStore(session).get(document_hash)
+            return session.query(Rutina.documento_rutina).filter(
+                Rutina.id_rutina == routine_id
+            ).scalar()
+        finally:
+            session.close()
+
+    def write_routine_document(self, routine_id: int, target: BinaryIO,
+                               chunk_size: int = DOCUMENT_CHUNK_SIZE) -> int:
+        """
+        Escribe el documento de una rutina en `target` leyéndolo por bloques,
+        sin tener el archivo completo en memoria
+
+        Returns:
+            int: cantidad de bytes escritos
+        """
+        session = new_session()
+        try:
+            document_hash = session.query(Rutina.hash_documento).filter(
+                Rutina.id_rutina == routine_id
+            ).scalar()
+            if document_hash:
+                return DocumentStore(session).write_to(document_hash, target, chunk_size)
+
+            size = session.query(func.length(Rutina.documento_rutina)).filter(
+                Rutina.id_rutina == routine_id
+            ).scalar() or 0
+
+            written = 0
+            while written < size:
+                # SUBSTRING es 1-indexado
+                chunk = session.query(
+                    func.substring(Rutina.documento_rutina, written + 1, chunk_size)
+                ).filter(Rutina.id_rutina == routine_id).scalar()
+                if not chunk:
+                    break
+                target.write(chunk)
+                written += len(chunk)
+            return written
         finally:
             session.close()
 
@@ -42,7 +159,7 @@ class RoutineController:
         """
         Cuenta cuántos miembros tienen asignada una rutina específica por su ID.
         """
-        session = get_db_session()
+        session = new_session()
         try:
             from gym_manager.models.member import Miembro  # Importar Miembro aquí para evitar dependencia circular si la hay
             count = session.query(Miembro).filter(Miembro.id_rutina == routine_id).count()
@@ -56,7 +173,7 @@ class RoutineController:
         """
         Crea una nueva rutina
         """
-        session = get_db_session()
+        session = new_session()
         try:
             # Solo tomar los campos válidos
             valid_fields = ['nombre', 'descripcion', 'documento_rutina', 'nivel_dificultad', 'fecha_creacion', 'fecha_horario', 'id_miembro']
@@ -75,6 +192,10 @@ class RoutineController:
                     return False, f"El archivo es demasiado grande. Máximo permitido: 1MB. Tu archivo: {file_size / (1024*1024):.1f}MB"
             
             filtered_data = {k: v for k, v in routine_data.items() if k in valid_fields}
+            # El documento se guarda en el almacén y la rutina solo su hash
+            document = filtered_data.pop('documento_rutina', None)
+            if document:
+                filtered_data['hash_documento'] = DocumentStore(session).put(document)
             routine = Rutina(**filtered_data)
             session.add(routine)
             session.commit()
@@ -89,7 +210,7 @@ class RoutineController:
         """
         Actualiza una rutina existente
         """
-        session = get_db_session()
+        session = new_session()
         try:
             routine = session.query(Rutina).filter(Rutina.id_rutina == routine_id).first()
             if not routine:
@@ -102,9 +223,21 @@ class RoutineController:
                 if file_size > MAX_FILE_SIZE:
                     return False, f"El archivo es demasiado grande. Máximo permitido: 1MB. Tu archivo: {file_size / (1024*1024):.1f}MB"
 
+            routine_data = dict(routine_data)
+            previous_hash = None
+            if 'documento_rutina' in routine_data:
+                # Reemplazar el documento: el nuevo va al almacén y se libera el anterior
+                document = routine_data.pop('documento_rutina')
+                store = DocumentStore(session)
+                previous_hash = routine.hash_documento
+                routine.hash_documento = store.put(document) if document else None
+                routine.documento_rutina = None
+
             for key, value in routine_data.items():
                 setattr(routine, key, value)
 
+            if previous_hash:
+                store.release(previous_hash)
             session.commit()
             return True, "Rutina actualizada exitosamente"
         except Exception as e:
@@ -117,13 +250,15 @@ class RoutineController:
         """
         Elimina una rutina
         """
-        session = get_db_session()
+        session = new_session()
         try:
             routine = session.query(Rutina).filter(Rutina.id_rutina == routine_id).first()
             if not routine:
                 return False, "Rutina no encontrada"
 
+            document_hash = routine.hash_documento
             session.delete(routine)
+            DocumentStore(session).release(document_hash)
             session.commit()
             return True, "Rutina eliminada exitosamente"
         except Exception as e:
@@ -2,24 +2,42 @@ import flet as ft
 from datetime import datetime
 from gym_manager.controllers.member_controller import MemberController
 from gym_manager.controllers.payment_controller import PaymentController
+from gym_manager.services.statistics_service import StatisticsService
+from gym_manager.services.dashboard_service import DashboardService
 from gym_manager.utils.database import get_db_session
+from gym_manager.utils.cache import query_cache
+from gym_manager.utils.log import get_logger
 from pathlib import Path
 import os
 import asyncio
+import logging
 
 # Imports para gráficos nativos de Flet
 import flet as ft
 
+log = get_logger(__name__)
+
+# Tiempo de vida de los datos de estadísticas en cache (5 minutos)
+CACHE_TTL = 300
+# Tablas de las que dependen los datos en cache
+PAYMENT_TABLES = ('pagos', 'pagos_resumen_diario')
+MEMBER_TABLES = ('miembros',)
+
 class StatisticsController:
     def __init__(self, view, page):
         self.view = view
         self.page = page
         self.current_year = datetime.now().year
-        self.member_controller = MemberController(get_db_session())
-        self.payment_controller = PaymentController(get_db_session())
-        self._cache = {}  # Cache mejorado para evitar consultas repetidas
-        self._cache_timeout = 300  # 5 minutos de timeout para el cache
-        self._cache_timestamps = {}  # Timestamps para controlar la expiración del cache
+        # Una sola unidad de trabajo para los controladores y servicios de la vista
+        self.db_session = get_db_session()
+        self.member_controller = MemberController(self.db_session)
+        self.payment_controller = PaymentController(self.db_session)
+        self.statistics_service = StatisticsService(self.db_session)
+        self.dashboard_service = DashboardService(self.db_session)
+
+    def close(self):
+        """Cierra la sesión de la vista al salir de ella"""
+        self.db_session.close()
 
     def _initialize_event_handlers(self):
         """Conecta los manejadores de eventos a los controles de la vista."""
@@ -40,105 +58,67 @@ class StatisticsController:
     async def initialize_statistics(self):
         """Carga los datos iniciales para el panel de estadísticas con optimizaciones."""
         if self.view is None:
-            print("Error: Vista es None")
+            log.event(logging.ERROR, 'statistics.no_view')
             return
         
-        print("🚀 Iniciando carga de estadísticas...")
+        log.event(logging.DEBUG, 'statistics.load.start')
         
         try:
             self.view.show_loading()
         except Exception as e:
-            print(f"Error mostrando loader: {e}")
+            log.event(logging.WARNING, 'statistics.loader.show_error', error=str(e))
         
         try:
             # Cargar datos de tarjetas primero (más rápido)
-            print("📊 Cargando datos de tarjetas...")
             await self.load_summary_cards_data()
-            print("✅ Datos de tarjetas cargados")
+            log.event(logging.DEBUG, 'statistics.cards.loaded')
             self.page.update()
             
             # Cargar gráficos en segundo plano de forma asíncrona
-            print("📈 Iniciando carga de gráficos en background...")
             asyncio.create_task(self._load_charts_background())
             
         except Exception as e:
-            print(f"Error en initialize_statistics: {e}")
+            log.event(logging.ERROR, 'statistics.load.error', error=str(e))
         finally:
             # Ocultar loader para las tarjetas (los gráficos seguirán cargando en background)
             try:
                 self.view.hide_loading()
             except Exception as e:
-                print(f"Error ocultando loader: {e}")
+                log.event(logging.WARNING, 'statistics.loader.hide_error', error=str(e))
             self.page.update()
     
     async def _load_charts_background(self):
         """Carga los gráficos en segundo plano sin bloquear la UI"""
         try:
-            print("🎨 Cargando gráficos...")
             await self.load_charts_data()
-            print("✅ Gráficos cargados")
+            log.event(logging.DEBUG, 'statistics.charts.loaded')
         except Exception as e:
-            print(f"Error cargando gráficos: {e}")
+            log.event(logging.ERROR, 'statistics.charts.error', error=str(e))
 
     async def load_summary_cards_data(self):
         """Carga los datos para las tarjetas de resumen de manera optimizada con cache."""
         try:
-            # Verificar cache primero
-            cache_key = f"summary_cards_{self.current_year}"
-            if self._is_cache_valid(cache_key):
-                print("💾 Usando datos en cache")
-                cached_data = self._cache[cache_key]
-                self._update_cards_with_data(cached_data)
-                return
-            
-            print("🔄 Obteniendo datos frescos de la base de datos...")
-            
-            # Ejecutar consultas de forma secuencial para evitar problemas de concurrencia
-            # con la sesión de base de datos
-            try:
-                active_members_count = self.member_controller.get_active_members_count()
-                print(f"✓ Miembros activos: {active_members_count}")
-            except Exception as e:
-                print(f"✗ Error obteniendo miembros activos: {e}")
-                active_members_count = 0
-                
-            try:
-                current_month_payments = self.payment_controller.get_current_month_payments_sum()
-                print(f"✓ Pagos del mes: ${current_month_payments}")
-            except Exception as e:
-                print(f"✗ Error obteniendo pagos del mes: {e}")
-                current_month_payments = 0
-                
-            try:
-                expired_memberships_count = self.member_controller.get_expired_memberships_count()
-                print(f"✓ Membresías vencidas: {expired_memberships_count}")
-            except Exception as e:
-                print(f"✗ Error obteniendo membresías vencidas: {e}")
-                expired_memberships_count = 0
-                
-            try:
-                annual_income = self.payment_controller.get_current_year_payments_sum()
-                print(f"✓ Ingresos anuales: ${annual_income}")
-            except Exception as e:
-                print(f"✗ Error obteniendo ingresos anuales: {e}")
-                annual_income = 0
+            # Todos los indicadores en una sola consulta (con cache)
+            snapshot = query_cache.get_or_load(
+                "statistics.summary_cards",
+                self.dashboard_service.snapshot,
+                params=self.current_year,
+                tags=PAYMENT_TABLES + MEMBER_TABLES,
+                ttl=CACHE_TTL
+            )
             
-            # Guardar en cache
             data = {
-                'active_members': active_members_count,
-                'monthly_payments': current_month_payments,
-                'expired_memberships': expired_memberships_count,
-                'annual_income': annual_income
+                'active_members': snapshot.miembros_activos,
+                'monthly_payments': snapshot.ingresos_mes,
+                'expired_memberships': snapshot.membresias_vencidas,
+                'annual_income': snapshot.ingresos_anio
             }
-            self._cache[cache_key] = data
-            self._cache_timestamps[cache_key] = datetime.now().timestamp()
             
             # Actualizar UI
             self._update_cards_with_data(data)
-            print("📊 Tarjetas actualizadas correctamente")
             
         except Exception as e:
-            print(f"Error general en load_summary_cards_data: {e}")
+            log.event(logging.ERROR, 'statistics.cards.error', error=str(e))
             # En caso de error, mostrar valores por defecto
             self._set_default_card_values()
     
@@ -165,18 +145,9 @@ class StatisticsController:
             self.page.update()
             
         except Exception as e:
-            print(f"Error actualizando tarjetas: {e}")  # Debug
+            log.event(logging.ERROR, 'statistics.cards.update_error', error=str(e))
             self._set_default_card_values()
     
-    def _is_cache_valid(self, cache_key):
-        """Verifica si el cache es válido basado en el timestamp"""
-        if cache_key not in self._cache or cache_key not in self._cache_timestamps:
-            return False
-        
-        current_time = datetime.now().timestamp()
-        cache_time = self._cache_timestamps[cache_key]
-        return (current_time - cache_time) < self._cache_timeout
-
     def _set_default_card_values(self):
         """Establece valores por defecto en las tarjetas cuando hay un error."""
         try:
@@ -198,25 +169,16 @@ class StatisticsController:
             self.page.update()
             
         except Exception as e:
-            print(f"Error estableciendo valores por defecto: {e}")  # Debug
+            log.event(logging.ERROR, 'statistics.cards.default_error', error=str(e))
 
     async def load_charts_data(self):
         """Carga y configura los datos para los gráficos usando Flet nativo."""
         try:
             # Obtener datos de gráficos de forma secuencial para evitar problemas de concurrencia
-            print("📈 Obteniendo datos para gráficos...")
-            
             data_ingresos = self._get_cached_monthly_income_data()
-            print("✓ Datos de ingresos obtenidos")
-            
             data_metodos = self._get_cached_payment_methods_distribution()
-            print("✓ Datos de métodos de pago obtenidos")
-            
             data_nuevos = self._get_cached_new_members_per_month()
-            print("✓ Datos de nuevos miembros obtenidos")
-            
             data_tipos = self._get_cached_active_memberships_by_type()
-            print("✓ Datos de tipos de membresía obtenidos")
             
             # Crear gráficos nativos de Flet uno por uno para mejor UX
             await self._create_flet_chart_async("income", data_ingresos, 0)
@@ -225,7 +187,7 @@ class StatisticsController:
             await self._create_flet_chart_async("memberships_by_type", data_tipos, 1.5)
             
         except Exception as e:
-            print(f"Error en load_charts_data: {e}")
+            log.event(logging.ERROR, 'statistics.charts.data_error', error=str(e))
     
     async def _create_flet_chart_async(self, chart_type, data, delay_seconds):
         """Crea un gráfico nativo de Flet de forma asíncrona con un pequeño delay para mejorar UX"""
@@ -403,7 +365,7 @@ class StatisticsController:
                 self.page.update()
                 
         except Exception as e:
-            print(f"Error creando gráfico {chart_type}: {e}")  # Debug
+            log.event(logging.ERROR, 'statistics.chart.error', chart=chart_type, error=str(e))
 
     async def handle_generate_report(self, e):
         """Maneja el evento de clic en el botón 'Generar Informe'."""
@@ -494,6 +456,9 @@ class StatisticsController:
         if hasattr(self, 'report_dialog'):
             self.report_dialog.open = False
             self.page.update()
+            # Cada exportación crea un diálogo nuevo: no dejarlo en el overlay
+            if self.report_dialog in self.page.overlay:
+                self.page.overlay.remove(self.report_dialog)
 
     def _export_payments_to_pdf(self, payments):
         """Exporta los pagos a PDF (lógica copiada y adaptada de payment_view.py)."""
@@ -719,83 +684,54 @@ class StatisticsController:
         pass
 
     def _get_cached_monthly_income_data(self):
-        """Devuelve un diccionario con la suma de ingresos por mes del año actual con cache mejorado."""
-        cache_key = f"monthly_income_{self.current_year}"
-        if self._is_cache_valid(cache_key):
-            return self._cache[cache_key]
-            
+        """Devuelve un diccionario con la suma de ingresos por mes del año actual (con cache)."""
         try:
-            pagos = self.payment_controller.get_payments({'year': self.current_year})
-            meses = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"]
-            ingresos = [0]*12
-            for pago in pagos:
-                mes = pago.fecha_pago.month - 1
-                ingresos[mes] += pago.monto
-            
-            result = {"meses": meses, "ingresos": ingresos}
-            self._cache[cache_key] = result
-            self._cache_timestamps[cache_key] = datetime.now().timestamp()
-            return result
+            # La agrupación por mes se resuelve en la base de datos
+            return query_cache.get_or_load(
+                "statistics.monthly_income",
+                lambda: self.statistics_service.get_monthly_income(self.current_year),
+                params=self.current_year,
+                tags=PAYMENT_TABLES,
+                ttl=CACHE_TTL
+            )
         except Exception:
             return {"meses": [], "ingresos": []}
 
     def _get_cached_payment_methods_distribution(self):
-        """Devuelve un diccionario con la suma de pagos por método de pago del año actual con cache mejorado."""
-        cache_key = f"payment_methods_{self.current_year}"
-        if self._is_cache_valid(cache_key):
-            return self._cache[cache_key]
-            
+        """Devuelve un diccionario con la suma de pagos por método de pago del año actual (con cache)."""
         try:
-            pagos = self.payment_controller.get_payments({'year': self.current_year})
-            distribucion = {}
-            for pago in pagos:
-                metodo = pago.metodo_pago.descripcion
-                distribucion[metodo] = distribucion.get(metodo, 0) + pago.monto
-            
-            self._cache[cache_key] = distribucion
-            self._cache_timestamps[cache_key] = datetime.now().timestamp()
-            return distribucion
+            return query_cache.get_or_load(
+                "statistics.payment_methods",
+                lambda: self.statistics_service.get_payment_methods_distribution(self.current_year),
+                params=self.current_year,
+                tags=PAYMENT_TABLES + ('metodos_pago',),
+                ttl=CACHE_TTL
+            )
         except Exception:
             return {}
 
     def _get_cached_new_members_per_month(self):
-        """Devuelve un diccionario con la cantidad de nuevos miembros por mes del año actual con cache mejorado."""
-        cache_key = f"new_members_{self.current_year}"
-        if self._is_cache_valid(cache_key):
-            return self._cache[cache_key]
-            
+        """Devuelve un diccionario con la cantidad de nuevos miembros por mes del año actual (con cache)."""
         try:
-            miembros = self.member_controller.get_members({'year': self.current_year})
-            meses = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"]
-            nuevos = [0]*12
-            for m in miembros:
-                if m.fecha_registro and m.fecha_registro.year == self.current_year:
-                    mes = m.fecha_registro.month - 1
-                    nuevos[mes] += 1
-            
-            result = {"meses": meses, "nuevos": nuevos}
-            self._cache[cache_key] = result
-            self._cache_timestamps[cache_key] = datetime.now().timestamp()
-            return result
+            return query_cache.get_or_load(
+                "statistics.new_members",
+                lambda: self.statistics_service.get_new_members_per_month(self.current_year),
+                params=self.current_year,
+                tags=MEMBER_TABLES,
+                ttl=CACHE_TTL
+            )
         except Exception:
             return {"meses": [], "nuevos": []}
 
     def _get_cached_active_memberships_by_type(self):
-        """Devuelve un diccionario con la cantidad de miembros activos por tipo de membresía con cache mejorado."""
-        cache_key = "active_memberships_by_type"
-        if self._is_cache_valid(cache_key):
-            return self._cache[cache_key]
-            
+        """Devuelve un diccionario con la cantidad de miembros activos por tipo de membresía (con cache)."""
         try:
-            miembros = self.member_controller.get_members({'status': True})
-            tipos = {}
-            for m in miembros:
-                tipo = getattr(m, 'tipo_membresia', 'Sin tipo')
-                tipos[tipo] = tipos.get(tipo, 0) + 1
-            
-            self._cache[cache_key] = tipos
-            self._cache_timestamps[cache_key] = datetime.now().timestamp()
-            return tipos
+            return query_cache.get_or_load(
+                "statistics.memberships_by_type",
+                self.statistics_service.get_active_memberships_by_type,
+                tags=MEMBER_TABLES,
+                ttl=CACHE_TTL
+            )
         except Exception:
             return {}
     
@@ -814,5 +750,4 @@ class StatisticsController:
     
     def clear_cache(self):
         """Limpia el cache manualmente si es necesario"""
-        self._cache.clear()
-        self._cache_timestamps.clear() 
\ No newline at end of file
+        query_cache.invalidate(*(PAYMENT_TABLES + MEMBER_TABLES + ('metodos_pago',))) 
\ No newline at end of file
@@ -1,22 +1,53 @@
 from gym_manager.models.user import Usuario
 from gym_manager.utils.database import get_db_session
+from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
 logger = logging.getLogger(__name__)
 
 class UserController:
-    def __init__(self):
-        self.db_session = get_db_session()
+    def __init__(self, db_session=None):
+        # Sin sesión se crea una unidad de trabajo propia
+        self.db_session = db_session if db_session is not None else get_db_session()
 
-    def get_users(self):
+    def _apply_user_filters(self, query, filters):
+        """Aplica los filtros de búsqueda (nombre/apellido, rol, estado)."""
+        if filters:
+            if filters.get('search'):
+                search = f"%{filters['search'].strip()}%"
+                query = query.filter(
+                    (Usuario.nombre.ilike(search)) | (Usuario.apellido.ilike(search))
+                )
+            if filters.get('rol'):
+                query = query.filter(Usuario.rol == filters['rol'])
+            if filters.get('estado') is not None:
+                query = query.filter(Usuario.estado == filters['estado'])
+        return query
+
+    def get_users(self, filters=None):
         """Obtiene todos los usuarios del sistema ordenados por ID descendente (más recientes primero)."""
         try:
-            return self.db_session.query(Usuario).order_by(Usuario.id_usuario.desc()).all()
+            query = self._apply_user_filters(self.db_session.query(Usuario), filters)
+            query = query.order_by(Usuario.id_usuario.desc())
+            if filters and filters.get('offset'):
+                query = query.offset(filters['offset'])
+            if filters and filters.get('limit'):
+                query = query.limit(filters['limit'])
+            return query.all()
         except SQLAlchemyError as e:
             logger.error(f"Error al obtener usuarios: {str(e)}")
             return []
 
+    def count_users(self, filters=None):
+        """Cuenta los usuarios que cumplen los filtros sin cargarlos."""
+        try:
+            query = self._apply_user_filters(self.db_session.query(func.count(Usuario.id_usuario)), filters)
+            return query.scalar() or 0
+        except SQLAlchemyError as e:
+            logger.error(f"Error al contar usuarios: {str(e)}")
+            return 0
+
     def get_user_by_id(self, user_id):
         """Obtiene un usuario por su ID."""
         try:
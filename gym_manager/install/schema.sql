@@ -48,6 +48,8 @@ CREATE TABLE IF NOT EXISTS `miembros` (
   UNIQUE KEY `uk_miembros_documento` (`documento`),
   UNIQUE KEY `uk_miembros_correo` (`correo_electronico`),
   KEY `fk_miembro_rutina` (`id_rutina`),
+  KEY `idx_miembros_fecha_registro` (`fecha_registro`),
+  KEY `idx_miembros_estado_tipo` (`estado`, `tipo_membresia`),
   CONSTRAINT `fk_miembro_rutina` FOREIGN KEY (`id_rutina`) REFERENCES `rutinas` (`id_rutina`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
@@ -71,10 +73,25 @@ CREATE TABLE IF NOT EXISTS `pagos` (
   PRIMARY KEY (`id_pago`),
   KEY `idx_pagos_miembro` (`id_miembro`),
   KEY `idx_pagos_metodo` (`id_metodo_pago`),
+  KEY `idx_pagos_fecha_pago` (`fecha_pago`),
+  KEY `idx_pagos_estado_fecha` (`estado`, `fecha_pago`),
+  KEY `idx_pagos_miembro_estado_fecha` (`id_miembro`, `estado`, `fecha_pago`),
   CONSTRAINT `pagos_ibfk_1` FOREIGN KEY (`id_miembro`) REFERENCES `miembros` (`id_miembro`),
   CONSTRAINT `pagos_ibfk_2` FOREIGN KEY (`id_metodo_pago`) REFERENCES `metodos_pago` (`id_metodo_pago`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
+-- Tabla pagos_resumen_diario (resumen diario de pagos activos)
+CREATE TABLE IF NOT EXISTS `pagos_resumen_diario` (
+  `fecha` DATE NOT NULL,
+  `id_metodo_pago` INT NOT NULL,
+  `tipo_membresia` VARCHAR(20) NOT NULL,
+  `cantidad` INT NOT NULL DEFAULT 0,
+  `total` FLOAT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`fecha`, `id_metodo_pago`, `tipo_membresia`),
+  KEY `idx_pagos_resumen_metodo` (`id_metodo_pago`),
+  CONSTRAINT `pagos_resumen_diario_ibfk_1` FOREIGN KEY (`id_metodo_pago`) REFERENCES `metodos_pago` (`id_metodo_pago`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
 -- Tabla comprobantes_pago
 CREATE TABLE IF NOT EXISTS `comprobantes_pago` (
   `id_comprobante` INT NOT NULL AUTO_INCREMENT,
@@ -83,6 +100,7 @@ CREATE TABLE IF NOT EXISTS `comprobantes_pago` (
   `id_pago` INT NOT NULL,
   PRIMARY KEY (`id_comprobante`),
   UNIQUE KEY `uk_comprobantes_pago_id_pago` (`id_pago`),
+  KEY `idx_comprobantes_fecha_emision` (`fecha_emision`),
   CONSTRAINT `comprobantes_pago_ibfk_1` FOREIGN KEY (`id_pago`) REFERENCES `pagos` (`id_pago`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
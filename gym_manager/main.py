@@ -11,15 +11,17 @@ if not hasattr(ft, "colors") and hasattr(ft, "Colors"):
     ft.colors = ft.Colors
 if not hasattr(ft, "icons") and hasattr(ft, "Icons"):
     ft.icons = ft.Icons
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
 
-# Local imports
+# Local imports: solo lo necesario para mostrar el login; las vistas de los
+# módulos se importan al navegar (ver navigation.navigate_to_home y module_views)
 from gym_manager.views.login_view import LoginView
-from gym_manager.utils.navigation import init_db, navigate_to_login, set_db_session
+from gym_manager.utils.navigation import set_db_session, close_home_view
 from gym_manager.controllers.auth_controller import AuthController
-from gym_manager.models import Base
 from gym_manager.config import DATABASE_URL
+from gym_manager.utils.engines import engine_registry, get_engine
+from gym_manager.utils.database import UnitOfWork
+from gym_manager.utils.log import configure_logging
+from gym_manager.utils.startup import start_database_preparation
 
 # Import mínimo para PyInstaller - solo MySQL driver
 try:
@@ -27,11 +29,8 @@ try:
 except ImportError:
     pass
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configurar logging (GYM_MANAGER_DEBUG=1 activa la depuración)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 def main(page: ft.Page):
@@ -55,33 +54,15 @@ def main(page: ft.Page):
         logger.error(f"Error al configurar la página: {e}")
         return
     
-    # Inicializar la base de datos
-    engine = create_engine(
-        DATABASE_URL,
-        pool_size=5,
-        max_overflow=10,
-        pool_timeout=30,
-        pool_recycle=3600
-    )
-    
-    try:
-        # Crear todas las tablas
-        Base.metadata.create_all(engine)
-        logger.info("Tablas creadas exitosamente")
-        
-        # Probar la conexión
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT COUNT(*) FROM usuarios"))
-            count = result.scalar()
-            logger.info(f"Conexión exitosa. Total de usuarios: {count}")
-    except Exception as e:
-        logger.error(f"Error al conectar a la base de datos: {e}")
-        logger.error(traceback.format_exc())
-        return
+    # Inicializar la base de datos con el engine compartido (un solo pool por base de datos)
+    engine = get_engine(DATABASE_URL)
+
+    # Tablas, resumen diario de pagos y migración de documentos en segundo
+    # plano: el login se muestra sin esperar a la base de datos
+    start_database_preparation()
     
-    # Crear sesión de base de datos
-    Session = sessionmaker(bind=engine)
-    db_session = Session()
+    # Sesión de la aplicación (login y backups) como unidad de trabajo con vida acotada
+    db_session = UnitOfWork()
     
     # Establecer la sesión de la base de datos
     set_db_session(db_session)
@@ -94,8 +75,9 @@ def main(page: ft.Page):
                 db_session.close()
                 logger.info("Sesión de base de datos cerrada")
             if engine:
-                engine.dispose()
-                logger.info("Pool de conexiones liberado")
+                logger.info(f"Estado de los pools de conexiones: {engine_registry.stats()}")
+                engine_registry.dispose()
+                logger.info("Pools de conexiones liberados")
             logger.info("Limpieza de recursos de base de datos completada")
         except Exception as e:
             logger.error(f"Error durante la limpieza de la base de datos: {e}")
@@ -104,6 +86,8 @@ def main(page: ft.Page):
     # Manejar el cierre de la ventana
     def on_window_close(e):
         logger.info("Ventana cerrada por el usuario")
+        # Cerrar el home (vistas en cache y su sesión) antes de liberar los pools
+        close_home_view()
         cleanup_db(engine, db_session)
         page.window_destroy()
     
@@ -0,0 +1,13 @@
+from gym_manager.utils.database import session_scope
+from gym_manager.services.payment_rollup_service import PaymentRollupService
+
+def rebuild():
+    """
+    Reconstruye la tabla pagos_resumen_diario a partir del historial de pagos
+    """
+    with session_scope() as session:
+        count = PaymentRollupService(session).rebuild()
+    print(f"Resumen diario de pagos reconstruido: {count} filas")
+
+if __name__ == "__main__":
+    rebuild()
@@ -1,5 +1,4 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 # Crear la base declarativa
@@ -11,7 +10,9 @@ from gym_manager.models.member import Miembro
 from gym_manager.models.routine import Rutina
 from gym_manager.models.payment_method import MetodoPago
 from gym_manager.models.payment import Pago
+from gym_manager.models.document import Documento
 from gym_manager.models.payment_receipt import ComprobantePago
+from gym_manager.models.payment_daily_summary import PagoResumenDiario
 from gym_manager.models.backup import Backup
 from gym_manager.models.monthly_fee import CuotaMensual
 
@@ -22,12 +23,15 @@ __all__ = [
     'Pago',
     'MetodoPago',
     'Rutina',
+    'Documento',
     'ComprobantePago',
+    'PagoResumenDiario',
     'Backup',
     'CuotaMensual'
 ]
 
 def init_db(database_url):
-    engine = create_engine(database_url)
+    from gym_manager.utils.engines import get_engine
+    engine = get_engine(database_url)
     Base.metadata.create_all(engine)
     return sessionmaker(bind=engine)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, CheckConstraint
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, CheckConstraint, ForeignKey
 from gym_manager.models import Base
 from datetime import datetime
+import json
 
 class Backup(Base):
     """
@@ -10,7 +11,13 @@ class Backup(Base):
         id (int): Identificador único del backup
         name (str): Nombre del archivo de backup
         file_path (str): Ruta completa al archivo de backup
-        size_mb (float): Tamaño del archivo en megabytes
+        size_mb (float): Tamaño del archivo en disco en megabytes
+        uncompressed_size_mb (float): Tamaño del SQL sin comprimir en megabytes
+        compression (str): Códec de compresión del archivo (none, gzip, zstd)
+        backup_type (str): Tipo de backup (full, incremental)
+        parent_id (int): Backup sobre el que se encadena un incremental
+        table_marks (str): Marcas de agua por tabla en JSON (PK máxima, filas y checksum)
+        manifest (str): Manifiesto de integridad en JSON (SHA-256 del archivo y, por tabla, filas y hashes)
         status (str): Estado del backup (completed, failed, in_progress)
         created_at (datetime): Fecha y hora de creación del backup
         error_message (str): Mensaje de error si el backup falló
@@ -23,6 +30,12 @@ class Backup(Base):
     name = Column(String(100), nullable=False, unique=True)
     file_path = Column(String(255), nullable=False)
     size_mb = Column(Float, nullable=False)
+    uncompressed_size_mb = Column(Float, nullable=True)
+    compression = Column(String(10), nullable=False, default='none')
+    backup_type = Column(String(20), nullable=False, default='full')  # full, incremental
+    parent_id = Column(Integer, ForeignKey('backups.id'), nullable=True)
+    table_marks = Column(Text, nullable=True)
+    manifest = Column(Text, nullable=True)
     status = Column(String(20), nullable=False)  # completed, failed, in_progress
     created_at = Column(DateTime, default=datetime.now)
     error_message = Column(Text, nullable=True)
@@ -35,6 +48,10 @@ class Backup(Base):
             status.in_(['completed', 'failed', 'in_progress']),
             name='check_backup_status'
         ),
+        CheckConstraint(
+            backup_type.in_(['full', 'incremental']),
+            name='check_backup_type'
+        ),
     )
 
     def __repr__(self):
@@ -50,6 +67,21 @@ class Backup(Base):
         """Verifica si el backup falló"""
         return self.status == 'failed'
 
+    @property
+    def is_incremental(self) -> bool:
+        """Verifica si el backup es incremental"""
+        return self.backup_type == 'incremental'
+
+    @property
+    def marks(self) -> dict:
+        """Marcas de agua por tabla registradas al crear el backup"""
+        return json.loads(self.table_marks) if self.table_marks else {}
+
+    @property
+    def manifest_data(self) -> dict:
+        """Manifiesto de integridad registrado al crear el backup ({} si es anterior)"""
+        return json.loads(self.manifest) if self.manifest else {}
+
     @property
     def is_in_progress(self) -> bool:
         """Verifica si el backup está en progreso"""
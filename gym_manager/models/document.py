@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from sqlalchemy.orm import deferred
+from gym_manager.models import Base
+
+class Documento(Base):
+    """
+    Documento binario (comprobantes en PDF, archivos de rutinas) guardado
+    una sola vez por contenido.
+
+    Se identifica por el SHA-256 del contenido original; los comprobantes y
+    las rutinas guardan solo ese hash y `referencias` cuenta cuántas filas lo
+    usan. Se mantiene con DocumentStore.
+    """
+    __tablename__ = 'documentos'
+
+    id_documento = Column(Integer, primary_key=True, autoincrement=True)
+    hash = Column(String(64), nullable=False, unique=True)
+    # Diferido: las consultas de referencias no leen el BLOB
+    contenido = deferred(Column(LargeBinary(16777216), nullable=False))
+    # 'zlib' o 'none' si comprimir no reducía el tamaño
+    compresion = Column(String(10), nullable=False, default='zlib')
+    tamano = Column(Integer, nullable=False)
+    referencias = Column(Integer, nullable=False, default=0)
+    fecha_creacion = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<Documento(id={self.id_documento}, hash='{self.hash[:12]}', referencias={self.referencias})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Boolean, Text, DateTime
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Boolean, Text, DateTime, Index
 from sqlalchemy.orm import relationship
 from gym_manager.models import Base
 
@@ -23,6 +23,12 @@ class Miembro(Base):
     # Relaciones
     pagos = relationship("Pago", back_populates="miembro", cascade="all, delete-orphan")
     rutina = relationship("Rutina", foreign_keys=[id_rutina], overlaps="rutina_asignada")
+
+    # Índices para los filtros y ordenamientos más frecuentes
+    __table_args__ = (
+        Index('idx_miembros_fecha_registro', 'fecha_registro'),
+        Index('idx_miembros_estado_tipo', 'estado', 'tipo_membresia'),
+    )
     
     def __repr__(self):
         return f"<Miembro(id_miembro={self.id_miembro}, nombre={self.nombre}, apellido={self.apellido})>"
\ No newline at end of file
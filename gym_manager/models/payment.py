@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, Float, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, Float, String, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from gym_manager.models import Base
 
@@ -18,6 +18,13 @@ class Pago(Base):
     metodo_pago = relationship("MetodoPago", back_populates="pagos")
     comprobante = relationship("ComprobantePago", back_populates="pago", uselist=False, cascade="all, delete-orphan")
 
+    # Índices para los filtros más frecuentes (sumas por período, último pago por miembro)
+    __table_args__ = (
+        Index('idx_pagos_fecha_pago', 'fecha_pago'),
+        Index('idx_pagos_estado_fecha', 'estado', 'fecha_pago'),
+        Index('idx_pagos_miembro_estado_fecha', 'id_miembro', 'estado', 'fecha_pago'),
+    )
+
     def __repr__(self):
         return f"<Pago(id_pago={self.id_pago}, monto={self.monto}, id_miembro={self.id_miembro})>"
 
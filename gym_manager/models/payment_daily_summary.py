@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Float, Date, String, ForeignKey
+from gym_manager.models import Base
+
+class PagoResumenDiario(Base):
+    """
+    Resumen diario de pagos activos por método de pago y tipo de membresía.
+
+    Se mantiene de forma incremental desde PaymentController y se puede
+    reconstruir completo con PaymentRollupService.rebuild().
+    """
+    __tablename__ = 'pagos_resumen_diario'
+
+    fecha = Column(Date, primary_key=True)
+    id_metodo_pago = Column(Integer, ForeignKey('metodos_pago.id_metodo_pago'), primary_key=True)
+    tipo_membresia = Column(String(20), primary_key=True)
+    cantidad = Column(Integer, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<PagoResumenDiario(fecha={self.fecha}, id_metodo_pago={self.id_metodo_pago}, tipo_membresia={self.tipo_membresia}, total={self.total})>"
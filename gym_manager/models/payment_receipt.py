@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, LargeBinary, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from gym_manager.models import Base
 
@@ -6,12 +6,21 @@ class ComprobantePago(Base):
     __tablename__ = "comprobantes_pago"
 
     id_comprobante = Column(Integer, primary_key=True, autoincrement=True)
-    contenido = Column(LargeBinary, nullable=False)
+    # Hash del PDF en documentos (ver DocumentStore)
+    hash_contenido = Column(String(64), ForeignKey('documentos.hash'), nullable=True)
+    # Contenido en línea de los comprobantes anteriores a documentos (o restaurados de backups antiguos)
+    contenido = Column(LargeBinary, nullable=True)
     fecha_emision = Column(DateTime, nullable=False)
     id_pago = Column(Integer, ForeignKey('pagos.id_pago'), nullable=False, unique=True)
 
     # Relaciones
     pago = relationship("Pago", back_populates="comprobante")
 
+    # Índice para el filtro y orden por fecha de emisión
+    __table_args__ = (
+        Index('idx_comprobantes_fecha_emision', 'fecha_emision'),
+        Index('idx_comprobantes_hash_contenido', 'hash_contenido'),
+    )
+
     def __repr__(self):
         return f"<ComprobantePago(id_comprobante={self.id_comprobante}, id_pago={self.id_pago})>" 
\ No newline at end of file
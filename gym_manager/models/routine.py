@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, LargeBinary
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from gym_manager.models import Base
 
 class Rutina(Base):
@@ -8,7 +8,11 @@ class Rutina(Base):
     id_rutina = Column(Integer, primary_key=True, autoincrement=True)
     nombre = Column(String(100), nullable=False)
     descripcion = Column(Text)
-    documento_rutina = Column(LargeBinary(16777216))  # 16MB en bytes
+    # Hash del documento en documentos (ver DocumentStore)
+    hash_documento = Column(String(64), ForeignKey('documentos.hash'), nullable=True, index=True)
+    # Documento en línea de las rutinas anteriores a documentos (o restauradas de backups antiguos).
+    # Diferido: solo se lee cuando se accede al documento (ver RoutineController.get_routine_document)
+    documento_rutina = deferred(Column(LargeBinary(16777216)))  # 16MB en bytes
     nivel_dificultad = Column(String(20), nullable=False)
     fecha_creacion = Column(DateTime)
     fecha_horario = Column(DateTime)
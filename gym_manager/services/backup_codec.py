@@ -0,0 +1,256 @@
+import gzip
+import hashlib
+import io
+import os
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+# zstd es opcional: si el paquete no está instalado solo se ofrece gzip
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Tamaño del buffer entre el texto SQL y el compresor (1 MB)
+CODEC_BUFFER_SIZE = 1024 * 1024
+# Códec usado por defecto para los backups nuevos
+DEFAULT_CODEC = 'gzip'
+
+
+class BackupCodec:
+    """
+    Códec de compresión de los archivos de backup.
+
+    Cada códec sabe abrir el archivo comprimido para escritura y envolver un
+    archivo abierto para leerlo descomprimido; la conversión a texto y el
+    buffer los agregan BackupWriter y BackupReader.
+    """
+
+    def __init__(self, name: str, extension: str,
+                 writer: Callable[[Path], io.IOBase],
+                 reader: Callable[[io.IOBase], io.IOBase]):
+        self.name = name
+        self.extension = extension
+        self._writer = writer
+        self._reader = reader
+
+    def open_writer(self, path: Path) -> io.IOBase:
+        """Abre el archivo para escribir datos binarios comprimidos"""
+        return self._writer(path)
+
+    def wrap_reader(self, fileobj: io.IOBase) -> io.IOBase:
+        """Devuelve un stream binario con el contenido descomprimido de `fileobj`"""
+        return self._reader(fileobj)
+
+    def __repr__(self):
+        return f"<BackupCodec(name='{self.name}')>"
+
+
+CODECS: Dict[str, BackupCodec] = {
+    'none': BackupCodec(
+        'none', '',
+        lambda path: open(path, 'wb'),
+        lambda fileobj: fileobj
+    ),
+    'gzip': BackupCodec(
+        'gzip', '.gz',
+        lambda path: gzip.open(path, 'wb', compresslevel=6),
+        lambda fileobj: gzip.GzipFile(fileobj=fileobj, mode='rb')
+    ),
+}
+if zstandard is not None:
+    CODECS['zstd'] = BackupCodec(
+        'zstd', '.zst',
+        lambda path: zstandard.open(path, 'wb', cctx=zstandard.ZstdCompressor(level=3)),
+        # Los backups paralelos concatenan varios frames: leerlos todos
+        lambda fileobj: zstandard.ZstdDecompressor().stream_reader(
+            fileobj, read_across_frames=True, closefd=False
+        )
+    )
+
+
+def get_codec(name: Optional[str]) -> BackupCodec:
+    """
+    Obtiene un códec por nombre ('none', 'gzip', 'zstd')
+
+    Raises:
+        ValueError: Si el códec no existe o no está instalado
+    """
+    codec = CODECS.get(name or 'none')
+    if codec is None:
+        if name == 'zstd':
+            raise ValueError("La compresión zstd requiere el paquete 'zstandard'")
+        raise ValueError(f"Códec de compresión desconocido: {name}")
+    return codec
+
+
+def codec_for_path(path: Path) -> BackupCodec:
+    """Deduce el códec a partir de la extensión del archivo (.gz, .zst o sin comprimir)"""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.gz':
+        return CODECS['gzip']
+    if suffix == '.zst':
+        return get_codec('zstd')
+    return CODECS['none']
+
+
+class _CountingWriter(io.RawIOBase):
+    """
+    Stream binario que cuenta (y opcionalmente resume con SHA-256) los bytes
+    escritos antes de pasarlos al compresor
+    """
+
+    def __init__(self, target: io.IOBase, digest=None):
+        self._target = target
+        self.digest = digest
+        self.bytes_written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        written = self._target.write(data)
+        written = len(data) if written is None else written
+        if self.digest is not None:
+            self.digest.update(data[:written])
+        self.bytes_written += written
+        return written
+
+    def close(self):
+        if not self.closed:
+            try:
+                self._target.close()
+            finally:
+                super().close()
+
+
+class BackupWriter:
+    """
+    Escritor de texto SQL con compresión en streaming.
+
+    Uso:
+        with BackupWriter(path, codec) as writer:
+            writer.write("...")
+        writer.uncompressed_bytes  # bytes de SQL escritos antes de comprimir
+        writer.sha256              # con hash_content=True: SHA-256 del contenido sin comprimir
+    """
+
+    def __init__(self, path: Path, codec: BackupCodec, buffer_size: int = CODEC_BUFFER_SIZE,
+                 hash_content: bool = False):
+        self._counter = _CountingWriter(codec.open_writer(path), hashlib.sha256() if hash_content else None)
+        self._stream = io.TextIOWrapper(
+            io.BufferedWriter(self._counter, buffer_size), encoding='utf-8', newline='\n'
+        )
+
+    @property
+    def uncompressed_bytes(self) -> int:
+        return self._counter.bytes_written
+
+    @property
+    def sha256(self) -> Optional[str]:
+        """SHA-256 (hexadecimal) del contenido escrito, si se pidió hash_content"""
+        return self._counter.digest.hexdigest() if self._counter.digest is not None else None
+
+    def write(self, data: str) -> int:
+        return self._stream.write(data)
+
+    def writelines(self, lines):
+        self._stream.writelines(lines)
+
+    def close(self):
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _HashingReader(io.RawIOBase):
+    """Stream binario que calcula el SHA-256 de los bytes leídos del archivo"""
+
+    def __init__(self, source: io.IOBase):
+        self._source = source
+        self.digest = hashlib.sha256()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        read = self._source.readinto(buffer)
+        if read:
+            self.digest.update(memoryview(buffer)[:read])
+        return read
+
+
+class BackupReader:
+    """
+    Lector de texto SQL de un archivo de backup (comprimido o no) que
+    descomprime en streaming e informa cuántos bytes del archivo se leyeron.
+
+    Uso:
+        with BackupReader(path) as reader:
+            chunk = reader.read(65536)
+            reader.bytes_read / reader.total_bytes  # fracción leída del archivo
+
+    Con hash_file=True, file_sha256() devuelve el SHA-256 del archivo
+    (comprimido) calculado en la misma lectura.
+    """
+
+    def __init__(self, path: Path, buffer_size: int = CODEC_BUFFER_SIZE, hash_file: bool = False):
+        self._file = open(path, 'rb')
+        self.total_bytes = os.fstat(self._file.fileno()).st_size
+        self._hasher = _HashingReader(self._file) if hash_file else None
+        try:
+            raw = codec_for_path(path).wrap_reader(self._hasher or self._file)
+            self._stream = io.TextIOWrapper(io.BufferedReader(raw, buffer_size), encoding='utf-8')
+        except Exception:
+            self._file.close()
+            raise
+
+    @property
+    def bytes_read(self) -> int:
+        """Bytes del archivo (comprimido) consumidos hasta ahora"""
+        return self._file.tell() if not self._file.closed else self.total_bytes
+
+    def read(self, size: int = -1) -> str:
+        return self._stream.read(size)
+
+    def file_sha256(self) -> str:
+        """
+        SHA-256 del archivo completo: termina de leer los bytes que el
+        descompresor no consumió (requiere hash_file=True)
+        """
+        for _ in iter(lambda: self._hasher.read(CODEC_BUFFER_SIZE), b''):
+            pass
+        return self._hasher.digest.hexdigest()
+
+    def __iter__(self):
+        return iter(self._stream)
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_backup_reader(path: Path, buffer_size: int = CODEC_BUFFER_SIZE, hash_file: bool = False) -> BackupReader:
+    """Abre un archivo de backup (comprimido o no) como texto, descomprimiendo en streaming"""
+    return BackupReader(path, buffer_size, hash_file)
+
+
+def file_sha256(path: Path, buffer_size: int = CODEC_BUFFER_SIZE) -> str:
+    """SHA-256 (hexadecimal) de un archivo, leído por bloques"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(buffer_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,171 @@
+import hashlib
+import io
+import json
+import re
+import zipfile
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from gym_manager.services.backup_codec import CODEC_BUFFER_SIZE, get_codec
+
+# Formato de backup por filas: un ZIP con el manifiesto y un archivo de datos por tabla
+ROWS_FORMAT_NAME = 'gym-manager-rows'
+ROWS_FORMAT_VERSION = 1
+ROWS_ARCHIVE_EXTENSION = '.zip'
+MANIFEST_NAME = 'manifest.json'
+
+# Secuencias de escape del formato por defecto de LOAD DATA (FIELDS ESCAPED BY '\\')
+NULL_FIELD = '\\N'
+_ESCAPES = {'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'}
+_ESCAPE_RE = re.compile(r"[\\\t\n\r\0]")
+_UNESCAPES = {'t': '\t', 'n': '\n', 'r': '\r', '0': '\0', 'b': '\b', 'Z': '\x1a'}
+_UNESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+
+
+def format_field(val, is_blob: bool = False) -> str:
+    """
+    Convierte un valor al texto de un campo TSV compatible con LOAD DATA:
+    \\N para NULL, BLOB en hexadecimal (se cargan con UNHEX) y texto con
+    tabulaciones, saltos de línea y barras invertidas escapados
+    """
+    if val is None:
+        return NULL_FIELD
+    if is_blob and isinstance(val, (bytes, bytearray, memoryview)):
+        return bytes(val).hex()
+    if isinstance(val, bool):
+        return '1' if val else '0'
+    if isinstance(val, (int, float, Decimal, datetime, date, time, timedelta)):
+        return str(val)
+    return _ESCAPE_RE.sub(lambda m: _ESCAPES[m.group()], str(val))
+
+
+def format_row(row, blob_flags: List[bool]) -> str:
+    """Convierte una fila a una línea TSV (con el salto de línea final)"""
+    return '\t'.join(format_field(val, is_blob) for val, is_blob in zip(row, blob_flags)) + '\n'
+
+
+def parse_field(field: str) -> Optional[str]:
+    """Inverso de format_field: devuelve el texto del campo o None para \\N"""
+    if field == NULL_FIELD:
+        return None
+    if '\\' not in field:
+        return field
+    return _UNESCAPE_RE.sub(lambda m: _UNESCAPES.get(m.group(1), m.group(1)), field)
+
+
+def parse_row(line: str) -> List[Optional[str]]:
+    """Convierte una línea TSV en la lista de valores de la fila"""
+    return [parse_field(field) for field in line.rstrip('\n').split('\t')]
+
+
+def new_manifest(codec_name: str, incremental: bool) -> dict:
+    """Crea el manifiesto vacío de un backup por filas"""
+    return {
+        'format': ROWS_FORMAT_NAME,
+        'version': ROWS_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'incremental': incremental,
+        'codec': codec_name,
+        'tables': [],
+    }
+
+
+def table_data_name(index: int, table: str, codec_name: str) -> str:
+    """Nombre dentro del ZIP del archivo de datos de una tabla"""
+    return f"data/{index:04d}_{table}.tsv{get_codec(codec_name).extension}"
+
+
+def write_rows_archive(path: Path, manifest: dict, data_files: List[Tuple[str, Path]]) -> int:
+    """
+    Arma el ZIP del backup con el manifiesto y los archivos de datos ya
+    comprimidos (se guardan sin volver a comprimir)
+
+    Returns:
+        int: bytes del manifiesto
+    """
+    manifest_bytes = json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        archive.writestr(MANIFEST_NAME, manifest_bytes)
+        for name, data_path in data_files:
+            archive.write(data_path, name)
+    return len(manifest_bytes)
+
+
+def is_rows_archive(path: Path) -> bool:
+    """Indica si el archivo es un backup por filas (ZIP con manifiesto)"""
+    return Path(path).suffix.lower() == ROWS_ARCHIVE_EXTENSION and zipfile.is_zipfile(path)
+
+
+class RowsArchive:
+    """
+    Lector de un backup por filas.
+
+    Uso:
+        with RowsArchive(path) as archive:
+            for entry in archive.tables:
+                for row in archive.iter_rows(entry):
+                    ...
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._zip = zipfile.ZipFile(self.path)
+        try:
+            self.manifest = json.loads(self._zip.read(MANIFEST_NAME).decode('utf-8'))
+            if self.manifest.get('format') != ROWS_FORMAT_NAME:
+                raise ValueError(f"{self.path.name} no es un backup por filas de Gym Manager")
+            if self.manifest.get('version', 0) > ROWS_FORMAT_VERSION:
+                raise ValueError(f"Versión de backup no soportada: {self.manifest.get('version')}")
+            self.codec = get_codec(self.manifest.get('codec'))
+        except Exception:
+            self._zip.close()
+            raise
+
+    @property
+    def tables(self) -> List[dict]:
+        """Entradas del manifiesto, una por tabla, en el orden del backup"""
+        return self.manifest['tables']
+
+    @contextmanager
+    def open_data(self, entry: dict) -> Iterator[io.IOBase]:
+        """Abre los datos de una tabla como stream binario descomprimido"""
+        with self._zip.open(entry['data']) as member:
+            stream = self.codec.wrap_reader(member)
+            try:
+                yield stream
+            finally:
+                stream.close()
+
+    def iter_rows(self, entry: dict) -> Iterator[List[Optional[str]]]:
+        """Genera las filas de una tabla como listas de texto (None para NULL)"""
+        with self.open_data(entry) as data:
+            f = io.TextIOWrapper(io.BufferedReader(data, CODEC_BUFFER_SIZE), encoding='utf-8', newline='\n')
+            for line in f:
+                yield parse_row(line)
+
+    def scan_table(self, entry: dict) -> Tuple[int, str]:
+        """
+        Lee los datos de una tabla sin interpretarlos
+
+        Returns:
+            Tuple[int, str]: cantidad de filas (líneas) y SHA-256 del TSV sin comprimir
+        """
+        digest = hashlib.sha256()
+        rows = 0
+        with self.open_data(entry) as data:
+            for block in iter(lambda: data.read(CODEC_BUFFER_SIZE), b''):
+                digest.update(block)
+                rows += block.count(b'\n')
+        return rows, digest.hexdigest()
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -3,12 +3,79 @@ import logging
 from datetime import datetime
 from pathlib import Path
 from sqlalchemy.orm import Session
-from sqlalchemy import text, create_engine
+from sqlalchemy import text
 from gym_manager.models.backup import Backup
+from gym_manager.services.backup_codec import (
+    BackupWriter, CODEC_BUFFER_SIZE, DEFAULT_CODEC, file_sha256, get_codec, open_backup_reader
+)
+from gym_manager.services.backup_rows import (
+    ROWS_ARCHIVE_EXTENSION, RowsArchive, format_row, is_rows_archive, new_manifest, table_data_name,
+    write_rows_archive
+)
+from gym_manager.utils.sql_tokenizer import count_insert_rows, iter_sql_statements, statement_table
+from gym_manager.utils.engines import get_engine
 import traceback
-from typing import Tuple
-import base64
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+import json
+import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Filas leídas por bloque desde el cursor del servidor al exportar una tabla
+FETCH_CHUNK_ROWS = 500
+# Tamaño máximo por defecto de cada INSERT extendido (como mysqldump --extended-insert).
+# Debe ser menor que max_allowed_packet del servidor (4 MB por defecto en MySQL 5.7, 64 MB en 8.0)
+EXTENDED_INSERT_MAX_BYTES = 1024 * 1024
+# Hilos por defecto para exportar tablas. Con 1 todas las tablas se leen con
+# una sola conexión y transacción (una misma instantánea); en paralelo cada
+# tabla usa su propia conexión y puede reflejar otro momento (ver _dump_segments)
+DEFAULT_WORKERS = 1
+# Marca de los backups SQL que escriben los BLOB como literales X'..' (los
+# anteriores los escribían en Base64 y el restore los decodifica con FROM_BASE64)
+BLOB_HEX_HEADER = "-- BLOB: hex\n"
+# Cierre formal del archivo de backup
+BACKUP_FOOTER = "-- Fin del backup\n\n"
+# Formatos de backup: 'sql' (script SQL, se restaura sentencia por sentencia)
+# o 'rows' (ZIP con manifiesto y TSV por tabla, se restaura con carga masiva).
+# 'sql' sigue siendo el formato por defecto; 'rows' se elige explícitamente
+BACKUP_FORMATS = ('sql', 'rows')
+DEFAULT_BACKUP_FORMAT = 'sql'
+# Versión del manifiesto de integridad guardado en Backup.manifest
+MANIFEST_VERSION = 1
+
+
+@dataclass(frozen=True)
+class TableDumpPlan:
+    """Qué exportar de una tabla: columnas, estructura y consulta acotada por las marcas"""
+    table: str
+    column_names: List[str]
+    blob_columns: FrozenSet[str]
+    mark: Optional[dict]
+    # None si en un incremental solo se exportan las filas nuevas
+    create_stmt: Optional[str]
+    # En un incremental la tabla cambió y se reemplaza completa
+    replace: bool
+    query: str
+    # Filas y checksum de la tabla completa al momento del backup
+    table_rows: int
+    table_checksum: int
+
+    @property
+    def blob_flags(self) -> List[bool]:
+        return [col in self.blob_columns for col in self.column_names]
+
+    def manifest_entry(self, rows: int, sha256: str) -> dict:
+        """Entrada del manifiesto de integridad para los datos exportados de la tabla"""
+        return {
+            'rows': rows,
+            'sha256': sha256,
+            'columns': self.column_names,
+            'table_rows': self.table_rows,
+            'table_checksum': self.table_checksum,
+        }
+
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -21,8 +88,21 @@ class BackupService:
     de la base de datos MySQL.
     """
     
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, max_insert_bytes: int = EXTENDED_INSERT_MAX_BYTES,
+                 codec: str = DEFAULT_CODEC, workers: int = DEFAULT_WORKERS,
+                 backup_format: str = DEFAULT_BACKUP_FORMAT):
+        if backup_format not in BACKUP_FORMATS:
+            raise ValueError(f"Formato de backup desconocido: {backup_format}")
         self.db_session = db_session
+        # Límite aproximado de cada INSERT extendido; con 0 se escribe un INSERT por fila
+        self.max_insert_bytes = max_insert_bytes
+        # Compresión de los archivos nuevos ('gzip', 'zstd' o 'none')
+        self.codec = get_codec(codec)
+        # Tablas exportadas en paralelo; con 1 (por defecto) se usa una sola
+        # conexión y transacción, y todas las tablas salen de la misma instantánea
+        self.workers = max(1, workers)
+        # Formato de los archivos nuevos ('sql' o 'rows')
+        self.backup_format = backup_format
         # Resolver base del proyecto compatible con exe empaquetado
         if getattr(sys, "frozen", False):
             base_dir = Path(sys.executable).parent
@@ -55,14 +135,8 @@ class BackupService:
             
         self.logger.info(f"[Backup] Usando base de datos: {self.DATABASE_URL}")
         
-        # Crear engine con la misma configuración que el sistema principal
-        self.engine = create_engine(
-            self.DATABASE_URL,
-            pool_size=5,
-            max_overflow=10,
-            pool_timeout=30,
-            pool_recycle=3600
-        )
+        # Engine compartido con el resto de la aplicación (mismo pool de conexiones)
+        self.engine = get_engine(self.DATABASE_URL)
         
         # Limpiar backups antiguos
         self._clean_old_backups()
@@ -80,20 +154,36 @@ class BackupService:
             backups = self.get_backups()
             if len(backups) > max_backups:
                 self.logger.info(f"[Cleanup] Limpiando backups antiguos (máximo: {max_backups})")
+                # Los backups base de un incremental que se conserva no se eliminan
+                by_id = {backup.id: backup for backup in backups}
+                protected = set()
+                for backup in backups[:max_backups]:
+                    parent_id = backup.parent_id
+                    while parent_id is not None and parent_id not in protected:
+                        protected.add(parent_id)
+                        parent_id = by_id[parent_id].parent_id if parent_id in by_id else None
+                removed = 0
                 for backup in backups[max_backups:]:
-                    self.delete_backup(backup.id)
-                self.logger.info(f"[Cleanup] Se eliminaron {len(backups) - max_backups} backups antiguos")
+                    if backup.id in protected:
+                        continue
+                    # Puede haberse eliminado ya como incremental de otro backup
+                    if self.db_session.query(Backup).get(backup.id) is None:
+                        continue
+                    success, _ = self.delete_backup(backup.id)
+                    removed += 1 if success else 0
+                self.logger.info(f"[Cleanup] Se eliminaron {removed} backups antiguos")
         except Exception as e:
             self.logger.error(f"[Cleanup] Error limpiando backups antiguos: {str(e)}")
             self.logger.error(traceback.format_exc())
 
-    def create_backup(self, description: str = None, created_by: str = None) -> Backup:
+    def create_backup(self, description: str = None, created_by: str = None, incremental: bool = False) -> Backup:
         """
         Crea un nuevo backup de la base de datos.
         
         Args:
             description (str, optional): Descripción del backup
             created_by (str, optional): Usuario que crea el backup
+            incremental (bool): Si es True, solo exporta los cambios desde el último backup
             
         Returns:
             Backup: Objeto Backup creado
@@ -101,59 +191,23 @@ class BackupService:
         Raises:
             Exception: Si hay un error al crear el backup
         """
-        self.logger.info("[Backup] Iniciando creación de backup...")
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_name = f"backup_{timestamp}.sql"
-        backup_path = self.backup_dir / backup_name
-
-        try:
-            backup = Backup(
-                name=backup_name,
-                file_path=str(backup_path),
-                size_mb=0,
-                status='in_progress',
-                description=description,
-                created_by=created_by
-            )
-            self.db_session.add(backup)
-            self.db_session.commit()
-
-            self._write_backup_file(backup_path)
+        return self.create_backup_with_progress(None, description, created_by, incremental)
 
-            # Validación final del archivo
-            if not backup_path.exists() or backup_path.stat().st_size == 0:
-                error_msg = "[Backup] El archivo está vacío o no se creó correctamente"
-                self.logger.error(error_msg)
-                backup.status = 'failed'
-                backup.error_message = error_msg
-                self.db_session.commit()
-                raise ValueError(error_msg)
-
-            # Guardar tamaño final y estado
-            backup.size_mb = backup_path.stat().st_size / (1024 * 1024)
-            backup.status = 'completed'
-            self.db_session.commit()
-
-            self.logger.info(f"[Backup] Backup {backup_name} creado correctamente ({backup.size_mb:.2f} MB)")
-            return backup
-
-        except Exception as e:
-            self.logger.error(f"[Backup] Error al crear backup: {str(e)}")
-            self.logger.error(traceback.format_exc())
-            if 'backup' in locals():
-                backup.status = 'failed'
-                backup.error_message = str(e)
-                self.db_session.commit()
-            raise
-
-    def create_backup_with_progress(self, progress_callback=None, description: str = None, created_by: str = None) -> Backup:
+    def create_backup_with_progress(self, progress_callback=None, description: str = None, created_by: str = None,
+                                    incremental: bool = False) -> Backup:
         """
         Crea un nuevo backup de la base de datos con progreso.
+
+        Un backup incremental se encadena al último backup con marcas de agua
+        y solo exporta las filas nuevas de cada tabla (o la tabla completa si
+        cambiaron filas ya respaldadas). Si no hay un backup previo se crea
+        uno completo.
         
         Args:
             progress_callback: Función callback para actualizar el progreso
             description (str, optional): Descripción del backup
             created_by (str, optional): Usuario que crea el backup
+            incremental (bool): Si es True, solo exporta los cambios desde el último backup
             
         Returns:
             Backup: Objeto Backup creado
@@ -161,10 +215,18 @@ class BackupService:
         Raises:
             Exception: Si hay un error al crear el backup
         """
-        self.logger.info("[Backup] Iniciando creación de backup con progreso...")
-        
+        self.logger.info("[Backup] Iniciando creación de backup...")
+
+        base = self._get_incremental_base() if incremental else None
+        if incremental and base is None:
+            self.logger.info("[Backup] No hay un backup previo para encadenar; se crea un backup completo")
+
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_name = f"backup_{timestamp}.sql"
+        suffix = "_inc" if base else ""
+        if self.backup_format == 'rows':
+            backup_name = f"backup_{timestamp}{suffix}{ROWS_ARCHIVE_EXTENSION}"
+        else:
+            backup_name = f"backup_{timestamp}{suffix}.sql{self.codec.extension}"
         backup_path = self.backup_dir / backup_name
 
         try:
@@ -176,6 +238,9 @@ class BackupService:
                 name=backup_name,
                 file_path=str(backup_path),
                 size_mb=0,
+                compression=self.codec.name,
+                backup_type='incremental' if base else 'full',
+                parent_id=base.id if base else None,
                 status='in_progress',
                 description=description,
                 created_by=created_by
@@ -183,45 +248,15 @@ class BackupService:
             self.db_session.add(backup)
             self.db_session.commit()
 
-            # Inicializar archivo de backup
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                f.write("-- Backup generado por Gym Manager\n")
-                f.write("SET FOREIGN_KEY_CHECKS=0;\n\n")
-
-            # Paso 2: Obtener estructura de tablas (20%)
-            if progress_callback:
-                progress_callback(20, "Obteniendo estructura de tablas...", "Analizando esquema de la base de datos", "~1.5 minutos")
-            
-            with self.engine.connect() as conn:
-                tables = [row[0] for row in conn.execute(text("SHOW TABLES")) if row[0] != 'backups']
-                total_tables = len(tables)
-                
-                # Paso 3: Procesar cada tabla (20% - 90%)
-                for i, table in enumerate(tables):
-                    if progress_callback:
-                        progress = 20 + (i / total_tables) * 70  # 20% a 90%
-                        progress_callback(
-                            progress, 
-                            f"Procesando tabla: {table}", 
-                            f"Tabla {i+1} de {total_tables} ({table})", 
-                            f"~{int((total_tables - i) * 0.5)} minutos"
-                        )
-                    
-                    self._write_table_to_backup(conn, table, backup_path)
-                    
-                    # Verificar si fue cancelado
-                    if progress_callback and hasattr(progress_callback, 'is_cancelled') and progress_callback.is_cancelled():
-                        raise Exception("Operación cancelada por el usuario")
+            # Pasos 2 y 3: Estructura y datos de cada tabla (20% - 90%)
+            uncompressed_bytes, marks, tables = self._write_backup_file(
+                backup_path, progress_callback, base.marks if base else None
+            )
 
             # Paso 4: Finalización (90% - 100%)
             if progress_callback:
                 progress_callback(90, "Finalizando backup...", "Validando archivo y calculando tamaño", "~30 segundos")
 
-            # Cerrar formalmente el archivo de backup
-            with open(backup_path, 'a', encoding='utf-8') as f:
-                f.write("-- Fin del backup\n")
-                f.write("\n")
-
             # Validación final del archivo
             if not backup_path.exists() or backup_path.stat().st_size == 0:
                 error_msg = "[Backup] El archivo está vacío o no se creó correctamente"
@@ -231,8 +266,17 @@ class BackupService:
                 self.db_session.commit()
                 raise ValueError(error_msg)
 
-            # Guardar tamaño final y estado
+            # Guardar tamaño final (en disco y sin comprimir), manifiesto de integridad y estado
             backup.size_mb = backup_path.stat().st_size / (1024 * 1024)
+            backup.uncompressed_size_mb = uncompressed_bytes / (1024 * 1024)
+            backup.table_marks = json.dumps(marks)
+            backup.manifest = json.dumps({
+                'version': MANIFEST_VERSION,
+                'format': self.backup_format,
+                'file_bytes': backup_path.stat().st_size,
+                'file_sha256': file_sha256(backup_path),
+                'tables': tables,
+            })
             backup.status = 'completed'
             self.db_session.commit()
 
@@ -251,143 +295,536 @@ class BackupService:
                 self.db_session.commit()
             raise
 
-    def _write_backup_file(self, backup_path: Path):
-        """Escribe el archivo de backup con la estructura y datos de la base de datos."""
-        with open(backup_path, 'w', encoding='utf-8') as f:
-            f.write("-- Backup generado por Gym Manager\n")
-            f.write("SET FOREIGN_KEY_CHECKS=0;\n\n")
+    def _write_backup_file(self, backup_path: Path, progress_callback=None,
+                           base_marks: Optional[Dict[str, dict]] = None) -> Tuple[int, Dict[str, dict], Dict[str, dict]]:
+        """
+        Escribe el archivo de backup con la estructura y datos de la base de datos.
+
+        El archivo se abre una sola vez con un buffer grande y se comprime en
+        streaming con el códec configurado; cada tabla se vuelca por bloques,
+        por lo que la memoria usada no depende del tamaño de las tablas.
+        En formato 'rows' se delega en _write_rows_archive.
+
+        Args:
+            backup_path (Path): Ruta del archivo a generar
+            progress_callback: Función callback para actualizar el progreso
+            base_marks (dict, optional): Marcas del backup anterior; si se
+                indican el backup es incremental respecto de ellas
+
+        Returns:
+            Tuple[int, dict, dict]: tamaño sin comprimir (bytes), marcas de agua por
+            tabla y entradas del manifiesto de integridad por tabla
+        """
+        # Paso 2: Obtener todas las tablas excepto 'backups' (20%)
+        if progress_callback:
+            progress_callback(20, "Obteniendo estructura de tablas...", "Analizando esquema de la base de datos", "~1.5 minutos")
+
+        with self.engine.connect() as conn:
+            tables = [row[0] for row in conn.execute(text("SHOW TABLES")) if row[0] != 'backups']
+
+        if self.backup_format == 'rows':
+            return self._write_rows_archive(backup_path, tables, progress_callback, base_marks)
+
+        header = "-- Backup generado por Gym Manager\n"
+        if base_marks is not None:
+            header += "-- Backup incremental\n"
+        header += f"-- INSERT extendido: hasta {self.max_insert_bytes} bytes por sentencia\n"
+        header += BLOB_HEX_HEADER
+        header += "SET FOREIGN_KEY_CHECKS=0;\n\n"
+
+        if self.workers > 1 and len(tables) > 1:
+            return self._write_backup_file_parallel(backup_path, tables, header, progress_callback, base_marks)
+
+        marks = {}
+        entries = {}
+        total_tables = len(tables)
+        with BackupWriter(backup_path, self.codec) as f:
+            f.write(header)
 
             with self.engine.connect() as conn:
-                # Obtener todas las tablas excepto 'backups'
-                tables = [row[0] for row in conn.execute(text("SHOW TABLES")) if row[0] != 'backups']
-
-                for table in tables:
-                    self.logger.info(f"[Backup] Procesando tabla: {table}")
-
-                    # Estructura de la tabla
-                    create_stmt = conn.execute(text(f"SHOW CREATE TABLE {table}")).fetchone()[1]
-                    # Modificar el CREATE TABLE para usar IF NOT EXISTS
-                    create_stmt = create_stmt.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS")
-                    f.write(f"-- Estructura de la tabla {table}\n")
-                    f.write(f"{create_stmt};\n\n")
-
-                    # Obtener información de las columnas
-                    columns_info = conn.execute(text(f"SHOW COLUMNS FROM {table}")).fetchall()
-                    blob_columns = [col[0] for col in columns_info if 'BLOB' in col[1].upper()]
-                    
-                    if blob_columns:
-                        self.logger.info(f"[Backup] Columnas BLOB detectadas en {table}: {', '.join(blob_columns)}")
-
-                    # Datos
-                    # Obtener la clave primaria de la tabla
-                    primary_key = None
-                    try:
-                        result = conn.execute(text(f"SHOW KEYS FROM {table} WHERE Key_name = 'PRIMARY'"))
-                        primary_key = result.fetchone()
-                        if primary_key:
-                            primary_key = primary_key[4]  # El nombre de la columna está en el índice 4
-                    except Exception as e:
-                        self.logger.warning(f"[Backup] No se pudo obtener la clave primaria de {table}: {str(e)}")
-
-                    # Construir la consulta con ORDER BY si hay clave primaria
-                    query = f"SELECT * FROM {table}"
-                    if primary_key:
-                        query += f" ORDER BY {primary_key}"
-                    
-                    result = conn.execute(text(query))
-                    rows = result.fetchall()
-                    columns = result.keys()
-
-                    if rows:
-                        self.logger.info(f"[Backup] {len(rows)} filas encontradas en {table}")
-                        f.write(f"-- Datos de la tabla {table}\n")
-
-                        for row in rows:
-                            values = []
-                            for col_name, val in zip(columns, row):
-                                if val is None:
-                                    values.append("NULL")
-                                elif col_name in blob_columns and isinstance(val, bytes):
-                                    # Codificar BLOB en Base64
-                                    encoded = base64.b64encode(val).decode('utf-8')
-                                    values.append(f"'{encoded}'")
-                                elif isinstance(val, (int, float)):
-                                    values.append(str(val))
-                                else:
-                                    escaped = str(val).replace("'", "''")
-                                    values.append(f"'{escaped}'")
-                            
-                            values_str = ', '.join(values)
-                            columns_str = ', '.join(f"`{col}`" for col in columns)
-                            f.write(f"INSERT INTO `{table}` ({columns_str}) VALUES ({values_str});\n")
-                        f.write("\n")
-                    else:
-                        self.logger.info(f"[Backup] Tabla {table} vacía")
-                   
+                # Paso 3: Procesar cada tabla (20% - 90%)
+                for i, table in enumerate(tables):
+                    if progress_callback:
+                        progress = 20 + (i / total_tables) * 70  # 20% a 90%
+                        progress_callback(
+                            progress,
+                            f"Procesando tabla: {table}",
+                            f"Tabla {i+1} de {total_tables} ({table})",
+                            f"~{int((total_tables - i) * 0.5)} minutos"
+                        )
+
+                    mark, entries[table] = self._write_table_to_backup(conn, table, f, base_marks)
+                    if mark:
+                        marks[table] = mark
+
+                    # Verificar si fue cancelado
+                    if self._is_cancelled(progress_callback):
+                        raise Exception("Operación cancelada por el usuario")
+
             # Cierre formal del archivo de backup
-            f.write("-- Fin del backup\n")
-            f.write("\n")
+            f.write(BACKUP_FOOTER)
+
+        return f.uncompressed_bytes, marks, entries
+
+    @staticmethod
+    def _is_cancelled(progress_callback) -> bool:
+        """Indica si el usuario canceló la operación desde el modal de progreso"""
+        return bool(progress_callback and hasattr(progress_callback, 'is_cancelled') and progress_callback.is_cancelled())
+
+    def _dump_segments(self, tables: List[str], segment_paths: List[Path],
+                       dump_table: Callable[..., tuple], progress_callback=None) -> List[tuple]:
+        """
+        Exporta cada tabla a su archivo de segmento con dump_table(conexión, ruta, tabla).
+
+        Con un solo worker todas las tablas se leen con la misma conexión y la
+        misma transacción, de modo que el backup refleja un único instante. Con
+        varios, las tablas se reparten entre self.workers hilos, cada uno con su
+        propia conexión del pool: es más rápido, pero cada tabla se lee en otro
+        momento y un pago o comprobante escrito entretanto puede quedar con
+        filas huérfanas en el backup (el restore las carga con
+        FOREIGN_KEY_CHECKS=0). Por eso el paralelo es opcional.
+
+        Returns:
+            List[tuple]: resultado de dump_table para cada tabla, en el orden de `tables`
+        """
+        results = [None] * len(tables)
+        total_tables = len(tables)
+        workers = max(1, min(self.workers, total_tables))
+        if workers == 1:
+            with self.engine.connect() as conn:
+                for i, (segment_path, table) in enumerate(zip(segment_paths, tables)):
+                    results[i] = dump_table(conn, segment_path, table)
+                    self._report_segment(progress_callback, tables, i, i + 1, workers)
+            return results
+
+        def dump_with_own_connection(segment_path, table):
+            with self.engine.connect() as conn:
+                return dump_table(conn, segment_path, table)
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backup")
+        try:
+            futures = {
+                executor.submit(dump_with_own_connection, segment_path, table): i
+                for i, (segment_path, table) in enumerate(zip(segment_paths, tables))
+            }
+            # Paso 3: Procesar las tablas (20% - 90%)
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                results[i] = future.result()
+                self._report_segment(progress_callback, tables, i, done, workers)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return results
+
+    def _report_segment(self, progress_callback, tables: List[str], index: int, done: int, workers: int):
+        """Informa el avance de _dump_segments y corta si el usuario canceló"""
+        total_tables = len(tables)
+        if progress_callback:
+            progress_callback(
+                20 + (done / total_tables) * 70,  # 20% a 90%
+                f"Tabla exportada: {tables[index]}",
+                f"Tabla {done} de {total_tables}" + (f" ({workers} en paralelo)" if workers > 1 else ""),
+                f"~{int((total_tables - done) * 0.5 / workers)} minutos"
+            )
+
+        # Verificar si fue cancelado
+        if self._is_cancelled(progress_callback):
+            raise Exception("Operación cancelada por el usuario")
+
+    def _write_backup_file_parallel(self, backup_path: Path, tables: List[str], header: str,
+                                    progress_callback=None,
+                                    base_marks: Optional[Dict[str, dict]] = None) -> Tuple[int, Dict[str, dict], Dict[str, dict]]:
+        """
+        Escribe el backup exportando las tablas en paralelo (self.workers > 1).
+
+        Cada tabla se vuelca con su propia conexión del pool en un archivo de
+        segmento comprimido, por lo que las tablas no salen de una misma
+        instantánea (ver _dump_segments). Al terminar, los segmentos se
+        concatenan en orden (gzip y zstd admiten varios miembros/frames seguidos
+        en un archivo) y el resultado se restaura igual que un backup secuencial.
+        """
+        segments_dir = backup_path.with_name(backup_path.name + ".parts")
+        segments_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            header_path = segments_dir / "header.seg"
+            footer_path = segments_dir / "footer.seg"
+            with BackupWriter(header_path, self.codec) as f:
+                f.write(header)
+            uncompressed_bytes = f.uncompressed_bytes
+
+            segment_paths = [segments_dir / f"{i:04d}.seg" for i in range(len(tables))]
+            results = self._dump_segments(
+                tables, segment_paths,
+                lambda conn, segment_path, table: self._write_table_segment(conn, segment_path, table, base_marks),
+                progress_callback
+            )
+            marks = {}
+            entries = {}
+            for table, (entry, mark, table_bytes) in zip(tables, results):
+                entries[table] = entry
+                uncompressed_bytes += table_bytes
+                if mark:
+                    marks[table] = mark
+
+            with BackupWriter(footer_path, self.codec) as f:
+                f.write(BACKUP_FOOTER)
+            uncompressed_bytes += f.uncompressed_bytes
+
+            # Unir los segmentos en el orden original de las tablas
+            with open(backup_path, 'wb') as out:
+                for segment_path in [header_path, *segment_paths, footer_path]:
+                    with open(segment_path, 'rb') as segment:
+                        shutil.copyfileobj(segment, out, CODEC_BUFFER_SIZE)
+
+            return uncompressed_bytes, marks, entries
+        finally:
+            shutil.rmtree(segments_dir, ignore_errors=True)
+
+    def _write_rows_archive(self, backup_path: Path, tables: List[str], progress_callback=None,
+                            base_marks: Optional[Dict[str, dict]] = None) -> Tuple[int, Dict[str, dict], Dict[str, dict]]:
+        """
+        Escribe el backup en formato por filas: un ZIP con manifest.json
+        (estructura, columnas y modo de cada tabla) y un TSV comprimido por
+        tabla que el restore carga con LOAD DATA o executemany.
+
+        Las tablas se exportan a segmentos (en paralelo si self.workers > 1,
+        ver _dump_segments) que luego se guardan en el ZIP sin volver a comprimir.
+        """
+        segments_dir = backup_path.with_name(backup_path.name + ".parts")
+        segments_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            segment_paths = [segments_dir / f"{i:04d}.seg" for i in range(len(tables))]
+            results = self._dump_segments(
+                tables, segment_paths,
+                lambda conn, segment_path, table: self._write_table_rows(conn, segment_path, table, base_marks),
+                progress_callback
+            )
+
+            manifest = new_manifest(self.codec.name, base_marks is not None)
+            data_files = []
+            marks = {}
+            entries = {}
+            uncompressed_bytes = 0
+            for i, (table, segment_path, (entry, mark, table_bytes)) in enumerate(zip(tables, segment_paths, results)):
+                entries[table] = {key: entry[key] for key in ('rows', 'sha256', 'columns', 'table_rows', 'table_checksum')}
+                entry['data'] = table_data_name(i, table, self.codec.name)
+                manifest['tables'].append(entry)
+                data_files.append((entry['data'], segment_path))
+                uncompressed_bytes += table_bytes
+                if mark:
+                    marks[table] = mark
+
+            uncompressed_bytes += write_rows_archive(backup_path, manifest, data_files)
+            return uncompressed_bytes, marks, entries
+        finally:
+            shutil.rmtree(segments_dir, ignore_errors=True)
 
-    def _write_table_to_backup(self, conn, table: str, backup_path: Path):
-        """Escribe una tabla específica al archivo de backup"""
-        with open(backup_path, 'a', encoding='utf-8') as f:
-            self.logger.info(f"[Backup] Procesando tabla: {table}")
+    def _write_table_segment(self, conn, segment_path: Path, table: str,
+                             base_marks: Optional[Dict[str, dict]] = None) -> Tuple[dict, Optional[dict], int]:
+        """
+        Exporta una tabla a su archivo de segmento con la conexión indicada
+
+        Returns:
+            Tuple[dict, dict | None, int]: entrada del manifiesto, marca de agua
+            de la tabla y bytes sin comprimir escritos
+        """
+        with BackupWriter(segment_path, self.codec) as f:
+            mark, entry = self._write_table_to_backup(conn, table, f, base_marks)
+        return entry, mark, f.uncompressed_bytes
+
+    @staticmethod
+    def _format_value(val, is_blob: bool) -> str:
+        """Convierte un valor de una fila a su literal SQL"""
+        if val is None:
+            return "NULL"
+        if is_blob and isinstance(val, (bytes, bytearray, memoryview)):
+            # Literal hexadecimal: MySQL lo carga como binario exacto, sin decodificar nada en Python
+            return f"X'{bytes(val).hex()}'"
+        if isinstance(val, (int, float)):
+            return str(val)
+        # MySQL interpreta la barra invertida como escape dentro de las comillas
+        escaped = str(val).replace("\\", "\\\\").replace("'", "''")
+        return f"'{escaped}'"
+
+    @staticmethod
+    def _row_checksum_sql(column_names: List[str]) -> str:
+        """
+        Expresión SQL con el checksum de un conjunto de filas (XOR de CRC32
+        por fila). ISNULL distingue NULL de cadena vacía en CONCAT_WS.
+        """
+        parts = ', '.join(f"`{col}`, ISNULL(`{col}`)" for col in column_names)
+        return f"COALESCE(BIT_XOR(CRC32(CONCAT_WS('|', {parts}))), 0)"
+
+    def _get_table_checksum(self, conn, table: str, column_names: List[str]) -> Tuple[int, int]:
+        """Obtiene la cantidad de filas y el checksum de todas las filas de una tabla"""
+        row = conn.execute(text(
+            f"SELECT COUNT(*), {self._row_checksum_sql(column_names)} FROM `{table}`"
+        )).fetchone()
+        return int(row[0] or 0), int(row[1] or 0)
+
+    def _get_table_mark(self, conn, table: str, primary_key: str, column_names: List[str]) -> dict:
+        """
+        Calcula la marca de agua de una tabla: PK máxima, cantidad de filas y
+        checksum de todas las filas hasta esa PK.
+        """
+        row = conn.execute(text(
+            f"SELECT MAX(`{primary_key}`), COUNT(*), {self._row_checksum_sql(column_names)} FROM `{table}`"
+        )).fetchone()
+        return {
+            'pk': primary_key,
+            'max_pk': int(row[0] or 0),
+            'rows': int(row[1] or 0),
+            'checksum': int(row[2] or 0),
+        }
+
+    def _is_prefix_unchanged(self, conn, table: str, column_names: List[str], base_mark: dict) -> bool:
+        """
+        Indica si las filas ya respaldadas (PK <= marca anterior) siguen
+        iguales, es decir, si en la tabla solo se agregaron filas nuevas.
+        """
+        primary_key = base_mark['pk']
+        row = conn.execute(text(
+            f"SELECT COUNT(*), {self._row_checksum_sql(column_names)} FROM `{table}` "
+            f"WHERE `{primary_key}` <= {int(base_mark['max_pk'])}"
+        )).fetchone()
+        return int(row[0] or 0) == base_mark['rows'] and int(row[1] or 0) == base_mark['checksum']
 
-            # Estructura de la tabla
-            create_stmt = conn.execute(text(f"SHOW CREATE TABLE {table}")).fetchone()[1]
+    def _plan_table_dump(self, conn, table: str, base_marks: Optional[Dict[str, dict]] = None) -> TableDumpPlan:
+        """
+        Decide qué exportar de una tabla: columnas, clave primaria, marca de
+        agua y la consulta acotada que devuelve las filas a respaldar.
+
+        En un backup incremental (base_marks no es None) las tablas con PK
+        entera cuyas filas respaldadas no cambiaron solo exportan las filas
+        nuevas; el resto se reemplaza completa (DELETE + INSERT).
+        """
+        self.logger.info(f"[Backup] Procesando tabla: {table}")
+
+        # Obtener información de las columnas
+        columns_info = conn.execute(text(f"SHOW COLUMNS FROM `{table}`")).fetchall()
+        column_names = [col[0] for col in columns_info]
+        column_types = {col[0]: col[1].lower() for col in columns_info}
+        blob_columns = frozenset(col[0] for col in columns_info if 'BLOB' in col[1].upper())
+
+        if blob_columns:
+            self.logger.info(f"[Backup] Columnas BLOB detectadas en {table}: {', '.join(sorted(blob_columns))}")
+
+        # Obtener la clave primaria de la tabla
+        primary_keys = []
+        try:
+            result = conn.execute(text(f"SHOW KEYS FROM `{table}` WHERE Key_name = 'PRIMARY'"))
+            # El orden está en el índice 3 y el nombre de la columna en el índice 4
+            primary_keys = [key[4] for key in sorted(result.fetchall(), key=lambda key: key[3])]
+        except Exception as e:
+            self.logger.warning(f"[Backup] No se pudo obtener la clave primaria de {table}: {str(e)}")
+        primary_key = primary_keys[0] if primary_keys else None
+
+        # Marca de agua: solo para tablas con PK entera simple (autoincrement)
+        mark = None
+        if len(primary_keys) == 1 and 'int' in column_types.get(primary_key, ''):
+            mark = self._get_table_mark(conn, table, primary_key, column_names)
+
+        base_mark = (base_marks or {}).get(table)
+        append_after = None
+        if (mark and base_mark and base_mark.get('pk') == primary_key
+                and self._is_prefix_unchanged(conn, table, column_names, base_mark)):
+            append_after = base_mark['max_pk']
+
+        # Filas y checksum de la tabla completa, para verificar una restauración contra el manifiesto
+        if mark:
+            table_rows, table_checksum = mark['rows'], mark['checksum']
+        else:
+            table_rows, table_checksum = self._get_table_checksum(conn, table, column_names)
+
+        create_stmt = None
+        if append_after is None:
+            # Estructura de la tabla, con IF NOT EXISTS
+            create_stmt = conn.execute(text(f"SHOW CREATE TABLE `{table}`")).fetchone()[1]
             create_stmt = create_stmt.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS")
+        else:
+            self.logger.info(f"[Backup] {table}: solo filas con {primary_key} > {append_after}")
+
+        # Construir la consulta acotada por las marcas y con ORDER BY si hay clave primaria
+        conditions = []
+        if append_after is not None:
+            conditions.append(f"`{primary_key}` > {int(append_after)}")
+        if mark:
+            # Las filas insertadas durante el backup quedan para el próximo
+            conditions.append(f"`{primary_key}` <= {int(mark['max_pk'])}")
+        query = f"SELECT * FROM `{table}`"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if primary_key:
+            query += f" ORDER BY `{primary_key}`"
+
+        return TableDumpPlan(
+            table=table,
+            column_names=column_names,
+            blob_columns=blob_columns,
+            mark=mark,
+            create_stmt=create_stmt,
+            replace=create_stmt is not None and base_marks is not None,
+            query=query,
+            table_rows=table_rows,
+            table_checksum=table_checksum,
+        )
+
+    @staticmethod
+    def _iter_table_chunks(conn, plan: TableDumpPlan) -> Iterator[list]:
+        """
+        Genera las filas de la consulta del plan en bloques de FETCH_CHUNK_ROWS,
+        con un cursor del lado del servidor (SSCursor en pymysql), sin cargar
+        la tabla completa en memoria
+        """
+        result = conn.execute(
+            text(plan.query),
+            execution_options={'stream_results': True, 'max_row_buffer': FETCH_CHUNK_ROWS}
+        )
+        try:
+            for chunk in result.partitions(FETCH_CHUNK_ROWS):
+                yield chunk
+        finally:
+            result.close()
+
+    def _write_table_to_backup(self, conn, table: str, f,
+                               base_marks: Optional[Dict[str, dict]] = None) -> Tuple[Optional[dict], dict]:
+        """
+        Escribe la estructura y los datos de una tabla en el archivo de backup.
+
+        Los datos se leen por bloques (ver _iter_table_chunks) y se escriben
+        como INSERT de varias filas (una por línea) de hasta max_insert_bytes;
+        una fila más grande que el límite va sola.
+
+        Returns:
+            Tuple[dict | None, dict]: marca de agua de la tabla (None si no tiene
+            PK entera simple) y su entrada del manifiesto de integridad
+        """
+        plan = self._plan_table_dump(conn, table, base_marks)
+        digest = hashlib.sha256()
+
+        def write_statement(stmt: str, separator: str = "\n"):
+            # El hash cubre las sentencias tal como las devuelve iter_sql_statements
+            f.write(stmt + separator)
+            digest.update(stmt.encode('utf-8') + b"\n")
+
+        if plan.create_stmt:
             f.write(f"-- Estructura de la tabla {table}\n")
-            f.write(f"{create_stmt};\n\n")
+            write_statement(f"{plan.create_stmt};", "\n\n")
+            if plan.replace:
+                # En un incremental la tabla cambió: se reemplaza completa
+                write_statement(f"DELETE FROM `{table}`;", "\n\n")
 
-            # Obtener información de las columnas
-            columns_info = conn.execute(text(f"SHOW COLUMNS FROM {table}")).fetchall()
-            blob_columns = [col[0] for col in columns_info if 'BLOB' in col[1].upper()]
-            
-            if blob_columns:
-                self.logger.info(f"[Backup] Columnas BLOB detectadas en {table}: {', '.join(blob_columns)}")
+        columns_str = ', '.join(f"`{col}`" for col in plan.column_names)
+        blob_flags = plan.blob_flags
+        insert_prefix = f"INSERT INTO `{table}` ({columns_str}) VALUES\n"
+
+        row_count = 0
+        batch = []
+        batch_size = len(insert_prefix)
+        for chunk in self._iter_table_chunks(conn, plan):
+            if row_count == 0:
+                f.write(f"-- Datos de la tabla {table}\n")
+            for row in chunk:
+                values = '(' + ', '.join(
+                    self._format_value(val, is_blob) for val, is_blob in zip(row, blob_flags)
+                ) + ')'
+                # +2 por el separador ",\n" entre filas
+                if batch and batch_size + len(values) + 2 > self.max_insert_bytes:
+                    write_statement(insert_prefix + ',\n'.join(batch) + ';')
+                    batch = []
+                    batch_size = len(insert_prefix)
+                batch.append(values)
+                batch_size += len(values) + 2
+            row_count += len(chunk)
+        if batch:
+            write_statement(insert_prefix + ',\n'.join(batch) + ';')
+
+        if row_count:
+            f.write("\n")
+            self.logger.info(f"[Backup] {row_count} filas exportadas de {table}")
+        else:
+            self.logger.info(f"[Backup] Tabla {table} sin filas para exportar")
+
+        return plan.mark, plan.manifest_entry(row_count, digest.hexdigest())
 
-            # Datos
-            primary_key = None
+    def _write_table_rows(self, conn, segment_path: Path, table: str,
+                          base_marks: Optional[Dict[str, dict]] = None) -> Tuple[dict, Optional[dict], int]:
+        """
+        Exporta las filas de una tabla como TSV (formato por defecto de LOAD
+        DATA) en su archivo de segmento, con la conexión indicada
+
+        Returns:
+            Tuple[dict, dict | None, int]: entrada del manifiesto, marca de agua
+            y bytes sin comprimir escritos
+        """
+        with BackupWriter(segment_path, self.codec, hash_content=True) as f:
+            plan = self._plan_table_dump(conn, table, base_marks)
+            blob_flags = plan.blob_flags
+            row_count = 0
+            for chunk in self._iter_table_chunks(conn, plan):
+                f.writelines(format_row(row, blob_flags) for row in chunk)
+                row_count += len(chunk)
+
+        self.logger.info(f"[Backup] {row_count} filas exportadas de {table}")
+        entry = {
+            'name': table,
+            # full: tabla completa; replace: reemplaza la del backup anterior; append: solo filas nuevas
+            'mode': 'append' if plan.create_stmt is None else ('replace' if plan.replace else 'full'),
+            'create': plan.create_stmt,
+            'blob_columns': sorted(plan.blob_columns),
+            **plan.manifest_entry(row_count, f.sha256),
+        }
+        return entry, plan.mark, f.uncompressed_bytes
+
+    def _get_incremental_base(self) -> Optional[Backup]:
+        """
+        Obtiene el backup sobre el que se encadena un incremental: el último
+        backup completado con marcas de agua cuya cadena esté completa.
+        """
+        candidates = self.db_session.query(Backup).filter(
+            Backup.status == 'completed',
+            Backup.table_marks.isnot(None)
+        ).order_by(Backup.created_at.desc(), Backup.id.desc()).all()
+        for backup in candidates:
             try:
-                result = conn.execute(text(f"SHOW KEYS FROM {table} WHERE Key_name = 'PRIMARY'"))
-                primary_key = result.fetchone()
-                if primary_key:
-                    primary_key = primary_key[4]
-            except Exception as e:
-                self.logger.warning(f"[Backup] No se pudo obtener la clave primaria de {table}: {str(e)}")
-
-            query = f"SELECT * FROM {table}"
-            if primary_key:
-                query += f" ORDER BY {primary_key}"
-            
-            result = conn.execute(text(query))
-            rows = result.fetchall()
-            columns = result.keys()
+                self.get_backup_chain(backup)
+                return backup
+            except ValueError as e:
+                self.logger.warning(f"[Backup] {backup.name} no sirve de base para un incremental: {str(e)}")
+        return None
 
-            if rows:
-                self.logger.info(f"[Backup] {len(rows)} filas encontradas en {table}")
-                f.write(f"-- Datos de la tabla {table}\n")
+    def get_backup_chain(self, backup: Backup) -> List[Backup]:
+        """
+        Obtiene la cadena de restauración de un backup: el backup completo
+        seguido de sus incrementales en orden, terminando en `backup`.
 
-                for row in rows:
-                    values = []
-                    for col_name, val in zip(columns, row):
-                        if val is None:
-                            values.append("NULL")
-                        elif col_name in blob_columns and isinstance(val, bytes):
-                            encoded = base64.b64encode(val).decode('utf-8')
-                            values.append(f"'{encoded}'")
-                        elif isinstance(val, (int, float)):
-                            values.append(str(val))
-                        else:
-                            escaped = str(val).replace("'", "''")
-                            values.append(f"'{escaped}'")
-                    
-                    values_str = ', '.join(values)
-                    columns_str = ', '.join(f"`{col}`" for col in columns)
-                    f.write(f"INSERT INTO `{table}` ({columns_str}) VALUES ({values_str});\n")
-                f.write("\n")
-            else:
-                self.logger.info(f"[Backup] Tabla {table} vacía")
+        Raises:
+            ValueError: Si falta algún backup de la cadena o no está completado
+        """
+        chain = []
+        current = backup
+        while current is not None:
+            if not current.is_completed:
+                raise ValueError(f"El backup {current.name} de la cadena no está completado")
+            chain.append(current)
+            if current.parent_id is None:
+                break
+            parent = self.db_session.query(Backup).get(current.parent_id)
+            if parent is None:
+                raise ValueError(f"Falta el backup base del incremental {current.name}")
+            current = parent
+        chain.reverse()
+        return chain
+
+    def _get_descendants(self, backup_id: int) -> List[Backup]:
+        """Obtiene los incrementales que dependen (directa o indirectamente) de un backup"""
+        descendants = []
+        pending = [backup_id]
+        while pending:
+            children = self.db_session.query(Backup).filter(Backup.parent_id.in_(pending)).all()
+            descendants.extend(children)
+            pending = [child.id for child in children]
+        return descendants
 
     def get_backups(self) -> list[Backup]:
         """
@@ -400,7 +837,8 @@ class BackupService:
 
     def delete_backup(self, backup_id: int) -> Tuple[bool, str]:
         """
-        Elimina un backup específico.
+        Elimina un backup específico junto con los incrementales que dependen
+        de él (sin su base no se pueden restaurar).
         
         Args:
             backup_id (int): ID del backup a eliminar
@@ -420,26 +858,30 @@ class BackupService:
             return False, "Backup no encontrado"
                 
         try:
-            # Eliminar archivo físico
-            backup_path = Path(backup.file_path)
-            if not backup_path.is_absolute():
-                backup_path = self.backup_dir / backup_path.name
+            # Primero los incrementales más recientes de la cadena, luego el backup
+            to_delete = list(reversed(self._get_descendants(backup.id))) + [backup]
+            for item in to_delete:
+                # Eliminar archivo físico
+                backup_path = self._backup_file_path(item)
+                if backup_path.exists():
+                    try:
+                        backup_path.unlink()
+                        self.logger.info(f"[Delete] Archivo físico eliminado: {backup_path}")
+                    except Exception as e:
+                        self.logger.error(f"[Delete] Error eliminando archivo físico {backup_path}: {str(e)}")
+                        self.db_session.rollback()
+                        return False, f"No se pudo eliminar el archivo físico: {str(e)}"
+                else:
+                    self.logger.warning(f"[Delete] El archivo físico no existe: {backup_path}")
                 
-            if backup_path.exists():
-                try:
-                    backup_path.unlink()
-                    self.logger.info(f"[Delete] Archivo físico eliminado: {backup_path}")
-                except Exception as e:
-                    self.logger.error(f"[Delete] Error eliminando archivo físico {backup_path}: {str(e)}")
-                    return False, f"No se pudo eliminar el archivo físico: {str(e)}"
-            else:
-                self.logger.warning(f"[Delete] El archivo físico no existe: {backup_path}")
-            
-            # Eliminar registro de la base de datos
-            self.db_session.delete(backup)
+                # Eliminar registro de la base de datos
+                self.db_session.delete(item)
+                self.db_session.flush()
             self.db_session.commit()
             
             self.logger.info(f"[Delete] Backup eliminado exitosamente: {backup.name}")
+            if len(to_delete) > 1:
+                return True, f"Backup eliminado exitosamente junto con {len(to_delete) - 1} backups incrementales"
             return True, "Backup eliminado exitosamente"
             
         except Exception as e:
@@ -448,6 +890,133 @@ class BackupService:
             self.db_session.rollback()
             return False, f"Error al eliminar backup: {str(e)}"
 
+    def _backup_file_path(self, backup: Backup) -> Path:
+        """Ruta del archivo de un backup (las rutas relativas se buscan en backup_dir)"""
+        backup_path = Path(backup.file_path)
+        if not backup_path.is_absolute():
+            backup_path = self.backup_dir / backup_path.name
+        return backup_path
+
+    def verify(self, backup_id: int) -> Tuple[bool, str]:
+        """
+        Verifica un backup contra su manifiesto de integridad sin tocar las
+        tablas de la base de datos: SHA-256 del archivo y, por tabla, cantidad
+        de filas y SHA-256 de los datos. Los backups anteriores al manifiesto
+        solo se verifican leyéndolos completos.
+
+        Args:
+            backup_id (int): ID del backup a verificar
+
+        Returns:
+            Tuple[bool, str]: (éxito, mensaje)
+        """
+        backup = self.db_session.query(Backup).get(backup_id)
+        if not backup:
+            return False, "Backup no encontrado"
+        backup_path = self._backup_file_path(backup)
+        if not backup_path.exists():
+            return False, f"Archivo de backup no encontrado: {backup_path}"
+
+        manifest = backup.manifest_data
+        expected = manifest.get('tables', {})
+        try:
+            if is_rows_archive(backup_path):
+                file_hash = file_sha256(backup_path)
+                with RowsArchive(backup_path) as archive:
+                    found = {entry['name']: archive.scan_table(entry) for entry in archive.tables}
+            else:
+                found, file_hash = self._scan_sql_backup(backup_path)
+        except Exception as e:
+            self.logger.error(f"[Verify] Error leyendo {backup.name}: {str(e)}")
+            return False, f"El archivo de backup está dañado: {str(e)}"
+
+        if not manifest:
+            self.logger.info(f"[Verify] {backup.name} no tiene manifiesto: solo se comprobó que se puede leer")
+            return True, "El backup se puede leer (no tiene manifiesto de integridad)"
+
+        problems = []
+        if file_hash != manifest.get('file_sha256'):
+            problems.append("el SHA-256 del archivo no coincide")
+        for table, entry in expected.items():
+            rows, digest = found.get(table, (0, hashlib.sha256().hexdigest()))
+            if rows != entry['rows']:
+                problems.append(f"{table}: {rows} filas, se esperaban {entry['rows']}")
+            elif digest != entry['sha256']:
+                problems.append(f"{table}: el SHA-256 de los datos no coincide")
+        for table in sorted(set(found) - set(expected)):
+            problems.append(f"{table}: tabla que no figura en el manifiesto")
+
+        if problems:
+            for problem in problems:
+                self.logger.error(f"[Verify] {backup.name}: {problem}")
+            return False, f"El backup no coincide con su manifiesto: {'; '.join(problems[:5])}"
+        self.logger.info(f"[Verify] {backup.name} verificado: {len(expected)} tablas")
+        return True, f"Backup verificado correctamente ({len(expected)} tablas)"
+
+    @staticmethod
+    def _scan_sql_backup(backup_path: Path) -> Tuple[Dict[str, Tuple[int, str]], str]:
+        """
+        Lee un backup SQL una sola vez calculando, por tabla, las filas de
+        sus INSERT y el SHA-256 de sus sentencias, y el SHA-256 del archivo
+
+        Returns:
+            Tuple[dict, str]: {tabla: (filas, sha256)} y SHA-256 del archivo
+        """
+        digests = {}
+        rows = {}
+        with open_backup_reader(backup_path, hash_file=True) as reader:
+            for stmt in iter_sql_statements(reader):
+                table = statement_table(stmt)
+                if table is None:
+                    continue
+                digests.setdefault(table, hashlib.sha256()).update(stmt.encode('utf-8') + b"\n")
+                rows[table] = rows.get(table, 0) + count_insert_rows(stmt)
+            file_hash = reader.file_sha256()
+        return {table: (rows[table], digest.hexdigest()) for table, digest in digests.items()}, file_hash
+
+    def verify_restored(self, backup: Backup, cursor=None) -> List[str]:
+        """
+        Compara las tablas restauradas con el estado registrado en el
+        manifiesto del backup (cantidad de filas y checksum de la tabla
+        completa).
+
+        Con `cursor` (DBAPI) la verificación se hace en esa conexión, dentro
+        de la transacción de la restauración y antes de su commit.
+
+        Returns:
+            List[str]: diferencias encontradas (vacía si coincide o si el
+            backup no tiene manifiesto)
+        """
+        if cursor is not None:
+            def fetch(sql):
+                cursor.execute(sql)
+                return cursor.fetchall()
+            return self._compare_with_manifest(backup, fetch)
+        with self.engine.connect() as conn:
+            return self._compare_with_manifest(backup, lambda sql: conn.execute(text(sql)).fetchall())
+
+    def _compare_with_manifest(self, backup: Backup, fetch) -> List[str]:
+        """Compara cada tabla del manifiesto; `fetch(sql)` ejecuta una consulta y devuelve sus filas"""
+        tables = backup.manifest_data.get('tables', {})
+        problems = []
+        existing = {row[0] for row in fetch("SHOW TABLES")}
+        for table, entry in tables.items():
+            if table not in existing:
+                problems.append(f"{table}: la tabla no existe")
+                continue
+            column_names = [col[0] for col in fetch(f"SHOW COLUMNS FROM `{table}`")]
+            if column_names != entry['columns']:
+                # Una migración posterior cambió la tabla: el checksum no es comparable
+                self.logger.warning(f"[Verify] {table}: las columnas cambiaron desde el backup, no se verifica")
+                continue
+            row = fetch(f"SELECT COUNT(*), {self._row_checksum_sql(column_names)} FROM `{table}`")[0]
+            rows, checksum = int(row[0] or 0), int(row[1] or 0)
+            if rows != entry['table_rows']:
+                problems.append(f"{table}: {rows} filas, se esperaban {entry['table_rows']}")
+            elif checksum != entry['table_checksum']:
+                problems.append(f"{table}: el checksum de las filas no coincide")
+        return problems
+
     def get_backup(self, backup_id: int) -> Backup:
         """
         Obtiene un backup específico.
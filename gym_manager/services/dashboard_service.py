@@ -0,0 +1,166 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+from typing import List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from gym_manager.models.member import Miembro
+from gym_manager.models.payment import Pago
+from gym_manager.models.payment_daily_summary import PagoResumenDiario
+from gym_manager.models.payment_method import MetodoPago
+from gym_manager.utils.date_ranges import day_range, month_range, year_range
+
+# Días sin pagos a partir de los cuales una membresía se considera vencida
+DIAS_VENCIMIENTO = 30
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Indicadores del dashboard obtenidos en una sola consulta"""
+    pagos_hoy: float
+    ingresos_mes: float
+    ingresos_anio: float
+    nuevos_miembros_mes: int
+    miembros_activos: int
+    membresias_vencidas: int
+
+    @classmethod
+    def empty(cls) -> 'DashboardSnapshot':
+        """Indicadores en cero (el home los muestra si la consulta falla)"""
+        return cls(0.0, 0.0, 0.0, 0, 0, 0)
+
+
+@dataclass(frozen=True)
+class RecentMember:
+    nombre: str
+    apellido: str
+    fecha_registro: datetime
+    tipo_membresia: Optional[str]
+
+
+@dataclass(frozen=True)
+class RecentPayment:
+    nombre: str
+    apellido: str
+    fecha_pago: datetime
+    monto: float
+    metodo_pago: str
+
+
+class DashboardService:
+    """
+    Servicio de lectura para el dashboard.
+
+    Calcula todos los indicadores con subconsultas escalares en un único
+    SELECT y devuelve dataclasses livianas, sin hidratar objetos del ORM.
+    """
+
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def _rollup_sum(start, end):
+        """Subconsulta escalar: suma del resumen diario en [start, end)"""
+        return select(
+            func.coalesce(func.sum(PagoResumenDiario.total), 0)
+        ).where(
+            PagoResumenDiario.fecha >= start.date(),
+            PagoResumenDiario.fecha < end.date()
+        ).scalar_subquery()
+
+    def snapshot(self, reference: Optional[datetime] = None) -> DashboardSnapshot:
+        """
+        Obtiene los indicadores del dashboard en un solo viaje a la base de datos
+        """
+        reference = reference or datetime.now()
+        month_start, month_end = month_range(reference)
+        fecha_limite = reference - timedelta(days=DIAS_VENCIMIENTO)
+
+        nuevos_miembros = select(func.count(Miembro.id_miembro)).where(
+            Miembro.fecha_registro >= month_start,
+            Miembro.fecha_registro < month_end
+        ).scalar_subquery()
+
+        miembros_activos = select(func.count(Miembro.id_miembro)).where(
+            Miembro.estado == True
+        ).scalar_subquery()
+
+        # Miembros activos cuyo último pago activo es anterior a la fecha límite
+        ultimo_pago = select(
+            Pago.id_miembro,
+            func.max(Pago.fecha_pago).label('ultima_fecha_pago')
+        ).where(
+            Pago.estado == True
+        ).group_by(Pago.id_miembro).subquery()
+        membresias_vencidas = select(func.count(Miembro.id_miembro)).join(
+            ultimo_pago, Miembro.id_miembro == ultimo_pago.c.id_miembro
+        ).where(
+            Miembro.estado == True,
+            ultimo_pago.c.ultima_fecha_pago < fecha_limite
+        ).scalar_subquery()
+
+        try:
+            row = self.db_session.execute(select(
+                self._rollup_sum(*day_range(reference)),
+                self._rollup_sum(month_start, month_end),
+                self._rollup_sum(*year_range(reference.year)),
+                nuevos_miembros,
+                miembros_activos,
+                membresias_vencidas
+            )).one()
+        except Exception as e:
+            self.logger.error(f"Error al obtener indicadores del dashboard: {str(e)}")
+            self.db_session.rollback()
+            raise
+
+        return DashboardSnapshot(
+            pagos_hoy=float(row[0] or 0),
+            ingresos_mes=float(row[1] or 0),
+            ingresos_anio=float(row[2] or 0),
+            nuevos_miembros_mes=int(row[3] or 0),
+            miembros_activos=int(row[4] or 0),
+            membresias_vencidas=int(row[5] or 0),
+        )
+
+    def recent_members(self, limit: int = 5) -> List[RecentMember]:
+        """
+        Obtiene los últimos miembros registrados (solo las columnas que se muestran)
+        """
+        try:
+            rows = self.db_session.execute(
+                select(
+                    Miembro.nombre, Miembro.apellido, Miembro.fecha_registro, Miembro.tipo_membresia
+                ).order_by(
+                    Miembro.fecha_registro.desc(), Miembro.id_miembro.desc()
+                ).limit(limit)
+            ).all()
+        except Exception as e:
+            self.logger.error(f"Error al obtener los miembros recientes: {str(e)}")
+            self.db_session.rollback()
+            return []
+        return [RecentMember(*row) for row in rows]
+
+    def recent_payments(self, limit: int = 5) -> List[RecentPayment]:
+        """
+        Obtiene los últimos pagos registrados (solo las columnas que se muestran)
+        """
+        try:
+            rows = self.db_session.execute(
+                select(
+                    Miembro.nombre, Miembro.apellido, Pago.fecha_pago, Pago.monto, MetodoPago.descripcion
+                ).join(
+                    Miembro, Pago.id_miembro == Miembro.id_miembro
+                ).join(
+                    MetodoPago, Pago.id_metodo_pago == MetodoPago.id_metodo_pago
+                ).order_by(
+                    Pago.fecha_pago.desc(), Pago.id_pago.desc()
+                ).limit(limit)
+            ).all()
+        except Exception as e:
+            self.logger.error(f"Error al obtener los pagos recientes: {str(e)}")
+            self.db_session.rollback()
+            return []
+        return [RecentPayment(*row) for row in rows]
@@ -1,8 +1,8 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from gym_manager.config import DATABASE_URL
+from gym_manager.utils.engines import get_engine
 
-engine = create_engine(DATABASE_URL, echo=True)
+engine = get_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine)
 
 def get_db_session():
@@ -0,0 +1,201 @@
+from datetime import datetime
+import hashlib
+import logging
+from typing import BinaryIO, Optional
+import zlib
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+
+from gym_manager.models.document import Documento
+from gym_manager.models.payment_receipt import ComprobantePago
+from gym_manager.models.routine import Rutina
+
+# Nivel de compresión zlib de los documentos nuevos
+COMPRESSION_LEVEL = 6
+# Tamaño de cada bloque al leer un documento desde la base de datos
+DOCUMENT_CHUNK_SIZE = 256 * 1024
+# Filas con contenido en línea que se migran por transacción
+MIGRATION_BATCH_SIZE = 50
+
+
+class DocumentStore:
+    """
+    Almacén de documentos direccionado por contenido (tabla documentos).
+
+    Cada documento se guarda una sola vez, comprimido, identificado por el
+    SHA-256 del contenido original; comprobantes y rutinas guardan solo el
+    hash y `referencias` cuenta cuántas filas lo usan.
+
+    Los métodos de actualización no hacen commit: se ejecutan dentro de la
+    transacción del llamador, igual que PaymentRollupService.
+    """
+
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        """SHA-256 (hexadecimal) del contenido"""
+        return hashlib.sha256(content).hexdigest()
+
+    def put(self, content: bytes) -> str:
+        """
+        Guarda un documento (o suma una referencia si ya existe)
+
+        Returns:
+            str: hash del documento
+        """
+        digest = self.content_hash(content)
+        compressed = zlib.compress(content, COMPRESSION_LEVEL)
+        if len(compressed) < len(content):
+            data, compression = compressed, 'zlib'
+        else:
+            data, compression = content, 'none'
+        # Un solo INSERT que suma la referencia si el hash ya existe: dos
+        # guardados simultáneos del mismo contenido no chocan con la clave única
+        values = dict(
+            hash=digest,
+            contenido=data,
+            compresion=compression,
+            tamano=len(content),
+            referencias=1,
+            fecha_creacion=datetime.now()
+        )
+        self.db_session.execute(self._upsert(values, {'referencias': Documento.referencias + 1}))
+        return digest
+
+    def _upsert(self, values: dict, changes: dict):
+        """INSERT de un documento que aplica `changes` si el hash ya existe"""
+        if self.db_session.get_bind().dialect.name == 'sqlite':
+            # SQLite (pruebas y herramientas)
+            return sqlite.insert(Documento).values(**values).on_conflict_do_update(
+                index_elements=['hash'], set_=changes
+            )
+        return mysql.insert(Documento).values(**values).on_duplicate_key_update(**changes)
+
+    def release(self, digest: Optional[str]):
+        """
+        Quita una referencia a un documento y lo elimina si ya no se usa.
+
+        Debe llamarse después de desvincular la fila que lo usaba: los cambios
+        pendientes se escriben antes de borrar el documento.
+        """
+        if not digest:
+            return
+        self.db_session.flush()
+        # Decremento atómico en la base, igual que put
+        self.db_session.execute(update(Documento).where(Documento.hash == digest).values(
+            referencias=Documento.referencias - 1
+        ))
+        self.db_session.execute(delete(Documento).where(Documento.hash == digest, Documento.referencias <= 0))
+
+    def get(self, digest: Optional[str]) -> Optional[bytes]:
+        """Obtiene el contenido original de un documento"""
+        if not digest:
+            return None
+        row = self.db_session.query(Documento.contenido, Documento.compresion).filter(
+            Documento.hash == digest
+        ).first()
+        if row is None:
+            return None
+        data, compression = row
+        return zlib.decompress(data) if compression == 'zlib' else data
+
+    def write_to(self, digest: Optional[str], target: BinaryIO,
+                 chunk_size: int = DOCUMENT_CHUNK_SIZE) -> int:
+        """
+        Escribe el contenido original de un documento en `target`, leyéndolo
+        por bloques y descomprimiendo a medida que llega
+
+        Returns:
+            int: cantidad de bytes escritos
+        """
+        if not digest:
+            return 0
+        row = self.db_session.query(func.length(Documento.contenido), Documento.compresion).filter(
+            Documento.hash == digest
+        ).first()
+        if row is None:
+            return 0
+        size, compression = row
+        decompressor = zlib.decompressobj() if compression == 'zlib' else None
+
+        read = 0
+        written = 0
+        while read < (size or 0):
+            # SUBSTRING es 1-indexado
+            chunk = self.db_session.query(
+                func.substring(Documento.contenido, read + 1, chunk_size)
+            ).filter(Documento.hash == digest).scalar()
+            if not chunk:
+                break
+            read += len(chunk)
+            if decompressor is not None:
+                chunk = decompressor.decompress(chunk)
+            target.write(chunk)
+            written += len(chunk)
+        if decompressor is not None:
+            tail = decompressor.flush()
+            target.write(tail)
+            written += len(tail)
+        return written
+
+    def rebuild_references(self) -> int:
+        """
+        Recalcula las referencias de todos los documentos a partir de
+        comprobantes y rutinas, y elimina los que ya no se usan (por ejemplo,
+        después de restaurar un backup)
+
+        Returns:
+            int: cantidad de documentos eliminados
+        """
+        receipts = select(func.count(ComprobantePago.id_comprobante)).where(
+            ComprobantePago.hash_contenido == Documento.hash
+        ).scalar_subquery()
+        routines = select(func.count(Rutina.id_rutina)).where(
+            Rutina.hash_documento == Documento.hash
+        ).scalar_subquery()
+        self.db_session.query(Documento).update(
+            {Documento.referencias: receipts + routines}, synchronize_session=False
+        )
+        deleted = self.db_session.query(Documento).filter(
+            Documento.referencias <= 0
+        ).delete(synchronize_session=False)
+        self.logger.info(f"Referencias de documentos recalculadas: {deleted} documentos sin uso eliminados")
+        return deleted
+
+    def migrate_inline_documents(self, batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+        """
+        Mueve al almacén los comprobantes y rutinas que todavía tienen el
+        documento en línea (filas anteriores a documentos o restauradas de un
+        backup antiguo). Hace commit por lotes para no cargar todos los
+        documentos a la vez.
+
+        Returns:
+            int: cantidad de filas migradas
+        """
+        migrated = 0
+        for model, key, inline, hash_column in (
+            (ComprobantePago, ComprobantePago.id_comprobante, ComprobantePago.contenido, ComprobantePago.hash_contenido),
+            (Rutina, Rutina.id_rutina, Rutina.documento_rutina, Rutina.hash_documento),
+        ):
+            while True:
+                ids = [row[0] for row in self.db_session.query(key).filter(
+                    inline.isnot(None), hash_column.is_(None)
+                ).order_by(key).limit(batch_size).all()]
+                if not ids:
+                    break
+                for row_id in ids:
+                    content = self.db_session.query(inline).filter(key == row_id).scalar()
+                    self.db_session.query(model).filter(key == row_id).update(
+                        {hash_column: self.put(content), inline: None}, synchronize_session=False
+                    )
+                self.db_session.commit()
+                migrated += len(ids)
+
+        if migrated:
+            self.logger.info(f"Documentos en línea migrados al almacén: {migrated}")
+        return migrated
@@ -1,8 +1,8 @@
-import pandas as pd
 from datetime import datetime
-from fpdf import FPDF
 import os
 
+# pandas y fpdf son pesados: se importan dentro de cada exportación
+
 def get_downloads_path():
     """
     Obtiene la ruta de la carpeta de descargas del usuario
@@ -33,6 +33,7 @@ def export_members_to_excel(members, file_path=None):
             'Fecha de Registro': m.fecha_registro.strftime('%d/%m/%Y') if m.fecha_registro else '',
             'Condiciones Médicas': m.informacion_medica or ''
         })
+    import pandas as pd
     df = pd.DataFrame(data)
     if not file_path:
         downloads_path = get_downloads_path()
@@ -50,6 +51,7 @@ def export_members_to_pdf(members, file_path=None):
     if not file_path:
         downloads_path = get_downloads_path()
         file_path = os.path.join(downloads_path, f"reporte_miembros_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
+    from fpdf import FPDF
     pdf = FPDF(orientation='L', unit='mm', format='A4')
     pdf.add_page()
     pdf.set_font('Arial', 'B', 14)
@@ -0,0 +1,168 @@
+from datetime import date, datetime
+import logging
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+
+from gym_manager.models.member import Miembro
+from gym_manager.models.payment import Pago
+from gym_manager.models.payment_daily_summary import PagoResumenDiario
+
+
+class PaymentRollupService:
+    """
+    Mantiene la tabla pagos_resumen_diario (fecha × método de pago × tipo de
+    membresía → cantidad, total) a partir de los pagos activos.
+
+    Los métodos de actualización no hacen commit: se ejecutan dentro de la
+    transacción del llamador para que el resumen y los pagos queden siempre
+    consistentes.
+    """
+
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def _as_date(value) -> date:
+        """Normaliza un datetime/date a date"""
+        return value.date() if isinstance(value, datetime) else value
+
+    def _membership_type(self, id_miembro: int) -> str:
+        """Obtiene el tipo de membresía actual del miembro"""
+        return self.db_session.query(Miembro.tipo_membresia).filter(
+            Miembro.id_miembro == id_miembro
+        ).scalar()
+
+    def _apply(self, fecha, id_metodo_pago: int, tipo_membresia: str, cantidad: int, total: float):
+        """
+        Suma (o resta) una variación a la fila del resumen correspondiente.
+
+        Las sumas son un upsert atómico (INSERT ... ON DUPLICATE KEY UPDATE):
+        dos pagos concurrentes del mismo día, método y tipo no pueden
+        insertar la misma fila dos veces. Las restas actualizan la fila
+        existente y la eliminan si queda sin pagos.
+        """
+        key = (
+            PagoResumenDiario.fecha == self._as_date(fecha),
+            PagoResumenDiario.id_metodo_pago == id_metodo_pago,
+            PagoResumenDiario.tipo_membresia == tipo_membresia,
+        )
+        changes = {
+            'cantidad': PagoResumenDiario.cantidad + cantidad,
+            'total': func.round(PagoResumenDiario.total + total, 2),
+        }
+
+        if cantidad > 0:
+            self.db_session.execute(self._upsert({
+                'fecha': self._as_date(fecha),
+                'id_metodo_pago': id_metodo_pago,
+                'tipo_membresia': tipo_membresia,
+                'cantidad': cantidad,
+                'total': round(total, 2),
+            }, changes))
+            return
+
+        self.db_session.execute(update(PagoResumenDiario).where(*key).values(**changes))
+        self.db_session.execute(delete(PagoResumenDiario).where(*key, PagoResumenDiario.cantidad <= 0))
+
+    def _upsert(self, values: dict, changes: dict):
+        """INSERT de una fila del resumen que aplica `changes` si la clave ya existe"""
+        if self.db_session.get_bind().dialect.name == 'sqlite':
+            # SQLite (pruebas y herramientas)
+            return sqlite.insert(PagoResumenDiario).values(**values).on_conflict_do_update(
+                index_elements=['fecha', 'id_metodo_pago', 'tipo_membresia'], set_=changes
+            )
+        return mysql.insert(PagoResumenDiario).values(**values).on_duplicate_key_update(**changes)
+
+    def add_payment(self, pago: Pago):
+        """Registra un pago en el resumen (solo si está activo)"""
+        if not pago.estado:
+            return
+        self._apply(pago.fecha_pago, pago.id_metodo_pago,
+                    self._membership_type(pago.id_miembro), 1, pago.monto)
+
+    def remove_payment(self, pago: Pago):
+        """Quita un pago del resumen (solo si estaba activo)"""
+        if not pago.estado:
+            return
+        self._apply(pago.fecha_pago, pago.id_metodo_pago,
+                    self._membership_type(pago.id_miembro), -1, -pago.monto)
+
+    def move_member(self, id_miembro: int, old_type: str, new_type: str):
+        """
+        Traslada los pagos activos de un miembro de un tipo de membresía a otro
+        """
+        if old_type == new_type:
+            return
+        day = func.date(Pago.fecha_pago)
+        rows = self.db_session.query(
+            day, Pago.id_metodo_pago, func.count(Pago.id_pago), func.sum(Pago.monto)
+        ).filter(
+            Pago.id_miembro == id_miembro,
+            Pago.estado == True
+        ).group_by(day, Pago.id_metodo_pago).all()
+
+        for fecha, id_metodo_pago, cantidad, total in rows:
+            if isinstance(fecha, str):
+                fecha = date.fromisoformat(fecha)
+            self._apply(fecha, id_metodo_pago, old_type, -cantidad, -(total or 0))
+            self._apply(fecha, id_metodo_pago, new_type, cantidad, total or 0)
+
+    def rebuild(self) -> int:
+        """
+        Reconstruye el resumen completo a partir del historial de pagos
+
+        Returns:
+            int: cantidad de filas generadas
+        """
+        day = func.date(Pago.fecha_pago)
+        source = select(
+            day,
+            Pago.id_metodo_pago,
+            Miembro.tipo_membresia,
+            func.count(Pago.id_pago),
+            func.sum(Pago.monto)
+        ).join(
+            Miembro, Pago.id_miembro == Miembro.id_miembro
+        ).where(
+            Pago.estado == True
+        ).group_by(day, Pago.id_metodo_pago, Miembro.tipo_membresia)
+
+        self.db_session.query(PagoResumenDiario).delete(synchronize_session=False)
+        self.db_session.execute(
+            insert(PagoResumenDiario).from_select(
+                ['fecha', 'id_metodo_pago', 'tipo_membresia', 'cantidad', 'total'],
+                source
+            )
+        )
+        count = self.db_session.query(func.count()).select_from(PagoResumenDiario).scalar() or 0
+        self.logger.info(f"Resumen diario de pagos reconstruido: {count} filas")
+        return count
+
+    def ensure_built(self) -> bool:
+        """
+        Reconstruye el resumen si está vacío pero existen pagos activos
+        (por ejemplo, la primera vez que se crea la tabla en una base existente)
+
+        Returns:
+            bool: True si se reconstruyó
+        """
+        has_rollup = self.db_session.query(PagoResumenDiario.fecha).first() is not None
+        if has_rollup:
+            return False
+        has_payments = self.db_session.query(Pago.id_pago).filter(Pago.estado == True).first() is not None
+        if not has_payments:
+            return False
+        self.rebuild()
+        self.db_session.commit()
+        return True
+
+    def sum_between(self, start, end) -> float:
+        """Suma de pagos activos con fecha en el rango [start, end)"""
+        total = self.db_session.query(func.sum(PagoResumenDiario.total)).filter(
+            PagoResumenDiario.fecha >= self._as_date(start),
+            PagoResumenDiario.fecha < self._as_date(end)
+        ).scalar()
+        return float(total or 0)
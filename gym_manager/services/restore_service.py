@@ -3,23 +3,42 @@ import logging
 from datetime import datetime
 from pathlib import Path
 from sqlalchemy.orm import Session
-from sqlalchemy import text, create_engine
+from sqlalchemy import create_engine, text
 from gym_manager.models.backup import Backup
-from gym_manager.services.backup_service import BackupService
+from gym_manager.services.backup_codec import CODEC_BUFFER_SIZE, open_backup_reader
+from gym_manager.services.backup_rows import RowsArchive, is_rows_archive
+from gym_manager.services.backup_service import BLOB_HEX_HEADER, BackupService
+from gym_manager.services.document_store import DocumentStore
+from gym_manager.services.payment_rollup_service import PaymentRollupService
+from gym_manager.utils.sql_tokenizer import iter_sql_statements, statement_table, wrap_insert_values
+from gym_manager.utils.cache import query_cache
+from gym_manager.utils.engines import get_engine
 import traceback
-from typing import List, Optional, Tuple, Dict, Set
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Optional, Tuple, Dict, Set
 # from dotenv import load_dotenv
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 import flet as ft
-import sqlparse
 import re
-import base64
+import shutil
+import tempfile
 import sys
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Caracteres de una sentencia que se incluyen en el log (los INSERT extendidos pueden ocupar MB)
+STATEMENT_LOG_CHARS = 500
+# Filas por llamada a executemany al cargar un backup por filas (pymysql las
+# agrupa en INSERT de varias filas de hasta ~1 MB)
+BULK_INSERT_ROWS = 5000
+# Hilos de carga por defecto: con 1 toda la restauración (borrado, carga y
+# verificación) es una sola transacción que se revierte completa si algo falla.
+# Más de 1 es opcional y confirma cada tabla por separado.
+RESTORE_WORKERS = 1
+
 class RestoreService:
     """
     Servicio para restaurar backups de la base de datos.
@@ -28,9 +47,15 @@ class RestoreService:
     de la base de datos MySQL.
     """
     
-    def __init__(self, db_session: Session, page: ft.Page = None):
+    def __init__(self, db_session: Session, page: ft.Page = None, workers: int = RESTORE_WORKERS):
         self.db_session = db_session
         self.page = page
+        # Tablas cargadas en paralelo (opcional); con 1 toda la restauración es una sola transacción
+        self.workers = max(1, workers)
+        # Si el servidor acepta LOAD DATA LOCAL INFILE (se consulta en la primera carga)
+        self._local_infile = None
+        # Tablas que ya existen en la base (se consulta al iniciar cada restauración)
+        self._existing_tables: Set[str] = set()
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
         
@@ -58,14 +83,10 @@ class RestoreService:
             
         self.logger.info(f"[Restore] Usando base de datos: {self.DATABASE_URL}")
         
-        # Crear engine con la misma configuración que el sistema principal
-        self.engine = create_engine(
-            self.DATABASE_URL,
-            pool_size=5,
-            max_overflow=10,
-            pool_timeout=30,
-            pool_recycle=3600
-        )
+        # Engine compartido con el resto de la aplicación (mismo pool de conexiones)
+        self.engine = get_engine(self.DATABASE_URL)
+        # Engine sin pool para las conexiones con LOAD DATA LOCAL INFILE (se crea al usarlo)
+        self._infile_engine = None
         
         # Inicializar servicio de backup para crear backups de seguridad
         self.backup_service = BackupService(db_session)
@@ -100,19 +121,20 @@ class RestoreService:
             )
             self.logger.info(f"[Restore] Backup de seguridad creado: {security_backup.name}")
             
-            # Preparar el backup
-            backup_path = Path(backup.file_path)
-            if not backup_path.is_absolute():
-                # Intentar resolver en carpeta de datos de usuario primero
-                data_root = Path(os.getenv('LOCALAPPDATA', str(Path.home()))) / 'GymManager' / 'backups'
-                candidate = data_root / backup_path.name
-                backup_path = candidate if candidate.exists() else (Path(__file__).parent.parent.parent / backup_path)
-            
-            if not backup_path.exists():
-                return False, f"Archivo de backup no encontrado: {backup_path}"
-            
-            # Ejecutar la restauración
-            self._execute_restore(backup_path)
+            # Preparar el backup completo y sus incrementales
+            backup_paths = self._get_chain_paths(backup)
+            missing = [path for path in backup_paths if not path.exists()]
+            if missing:
+                return False, f"Archivo de backup no encontrado: {missing[0]}"
+            
+            # Ejecutar la restauración (verifica contra el manifiesto antes del commit)
+            problems = self._execute_restore(backup_paths, backup)
+            if problems:
+                return False, self._verify_failed_message(problems, security_backup)
+            self._rebuild_payment_rollup()
+            self._rebuild_documents()
+            # Los datos se reemplazaron por fuera del ORM: descartar toda la cache
+            query_cache.clear()
             
             self.logger.info(f"[Restore] Backup {backup.name} restaurado exitosamente")
             return True, "La restauración se ha completado correctamente."
@@ -161,20 +183,22 @@ class RestoreService:
             if progress_callback:
                 progress_callback(40, "Preparando archivo de backup...", "Validando integridad del archivo", "~2 minutos")
                 
-            backup_path = Path(backup.file_path)
-            if not backup_path.is_absolute():
-                data_root = Path(os.getenv('LOCALAPPDATA', str(Path.home()))) / 'GymManager' / 'backups'
-                candidate = data_root / backup_path.name
-                backup_path = candidate if candidate.exists() else (Path(__file__).parent.parent.parent / backup_path)
-            
-            if not backup_path.exists():
-                return False, f"Archivo de backup no encontrado: {backup_path}"
+            backup_paths = self._get_chain_paths(backup)
+            missing = [path for path in backup_paths if not path.exists()]
+            if missing:
+                return False, f"Archivo de backup no encontrado: {missing[0]}"
             
             # Paso 4: Ejecutar restauración (40% - 90%)
             if progress_callback:
                 progress_callback(40, "Iniciando restauración...", "Limpiando datos existentes", "~1.5 minutos")
                 
-            self._execute_restore_with_progress(backup_path, progress_callback)
+            problems = self._execute_restore_with_progress(backup_paths, progress_callback, backup)
+            if problems:
+                return False, self._verify_failed_message(problems, security_backup)
+            self._rebuild_payment_rollup()
+            self._rebuild_documents()
+            # Los datos se reemplazaron por fuera del ORM: descartar toda la cache
+            query_cache.clear()
             
             # Paso 5: Finalización (90% - 100%)
             if progress_callback:
@@ -188,142 +212,538 @@ class RestoreService:
             self.logger.error(traceback.format_exc())
             return False, f"Ocurrió un error durante la restauración: {str(e)}"
 
-    def _execute_restore(self, backup_path: Path):
+    def _verify_restore(self, backup: Optional[Backup], cursor=None) -> List[str]:
+        """
+        Compara las tablas restauradas con el manifiesto del backup. Se hace
+        antes de reconstruir las tablas derivadas (resumen de pagos y
+        documentos), que cambian después de la carga; con `cursor`, dentro de
+        la transacción de la restauración.
+        """
+        if backup is None:
+            return []
+        if not backup.manifest:
+            self.logger.info(f"[Restore] {backup.name} no tiene manifiesto de integridad: no se verifica")
+            return []
+        problems = self.backup_service.verify_restored(backup, cursor)
+        for problem in problems:
+            self.logger.error(f"[Restore] Verificación fallida: {problem}")
+        if not problems:
+            self.logger.info(f"[Restore] Tablas verificadas contra el manifiesto de {backup.name}")
+        return problems
+
+    def _verify_failed_message(self, problems: List[str], security_backup: Backup) -> str:
+        if self.workers == 1:
+            return (f"Los datos restaurados no coinciden con el backup ({'; '.join(problems[:5])}). "
+                    f"La restauración se revirtió y la base de datos no cambió.")
+        return (f"Los datos restaurados no coinciden con el backup ({'; '.join(problems[:5])}). "
+                f"Puede volver al estado anterior con el backup de seguridad {security_backup.name}.")
+
+    def _rebuild_payment_rollup(self):
+        """
+        Reconstruye el resumen diario de pagos a partir de los pagos restaurados
+        (los backups anteriores a la tabla no la incluyen)
+        """
+        session = sessionmaker(bind=self.engine)()
+        try:
+            PaymentRollupService(session).rebuild()
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"[Restore] Error al reconstruir el resumen diario de pagos: {str(e)}")
+            raise
+        finally:
+            session.close()
+
+    def _rebuild_documents(self):
+        """
+        Recalcula las referencias del almacén de documentos y mueve a él los
+        documentos en línea (los backups anteriores al almacén los incluyen así)
+        """
+        session = sessionmaker(bind=self.engine)()
+        try:
+            store = DocumentStore(session)
+            store.rebuild_references()
+            session.commit()
+            store.migrate_inline_documents()
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"[Restore] Error al reconstruir el almacén de documentos: {str(e)}")
+            raise
+        finally:
+            session.close()
+
+    def _resolve_backup_path(self, backup: Backup) -> Path:
+        """Resuelve la ruta del archivo de un backup"""
+        backup_path = Path(backup.file_path)
+        if not backup_path.is_absolute():
+            # Intentar resolver en carpeta de datos de usuario primero
+            data_root = Path(os.getenv('LOCALAPPDATA', str(Path.home()))) / 'GymManager' / 'backups'
+            candidate = data_root / backup_path.name
+            backup_path = candidate if candidate.exists() else (Path(__file__).parent.parent.parent / backup_path)
+        return backup_path
+
+    def _get_chain_paths(self, backup: Backup) -> List[Path]:
+        """
+        Obtiene los archivos a aplicar para restaurar un backup: el backup
+        completo seguido de sus incrementales en orden
+        """
+        chain = self.backup_service.get_backup_chain(backup)
+        if len(chain) > 1:
+            self.logger.info(f"[Restore] Cadena de restauración: {' -> '.join(item.name for item in chain)}")
+        return [self._resolve_backup_path(item) for item in chain]
+
+    @staticmethod
+    def _uses_base64_blobs(backup_path: Path) -> bool:
+        """Indica si un backup SQL es anterior a los literales X'..' y guarda los BLOB en Base64"""
+        with open_backup_reader(backup_path) as reader:
+            return BLOB_HEX_HEADER not in reader.read(4096)
+
+    def _iter_backup_statements(self, backup_paths: List[Path], progress_callback=None,
+                                start: float = 60, end: float = 95,
+                                blob_columns: Optional[Dict[str, Set[str]]] = None) -> Iterator[str]:
+        """
+        Genera las sentencias SQL de los archivos de backup (comprimidos o no)
+        a medida que se leen, sin cargar el archivo en memoria.
+
+        En los backups que guardan los BLOB en Base64, los valores de
+        `blob_columns` (tabla -> columnas) se envuelven en FROM_BASE64 para
+        que el servidor los decodifique.
+
+        El progreso se informa entre `start` y `end` según los bytes leídos
+        del total de los archivos.
+        """
+        total_bytes = sum(path.stat().st_size for path in backup_paths) or 1
+        done_bytes = 0
+        last_reported = None
+        for backup_path in backup_paths:
+            base64_blobs = bool(blob_columns) and self._uses_base64_blobs(backup_path)
+            if base64_blobs:
+                self.logger.info(f"[Restore] {backup_path.name} guarda los BLOB en Base64: se decodifican con FROM_BASE64")
+            with open_backup_reader(backup_path) as reader:
+                for stmt in iter_sql_statements(reader):
+                    if base64_blobs:
+                        columns = blob_columns.get(self._statement_table(stmt))
+                        if columns:
+                            stmt = wrap_insert_values(stmt, columns, 'FROM_BASE64')
+                    yield stmt
+                    if progress_callback:
+                        read_bytes = done_bytes + reader.bytes_read
+                        progress = start + (read_bytes / total_bytes) * (end - start)
+                        # Informar solo cuando cambia el porcentaje entero
+                        if int(progress) != last_reported:
+                            last_reported = int(progress)
+                            progress_callback(
+                                progress, "Restaurando datos...",
+                                f"{read_bytes / (1024 * 1024):.1f} de {total_bytes / (1024 * 1024):.1f} MB leídos",
+                                "~15 segundos"
+                            )
+            done_bytes += backup_path.stat().st_size
+
+    @staticmethod
+    def _get_max_allowed_packet(cursor) -> int:
+        """Obtiene max_allowed_packet del servidor"""
+        cursor.execute("SELECT @@max_allowed_packet")
+        return int(cursor.fetchone()[0])
+
+    @staticmethod
+    def _check_statement_size(stmt: str, max_packet: int):
+        """Verifica que la sentencia no supere max_allowed_packet del servidor"""
+        # Un carácter ocupa como máximo 4 bytes en UTF-8: solo se codifica si puede superar el límite
+        if len(stmt) * 4 < max_packet:
+            return
+        stmt_bytes = len(stmt.encode('utf-8'))
+        if stmt_bytes >= max_packet:
+            raise ValueError(
+                f"El backup contiene una sentencia de {stmt_bytes} bytes y el servidor "
+                f"admite como máximo {max_packet} (max_allowed_packet)"
+            )
+
+    def _execute_restore(self, backup_paths: List[Path], backup: Optional[Backup] = None) -> List[str]:
         """
         Ejecuta la restauración del backup.
         
         Args:
-            backup_path (Path): Ruta al archivo de backup
+            backup_paths (List[Path]): Archivos a aplicar en orden (completo + incrementales)
+            backup (Backup): backup restaurado, para verificarlo contra su manifiesto
+
+        Returns:
+            List[str]: diferencias con el manifiesto (vacía si coincide)
         """
-        conn = None
-        cursor = None
-        try:
-            # Obtener una conexión directa a MySQL
-            conn = self.engine.raw_connection()
-            cursor = conn.cursor()
-            
-            self.logger.info(f"[Restore] Iniciando restauración desde: {backup_path}")
-            
-            # Obtener lista de tablas excluyendo backups
-            cursor.execute("""
-                SELECT table_name 
-                FROM information_schema.tables 
-                WHERE table_schema = DATABASE() 
-                AND table_name != 'backups'
-            """)
-            tables = [row[0] for row in cursor.fetchall()]
-            
-            # Obtener dependencias de claves foráneas
-            cursor.execute("""
-                SELECT 
-                    table_name,
-                    referenced_table_name
-                FROM information_schema.key_column_usage
-                WHERE referenced_table_name IS NOT NULL
-                AND table_schema = DATABASE()
-            """)
-            dependencies = cursor.fetchall()
-            
-            # Construir grafo de dependencias
-            dependency_graph = {table: set() for table in tables}
-            for table, referenced_table in dependencies:
-                if referenced_table in dependency_graph:
-                    dependency_graph[table].add(referenced_table)
-            
-            # Ordenar tablas por dependencias (topological sort)
-            ordered_tables = []
-            visited = set()
-            
-            def visit(table):
-                if table in visited:
-                    return
-                visited.add(table)
-                for dep in dependency_graph[table]:
-                    visit(dep)
-                ordered_tables.append(table)
-            
-            for table in tables:
-                visit(table)
-            
-            # Eliminar datos en orden inverso
-            self.logger.info("[Restore] Eliminando datos existentes...")
-            for table in reversed(ordered_tables):
-                try:
-                    cursor.execute(f"DELETE FROM `{table}`")
-                    self.logger.info(f"[Restore] Datos eliminados de la tabla: {table}")
-                except Exception as e:
-                    self.logger.error(f"[Restore] Error al eliminar datos de {table}: {str(e)}")
-                    raise
+        return self._execute_restore_with_progress(backup_paths, backup=backup)
+
+    @staticmethod
+    def _sort_tables_by_dependencies(tables: List[str], dependency_graph: Dict[str, Set[str]]) -> List[str]:
+        """Ordena las tablas de modo que cada una quede después de las que referencia (topological sort)"""
+        ordered_tables = []
+        visited = set()
+
+        def visit(table):
+            if table in visited:
+                return
+            visited.add(table)
+            for dep in dependency_graph[table]:
+                visit(dep)
+            ordered_tables.append(table)
+
+        for table in tables:
+            visit(table)
+        return ordered_tables
+
+    @staticmethod
+    def _dependency_levels(ordered_tables: List[str], dependency_graph: Dict[str, Set[str]]) -> List[List[str]]:
+        """
+        Agrupa las tablas en niveles: cada tabla queda un nivel después de la
+        más profunda de las que referencia, así las de un mismo nivel son
+        independientes entre sí
+        """
+        levels = {}
+        for table in ordered_tables:
+            dep_levels = [levels[dep] for dep in dependency_graph.get(table, ()) if dep != table and dep in levels]
+            levels[table] = max(dep_levels) + 1 if dep_levels else 0
+        grouped = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+        for table in ordered_tables:
+            grouped[levels[table]].append(table)
+        return grouped
+
+    @staticmethod
+    def _levels_for_tables(levels: List[List[str]], tables: Iterable[str]) -> List[List[str]]:
+        """
+        Filtra los niveles de dependencias a las tablas indicadas; las que no
+        existen en la base actual (sin dependencias conocidas) van al primer nivel
+        """
+        tables = list(tables)
+        known = {table for level in levels for table in level}
+        extra = [table for table in tables if table not in known]
+        present = set(tables)
+        return [
+            [table for table in level if table in present] + (extra if i == 0 else [])
+            for i, level in enumerate(levels or [[]])
+        ]
+
+    @staticmethod
+    def _statement_table(stmt: str) -> Optional[str]:
+        """Obtiene la tabla afectada por una sentencia del backup (None si no afecta a una tabla)"""
+        return statement_table(stmt)
 
-            # Leer y parsear el archivo de backup línea por línea
-            statements = []
-            current_stmt = ""
+    def _load_tables_parallel(self, statements: Iterable[str], levels: List[List[str]],
+                              max_packet: int, progress_callback=None,
+                              start: float = 70, end: float = 95):
+        """
+        Carga los datos agrupando las sentencias por tabla y ejecutando las
+        tablas de cada nivel de dependencias en paralelo, cada una con su
+        propia conexión y FOREIGN_KEY_CHECKS=0.
+
+        Las sentencias se reparten en archivos temporales por tabla a medida
+        que se leen, para no mantener el backup completo en memoria.
 
-            with open(backup_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    stripped = line.strip()
-                    if not stripped or stripped.startswith('--') or stripped.startswith('/*') or stripped.startswith('/*!'):
+        Cada tabla se confirma por separado: si una falla, las ya cargadas
+        quedan restauradas (el backup de seguridad permite volver atrás).
+        """
+        with tempfile.TemporaryDirectory(prefix="gym_restore_") as tmp_dir:
+            session_statements = []
+            table_files: Dict[str, Path] = {}
+            writers = {}
+            try:
+                for stmt in statements:
+                    self._check_statement_size(stmt, max_packet)
+                    table = self._statement_table(stmt)
+                    if table is None:
+                        session_statements.append(stmt)
                         continue
+                    if table not in writers:
+                        table_files[table] = Path(tmp_dir) / f"{len(table_files):04d}.sql"
+                        writers[table] = open(table_files[table], 'w', encoding='utf-8')
+                    writers[table].write(stmt)
+                    writers[table].write("\n")
+            finally:
+                for writer in writers.values():
+                    writer.close()
+
+            levels = self._levels_for_tables(levels, table_files)
+            total_tables = len(table_files)
+            loaded = 0
+            executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="restore")
+            try:
+                for level in levels:
+                    futures = {
+                        executor.submit(self._load_table, table, session_statements, table_files[table]): table
+                        for table in level
+                    }
+                    for future in as_completed(futures):
+                        future.result()
+                        loaded += 1
+                        if progress_callback:
+                            progress = start + (loaded / total_tables) * (end - start)
+                            progress_callback(progress, f"Tabla restaurada: {futures[future]}",
+                                              f"Tabla {loaded} de {total_tables} ({self.workers} en paralelo)", "~15 segundos")
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def _load_table(self, table: str, session_statements: List[str], statements_path: Path) -> int:
+        """Ejecuta las sentencias de una tabla (leídas de su archivo temporal) con una conexión propia del pool"""
+        conn = self.engine.raw_connection()
+        cursor = conn.cursor()
+        executed = 0
+        try:
+            cursor.execute("SET FOREIGN_KEY_CHECKS=0")
+            for stmt in session_statements:
+                cursor.execute(stmt)
+            with open(statements_path, 'r', encoding='utf-8') as f:
+                for stmt in iter_sql_statements(f):
+                    executed += 1
+                    try:
+                        cursor.execute(stmt)
+                    except Exception as e:
+                        self.logger.error(f"[Restore] Error en sentencia {executed} de la tabla {table}: {str(e)}")
+                        self.logger.error(f"[Restore] Sentencia problemática: {stmt[:STATEMENT_LOG_CHARS]}")
+                        raise
+            conn.commit()
+            self.logger.info(f"[Restore] Tabla {table} restaurada ({executed} sentencias)")
+            return executed
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _is_existing_table_create(self, stmt: str) -> bool:
+        """
+        Indica si la sentencia es un CREATE TABLE de una tabla que ya existe:
+        no cambia nada y en MySQL confirmaría implícitamente la transacción
+        de la restauración, por lo que se omite
+        """
+        return stmt.lstrip()[:12].upper() == 'CREATE TABLE' and self._statement_table(stmt) in self._existing_tables
+
+    def _execute_statements(self, cursor, statements: Iterable[str], max_packet: int) -> int:
+        """Ejecuta las sentencias de un backup SQL en la conexión actual, una por una"""
+        i = 0
+        for stmt in statements:
+            if self._is_existing_table_create(stmt):
+                continue
+            i += 1
+            try:
+                self._check_statement_size(stmt, max_packet)
+                self.logger.debug(f"[Restore] Ejecutando sentencia {i}")
+                cursor.execute(stmt)
+
+            except Exception as e:
+                self.logger.error(f"[Restore] Error en sentencia {i}: {str(e)}")
+                self.logger.error(f"[Restore] Sentencia problemática: {stmt[:STATEMENT_LOG_CHARS]}")
+                raise
+        self.logger.info(f"[Restore] Se ejecutaron {i} sentencias SQL")
+        return i
+
+    def _restore_rows_archive(self, backup_path: Path, cursor, levels: List[List[str]],
+                              progress_callback=None, start: float = 60, end: float = 95):
+        """
+        Restaura un backup por filas con carga masiva (ver _bulk_load_table).
+
+        Con un solo worker todo se carga con `cursor`, dentro de la transacción
+        de la restauración; con más, las tablas de cada nivel de dependencias
+        se cargan en paralelo, cada una con su conexión y su propia transacción.
+        """
+        with RowsArchive(backup_path) as archive:
+            entries = {entry['name']: entry for entry in archive.tables}
+            levels = self._levels_for_tables(levels, entries)
+            total_tables = len(entries)
+            loaded = 0
+
+            def report(table):
+                if progress_callback:
+                    progress = start + (loaded / total_tables) * (end - start)
+                    progress_callback(progress, f"Tabla restaurada: {table}",
+                                      f"Tabla {loaded} de {total_tables} ({backup_path.name})", "~15 segundos")
 
-                    current_stmt += line
-                    if stripped.endswith(';'):
-                        statements.append(current_stmt.strip())
-                        current_stmt = ""
+            if self.workers == 1:
+                for level in levels:
+                    for table in level:
+                        self._bulk_load_table(cursor, archive, entries[table])
+                        loaded += 1
+                        report(table)
+                return
 
-            # En caso de que haya una última sentencia sin punto y coma (raro, pero seguro)
-            if current_stmt.strip():
-                statements.append(current_stmt.strip())
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="restore")
+        try:
+            for level in levels:
+                futures = {
+                    executor.submit(self._load_rows_table, backup_path, entries[table]): table
+                    for table in level
+                }
+                for future in as_completed(futures):
+                    future.result()
+                    loaded += 1
+                    report(futures[future])
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _raw_connection(self, local_infile: bool = False):
+        """
+        Conexión directa para la restauración. Con local_infile se abre una
+        conexión propia, fuera del pool compartido, con LOAD DATA LOCAL INFILE
+        habilitado del lado del cliente; se cierra del todo al cerrarla.
+        """
+        if not local_infile or self.engine.url.get_backend_name() != 'mysql':
+            return self.engine.raw_connection()
+        if self._infile_engine is None:
+            self._infile_engine = create_engine(
+                self.engine.url, poolclass=NullPool, connect_args={'local_infile': True}
+            )
+        return self._infile_engine.raw_connection()
+
+    def _load_rows_table(self, backup_path: Path, entry: dict) -> int:
+        """Carga una tabla de un backup por filas con una conexión propia (LOAD DATA LOCAL INFILE)"""
+        conn = self._raw_connection(local_infile=True)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SET FOREIGN_KEY_CHECKS=0")
+            with RowsArchive(backup_path) as archive:
+                loaded = self._bulk_load_table(cursor, archive, entry)
+            conn.commit()
+            return loaded
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
 
+    def _bulk_load_table(self, cursor, archive: RowsArchive, entry: dict) -> int:
+        """
+        Carga una tabla de un backup por filas: crea la tabla si no existe,
+        la vacía si el backup la reemplaza y carga las filas con LOAD DATA
+        LOCAL INFILE si el servidor lo permite, o con executemany por lotes.
 
-            self.logger.info(f"[Restore] Se encontraron {len(statements)} sentencias SQL para ejecutar")
-            if statements:
-                self.logger.debug(f"[Restore] Primera sentencia: {statements[0]}")
+        Returns:
+            int: filas cargadas
+        """
+        table = entry['name']
+        try:
+            if entry.get('create') and table not in self._existing_tables:
+                cursor.execute(entry['create'])
+            if entry['mode'] == 'replace':
+                cursor.execute(f"DELETE FROM `{table}`")
+            if not entry['rows']:
+                return 0
 
-            # Ejecutar cada sentencia
-            for i, stmt in enumerate(statements, 1):
+            if self._local_infile_enabled(cursor):
                 try:
-                    if not stmt:
-                        continue
-                    
-                    self.logger.debug(f"[Restore] Ejecutando sentencia {i}/{len(statements)}")
-                    cursor.execute(stmt)
-                    
+                    self._load_data_infile(cursor, archive, entry)
+                    self.logger.info(f"[Restore] Tabla {table} restaurada con LOAD DATA ({entry['rows']} filas)")
+                    return entry['rows']
                 except Exception as e:
-                    self.logger.error(f"[Restore] Error en sentencia {i}: {str(e)}")
-                    self.logger.error(f"[Restore] Sentencia problemática: {stmt}")
-                    raise
-            
-            # Hacer commit de todos los cambios
-            conn.commit()
-            self.logger.info("[Restore] Restauración completada exitosamente")
-            
+                    # Un error de LOAD DATA no aborta la transacción: seguir con executemany
+                    self.logger.warning(f"[Restore] LOAD DATA LOCAL INFILE no disponible ({str(e)}); se usa executemany")
+                    self._local_infile = False
+
+            loaded = self._insert_rows(cursor, archive, entry)
+            self.logger.info(f"[Restore] Tabla {table} restaurada ({loaded} filas)")
+            return loaded
         except Exception as e:
-            self.logger.error(f"[Restore] Error durante la restauración: {str(e)}")
-            if conn:
-                conn.rollback()
+            self.logger.error(f"[Restore] Error al cargar la tabla {table}: {str(e)}")
             raise
+
+    def _local_infile_enabled(self, cursor) -> bool:
+        """Indica si el servidor acepta LOAD DATA LOCAL INFILE (se consulta una sola vez)"""
+        if self._local_infile is None:
+            try:
+                cursor.execute("SHOW VARIABLES LIKE 'local_infile'")
+                row = cursor.fetchone()
+                self._local_infile = bool(row) and str(row[1]).upper() in ('ON', '1')
+            except Exception:
+                self._local_infile = False
+        return self._local_infile
+
+    def _load_data_infile(self, cursor, archive: RowsArchive, entry: dict):
+        """
+        Carga los datos de una tabla con LOAD DATA LOCAL INFILE: el TSV se
+        descomprime a un archivo temporal y los BLOB se decodifican en el
+        servidor con UNHEX
+        """
+        blob_columns = set(entry['blob_columns'])
+        targets = []
+        assignments = []
+        for i, col in enumerate(entry['columns']):
+            if col in blob_columns:
+                targets.append(f"@v{i}")
+                assignments.append(f"`{col}` = UNHEX(@v{i})")
+            else:
+                targets.append(f"`{col}`")
+
+        tmp = tempfile.NamedTemporaryFile(prefix="gym_restore_", suffix=".tsv", delete=False)
+        try:
+            with tmp, archive.open_data(entry) as data:
+                shutil.copyfileobj(data, tmp, CODEC_BUFFER_SIZE)
+            # MySQL acepta '/' como separador también en Windows
+            infile = tmp.name.replace('\\', '/').replace("'", "\\'")
+            stmt = (
+                f"LOAD DATA LOCAL INFILE '{infile}' INTO TABLE `{entry['name']}` "
+                f"CHARACTER SET utf8mb4 ({', '.join(targets)})"
+            )
+            if assignments:
+                stmt += " SET " + ", ".join(assignments)
+            cursor.execute(stmt)
         finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+            os.unlink(tmp.name)
 
-    def _execute_restore_with_progress(self, backup_path: Path, progress_callback=None):
+    def _insert_rows(self, cursor, archive: RowsArchive, entry: dict) -> int:
+        """Carga los datos de una tabla con INSERT parametrizados (executemany) por lotes"""
+        columns = entry['columns']
+        blob_indexes = [i for i, col in enumerate(columns) if col in set(entry['blob_columns'])]
+        stmt = (
+            f"INSERT INTO `{entry['name']}` ({', '.join(f'`{col}`' for col in columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})"
+        )
+        loaded = 0
+        batch = []
+        for row in archive.iter_rows(entry):
+            for i in blob_indexes:
+                if row[i] is not None:
+                    row[i] = bytes.fromhex(row[i])
+            batch.append(row)
+            if len(batch) >= BULK_INSERT_ROWS:
+                cursor.executemany(stmt, batch)
+                loaded += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(stmt, batch)
+            loaded += len(batch)
+        return loaded
+
+    def _execute_restore_with_progress(self, backup_paths: List[Path], progress_callback=None,
+                                       backup: Optional[Backup] = None) -> List[str]:
         """
         Ejecuta la restauración del backup con progreso.
+
+        Cada archivo de la cadena se aplica con el motor que corresponde a su
+        formato: los backups por filas con carga masiva (_restore_rows_archive)
+        y los SQL sentencia por sentencia.
+
+        Con un solo worker (por defecto) todo se ejecuta en una única
+        transacción y la verificación contra el manifiesto se hace antes del
+        commit: si falla, se revierte y la base de datos queda como estaba.
+        Con más workers (opcional) los datos se cargan en paralelo por niveles
+        de dependencias, cada tabla se confirma por separado y la
+        verificación se hace al final.
         
         Args:
-            backup_path (Path): Ruta al archivo de backup
+            backup_paths (List[Path]): Archivos a aplicar en orden (completo + incrementales)
             progress_callback: Función callback para actualizar el progreso
+            backup (Backup): backup restaurado, para verificarlo contra su manifiesto
+
+        Returns:
+            List[str]: diferencias con el manifiesto (vacía si coincide)
         """
         conn = None
         cursor = None
         try:
-            # Obtener una conexión directa a MySQL
-            conn = self.engine.raw_connection()
+            # Obtener una conexión directa a MySQL; LOAD DATA LOCAL INFILE solo
+            # se habilita si esta conexión carga backups por filas
+            loads_rows = self.workers == 1 and any(is_rows_archive(path) for path in backup_paths)
+            conn = self._raw_connection(local_infile=loads_rows)
             cursor = conn.cursor()
             
-            self.logger.info(f"[Restore] Iniciando restauración desde: {backup_path}")
+            self.logger.info(f"[Restore] Iniciando restauración desde: {backup_paths[-1]}")
             
             # Paso 1: Obtener lista de tablas (40% - 50%)
             if progress_callback:
@@ -336,6 +756,7 @@ class RestoreService:
                 AND table_name != 'backups'
             """)
             tables = [row[0] for row in cursor.fetchall()]
+            self._existing_tables = set(tables) | {'backups'}
             
             # Obtener dependencias de claves foráneas
             cursor.execute("""
@@ -354,20 +775,19 @@ class RestoreService:
                 if referenced_table in dependency_graph:
                     dependency_graph[table].add(referenced_table)
             
+            # Columnas BLOB, para decodificar los backups antiguos que las guardan en Base64
+            cursor.execute("""
+                SELECT table_name, column_name
+                FROM information_schema.columns
+                WHERE table_schema = DATABASE()
+                AND data_type LIKE '%blob'
+            """)
+            blob_columns: Dict[str, Set[str]] = {}
+            for table, column in cursor.fetchall():
+                blob_columns.setdefault(table, set()).add(column)
+
             # Ordenar tablas por dependencias (topological sort)
-            ordered_tables = []
-            visited = set()
-            
-            def visit(table):
-                if table in visited:
-                    return
-                visited.add(table)
-                for dep in dependency_graph[table]:
-                    visit(dep)
-                ordered_tables.append(table)
-            
-            for table in tables:
-                visit(table)
+            ordered_tables = self._sort_tables_by_dependencies(tables, dependency_graph)
             
             # Paso 2: Eliminar datos existentes (50% - 60%)
             if progress_callback:
@@ -387,57 +807,54 @@ class RestoreService:
                     self.logger.error(f"[Restore] Error al eliminar datos de {table}: {str(e)}")
                     raise
 
-            # Paso 3: Leer y parsear archivo de backup (60% - 70%)
+            # Paso 3: Leer y ejecutar las sentencias a medida que se leen (60% - 95%)
             if progress_callback:
                 progress_callback(60, "Procesando archivo de backup...", "Leyendo sentencias SQL", "~30 segundos")
-                
-            statements = []
-            current_stmt = ""
-
-            with open(backup_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    stripped = line.strip()
-                    if not stripped or stripped.startswith('--') or stripped.startswith('/*') or stripped.startswith('/*!'):
-                        continue
 
-                    current_stmt += line
-                    if stripped.endswith(';'):
-                        statements.append(current_stmt.strip())
-                        current_stmt = ""
+            max_packet = self._get_max_allowed_packet(cursor)
+            levels = self._dependency_levels(ordered_tables, dependency_graph)
 
-            if current_stmt.strip():
-                statements.append(current_stmt.strip())
+            if self.workers > 1:
+                # Confirmar el borrado antes de cargar las tablas con otras conexiones
+                conn.commit()
+            else:
+                # Los backups SQL lo incluyen; los backups por filas no
+                cursor.execute("SET FOREIGN_KEY_CHECKS=0")
 
-            self.logger.info(f"[Restore] Se encontraron {len(statements)} sentencias SQL para ejecutar")
-            
-            # Paso 4: Ejecutar sentencias (70% - 95%)
+            step = (95 - 60) / len(backup_paths)
+            for index, backup_path in enumerate(backup_paths):
+                start = 60 + index * step
+                end = start + step
+                if is_rows_archive(backup_path):
+                    self._restore_rows_archive(backup_path, cursor, levels, progress_callback, start, end)
+                elif self.workers > 1:
+                    middle = start + step * 0.3
+                    self._load_tables_parallel(
+                        self._iter_backup_statements([backup_path], progress_callback, start, middle, blob_columns),
+                        levels, max_packet, progress_callback, middle, end
+                    )
+                else:
+                    self._execute_statements(
+                        cursor, self._iter_backup_statements([backup_path], progress_callback, start, end, blob_columns),
+                        max_packet
+                    )
+            
+            # Paso 4: Verificar contra el manifiesto (antes del commit si es una sola transacción)
             if progress_callback:
-                progress_callback(70, "Ejecutando sentencias SQL...", f"Procesando {len(statements)} sentencias", "~20 segundos")
-                
-            for i, stmt in enumerate(statements, 1):
-                try:
-                    if not stmt:
-                        continue
-                    
-                    if progress_callback:
-                        progress = 70 + (i / len(statements)) * 25  # 70% a 95%
-                        progress_callback(progress, f"Ejecutando sentencia {i}/{len(statements)}", f"Procesando sentencia SQL", "~15 segundos")
-                        
-                    self.logger.debug(f"[Restore] Ejecutando sentencia {i}/{len(statements)}")
-                    cursor.execute(stmt)
-                    
-                except Exception as e:
-                    self.logger.error(f"[Restore] Error en sentencia {i}: {str(e)}")
-                    self.logger.error(f"[Restore] Sentencia problemática: {stmt}")
-                    raise
-            
+                progress_callback(95, "Verificando restauración...", "Comparando tablas con el manifiesto del backup", "~30 segundos")
+            problems = self._verify_restore(backup, cursor if self.workers == 1 else None)
+            if problems:
+                conn.rollback()
+                return problems
+
             # Paso 5: Finalizar (95% - 100%)
             if progress_callback:
-                progress_callback(95, "Finalizando restauración...", "Haciendo commit de cambios", "~5 segundos")
+                progress_callback(98, "Finalizando restauración...", "Haciendo commit de cambios", "~5 segundos")
                 
             # Hacer commit de todos los cambios
             conn.commit()
             self.logger.info("[Restore] Restauración completada exitosamente")
+            return []
             
         except Exception as e:
             self.logger.error(f"[Restore] Error durante la restauración: {str(e)}")
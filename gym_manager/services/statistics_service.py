@@ -0,0 +1,119 @@
+import logging
+
+from sqlalchemy import func, extract
+from sqlalchemy.orm import Session
+
+from gym_manager.models.member import Miembro
+from gym_manager.models.payment_daily_summary import PagoResumenDiario
+from gym_manager.models.payment_method import MetodoPago
+from gym_manager.utils.date_ranges import year_range
+
+MESES = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"]
+
+
+class StatisticsService:
+    """
+    Servicio de agregación para los gráficos de estadísticas.
+
+    Todas las consultas agrupan en la base de datos (GROUP BY) y devuelven
+    solo los arreglos pequeños que necesitan los gráficos, sin cargar
+    objetos Pago o Miembro en memoria. Los gráficos de ingresos leen del
+    resumen diario (pagos_resumen_diario) en lugar de la tabla de pagos.
+    """
+
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+        self.logger = logging.getLogger(__name__)
+
+    def get_monthly_income(self, year: int) -> dict:
+        """
+        Obtiene la suma de pagos activos por mes del año indicado
+        """
+        start, end = year_range(year)
+        month = extract('month', PagoResumenDiario.fecha)
+        try:
+            rows = self.db_session.query(
+                month.label('mes'),
+                func.sum(PagoResumenDiario.total)
+            ).filter(
+                PagoResumenDiario.fecha >= start.date(),
+                PagoResumenDiario.fecha < end.date()
+            ).group_by(month).all()
+        except Exception as e:
+            self.logger.error(f"Error al agrupar ingresos mensuales: {str(e)}")
+            self.db_session.rollback()
+            raise
+
+        ingresos = [0] * 12
+        for mes, total in rows:
+            ingresos[int(mes) - 1] = float(total or 0)
+        return {"meses": list(MESES), "ingresos": ingresos}
+
+    def get_payment_methods_distribution(self, year: int) -> dict:
+        """
+        Obtiene la suma de pagos activos por método de pago del año indicado
+        """
+        start, end = year_range(year)
+        try:
+            rows = self.db_session.query(
+                MetodoPago.descripcion,
+                func.sum(PagoResumenDiario.total)
+            ).join(
+                PagoResumenDiario, PagoResumenDiario.id_metodo_pago == MetodoPago.id_metodo_pago
+            ).filter(
+                PagoResumenDiario.fecha >= start.date(),
+                PagoResumenDiario.fecha < end.date()
+            ).group_by(
+                MetodoPago.id_metodo_pago, MetodoPago.descripcion
+            ).all()
+        except Exception as e:
+            self.logger.error(f"Error al agrupar pagos por método: {str(e)}")
+            self.db_session.rollback()
+            raise
+
+        distribucion = {}
+        for descripcion, total in rows:
+            distribucion[descripcion] = distribucion.get(descripcion, 0) + float(total or 0)
+        return distribucion
+
+    def get_new_members_per_month(self, year: int) -> dict:
+        """
+        Obtiene la cantidad de miembros registrados por mes del año indicado
+        """
+        start, end = year_range(year)
+        month = extract('month', Miembro.fecha_registro)
+        try:
+            rows = self.db_session.query(
+                month.label('mes'),
+                func.count(Miembro.id_miembro)
+            ).filter(
+                Miembro.fecha_registro >= start,
+                Miembro.fecha_registro < end
+            ).group_by(month).all()
+        except Exception as e:
+            self.logger.error(f"Error al agrupar nuevos miembros: {str(e)}")
+            self.db_session.rollback()
+            raise
+
+        nuevos = [0] * 12
+        for mes, total in rows:
+            nuevos[int(mes) - 1] = int(total or 0)
+        return {"meses": list(MESES), "nuevos": nuevos}
+
+    def get_active_memberships_by_type(self) -> dict:
+        """
+        Obtiene la cantidad de miembros activos por tipo de membresía
+        """
+        try:
+            rows = self.db_session.query(
+                Miembro.tipo_membresia,
+                func.count(Miembro.id_miembro)
+            ).filter(
+                Miembro.estado == True
+            ).group_by(Miembro.tipo_membresia).all()
+        except Exception as e:
+            self.logger.error(f"Error al agrupar membresías por tipo: {str(e)}")
+            self.db_session.rollback()
+            raise
+
+        return {(tipo or 'Sin tipo'): int(total or 0) for tipo, total in rows}
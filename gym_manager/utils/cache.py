@@ -0,0 +1,192 @@
+from collections import OrderedDict
+from itertools import chain
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCache:
+    """
+    Cache de resultados de consultas con desalojo LRU acotado y expiración (TTL).
+
+    Las entradas se identifican por nombre de consulta + parámetros y se
+    etiquetan con los nombres de las tablas de las que dependen; al confirmar
+    una transacción que modifica una tabla se invalidan sus entradas.
+
+    Solo deben guardarse valores planos (números, diccionarios, tuplas,
+    dataclasses), nunca instancias del ORM ligadas a una sesión.
+
+    Cada invalidación incrementa la generación de sus tablas (o de la consulta,
+    o de toda la cache en clear); get_or_load anota esas generaciones antes de
+    llamar al loader y descarta el resultado si cambiaron mientras cargaba, ya
+    que pudo haber leído datos anteriores a la invalidación.
+    """
+
+    def __init__(self, max_entries: int = 256, default_ttl: float = 300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._tag_generations: Dict[str, int] = {}
+        self._name_generations: Dict[str, int] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(name: str, params: Any = None) -> tuple:
+        """Construye la clave a partir del nombre de la consulta y sus parámetros"""
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        elif isinstance(params, list):
+            params = tuple(params)
+        try:
+            hash(params)
+        except TypeError:
+            params = repr(params)
+        return (name, params)
+
+    def get_or_load(self, name: str, loader: Callable[[], Any], params: Any = None,
+                    tags: Iterable[str] = (), ttl: Optional[float] = None) -> Any:
+        """
+        Devuelve el valor en cache o lo calcula con `loader` y lo guarda.
+        Si `loader` lanza una excepción, o sus tablas se invalidaron mientras
+        se ejecutaba, no se guarda nada.
+        """
+        key = self.make_key(name, params)
+        tags = frozenset(tags)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            generations = self._generations_of(name, tags)
+
+        value = loader()
+        with self._lock:
+            if self._generations_of(name, tags) != generations:
+                logger.debug(f"Resultado de {name} descartado: se invalidó durante la carga")
+                return value
+            self.set(name, value, params=params, tags=tags, ttl=ttl)
+        return value
+
+    def _generations_of(self, name: str, tags: frozenset) -> tuple:
+        """Generaciones de la cache, de la consulta y de sus tablas (llamar con el lock tomado)"""
+        return (
+            self._generation,
+            self._name_generations.get(name, 0),
+            tuple(sorted((tag, self._tag_generations.get(tag, 0)) for tag in tags)),
+        )
+
+    def set(self, name: str, value: Any, params: Any = None,
+            tags: Iterable[str] = (), ttl: Optional[float] = None):
+        """Guarda un valor en cache desalojando el menos usado si se supera el límite"""
+        key = self.make_key(name, params)
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at, frozenset(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *tags: str) -> int:
+        """
+        Elimina las entradas que dependen de alguna de las tablas indicadas
+
+        Returns:
+            int: cantidad de entradas eliminadas
+        """
+        tags = set(tags)
+        if not tags:
+            return 0
+        with self._lock:
+            for tag in tags:
+                self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+            stale = [key for key, (_, _, entry_tags) in self._entries.items() if entry_tags & tags]
+            for key in stale:
+                del self._entries[key]
+        if stale:
+            logger.debug(f"Cache invalidada para {sorted(tags)}: {len(stale)} entradas")
+        return len(stale)
+
+    def invalidate_name(self, name: str) -> int:
+        """Elimina todas las entradas de una consulta, sin importar sus parámetros"""
+        with self._lock:
+            self._name_generations[name] = self._name_generations.get(name, 0) + 1
+            stale = [key for key in self._entries if key[0] == name]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        """Vacía la cache y reinicia los contadores"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Devuelve los contadores de aciertos, fallos y desalojos"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+# Cache compartida por todo el proceso
+query_cache = QueryCache()
+
+
+# Invalidación automática: cada sesión acumula las tablas que modificó y,
+# al confirmar la transacción, se invalidan las entradas que dependen de ellas.
+_PENDING_TAGS_KEY = 'query_cache_tags'
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed_tables(session, flush_context):
+    tags = session.info.setdefault(_PENDING_TAGS_KEY, set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, '__table__', None)
+        if table is not None:
+            tags.add(table.name)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk_tables(orm_execute_state):
+    # UPDATE/DELETE masivos (query.update/delete) e INSERT ... SELECT
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None:
+            tags = orm_execute_state.session.info.setdefault(_PENDING_TAGS_KEY, set())
+            tags.add(table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_tables(session):
+    tags = session.info.pop(_PENDING_TAGS_KEY, None)
+    if tags:
+        query_cache.invalidate(*tags)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_tables(session):
+    session.info.pop(_PENDING_TAGS_KEY, None)
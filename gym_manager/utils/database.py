@@ -1,7 +1,9 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy.pool import QueuePool
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker, scoped_session, Session as OrmSession
+import logging
 import os
+import threading
+import time
 from contextlib import contextmanager
 from sqlalchemy.exc import DBAPIError, PendingRollbackError
 from pathlib import Path
@@ -9,46 +11,174 @@ from pathlib import Path
 # Configuración de la base de datos MySQL
 from gym_manager.config import DATABASE_URL
 
-# Crear el engine con pool de conexiones y reconexión automática
-engine = create_engine(
-    DATABASE_URL,
-    pool_size=5,  # Número de conexiones en el pool
-    max_overflow=10,  # Máximo número de conexiones adicionales
-    pool_timeout=30,  # Tiempo máximo de espera para una conexión
-    pool_recycle=3600,  # Reciclar conexiones cada hora
-    pool_pre_ping=True,  # Verificar conexión antes de usar
-    poolclass=QueuePool,  # Usar QueuePool para mejor manejo de conexiones
-)
+from gym_manager.utils.engines import get_engine
+from gym_manager.utils.log import get_logger
+
+# Engine compartido (un solo pool de conexiones por base de datos, ver utils/engines.py)
+engine = get_engine(DATABASE_URL)
 
 # Crear la sesión global
 Session = sessionmaker(bind=engine)
 ScopedSession = scoped_session(Session)
 
+logger = logging.getLogger(__name__)
+# Eventos de session_scope: solo con depuración activa y muestreados
+log = get_logger(__name__)
+# Se registra una de cada SESSION_LOG_SAMPLE transacciones
+SESSION_LOG_SAMPLE = 50
+
+# Vida máxima de la sesión de una unidad de trabajo (segundos)
+SESSION_MAX_AGE = 15 * 60
+# Objetos en el identity map a partir de los cuales la sesión se renueva
+SESSION_MAX_IDENTITIES = 5000
+# Inactividad tras la cual se termina la transacción de lectura (segundos)
+SESSION_IDLE_EXPIRY = 60
+
+# Clave en session.info: la transacción tiene escrituras ya enviadas (flush) sin confirmar
+_UNCOMMITTED_KEY = 'uow_uncommitted'
+
+
+@event.listens_for(OrmSession, 'after_flush')
+def _mark_uncommitted(session, flush_context):
+    session.info[_UNCOMMITTED_KEY] = True
+
+
+@event.listens_for(OrmSession, 'after_commit')
+@event.listens_for(OrmSession, 'after_rollback')
+def _clear_uncommitted(session):
+    session.info.pop(_UNCOMMITTED_KEY, None)
+
+
+class UnitOfWork:
+    """
+    Sesión de base de datos de una vista (o de un controlador) con vida acotada.
+
+    Se usa como una Session: los controladores la reciben como db_session y
+    llaman a query/add/commit igual que antes. Si la sesión no tiene cambios
+    pendientes:
+
+    - al accederla pasado SESSION_IDLE_EXPIRY sin usarse se termina la
+      transacción de lectura (rollback), de modo que las filas se vuelven a
+      leer en lugar de servir datos de hace horas; los objetos cargados
+      siguen asociados a la sesión y se recargan al usarlos;
+    - en expire(), pasado SESSION_MAX_AGE o con más de SESSION_MAX_IDENTITIES
+      objetos cargados se cierra y se abre una sesión nueva, para que el
+      identity map no crezca durante toda la jornada. Solo se renueva ahí
+      (al refrescar o suspender una vista, al volver al dashboard) porque
+      los objetos de la sesión anterior quedan desasociados: quien llama a
+      expire() debe volver a consultarlos (ver ModuleView.refresh).
+
+    Uso:
+        uow = UnitOfWork()
+        controller = MemberController(uow)
+        ...
+        uow.close()  # al salir de la vista
+    """
+
+    def __init__(self, max_age: float = SESSION_MAX_AGE, max_identities: int = SESSION_MAX_IDENTITIES,
+                 idle_expiry: float = SESSION_IDLE_EXPIRY, session_factory=None):
+        self.max_age = max_age
+        self.max_identities = max_identities
+        self.idle_expiry = idle_expiry
+        self._session_factory = session_factory or Session
+        self._session = None
+        self._created_at = 0.0
+        self._last_used = 0.0
+        self._lock = threading.RLock()
+
+    @property
+    def session(self) -> OrmSession:
+        """Sesión actual, renovada o expirada según corresponda"""
+        with self._lock:
+            now = time.monotonic()
+            session = self._session
+            if (session is not None and self._is_idle(session)
+                    and now - self._last_used > self.idle_expiry and session.in_transaction()):
+                session.rollback()
+            if session is None:
+                session = self._session = self._session_factory()
+                self._created_at = now
+            self._last_used = now
+            return session
+
+    @staticmethod
+    def _is_idle(session: OrmSession) -> bool:
+        """La sesión no tiene cambios sin enviar ni escrituras sin confirmar"""
+        return (not session.info.get(_UNCOMMITTED_KEY)
+                and not session.new and not session.deleted and not session.dirty)
+
+    @contextmanager
+    def transaction(self):
+        """Ejecuta un bloque en una transacción: commit al terminar o rollback si falla"""
+        session = self.session
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+    def expire(self):
+        """
+        Termina la transacción de lectura para que los datos se vuelvan a leer,
+        o renueva la sesión si superó su vida máxima o su tamaño máximo
+
+        Returns:
+            bool: True si la sesión se renovó (los objetos cargados quedaron desasociados)
+        """
+        with self._lock:
+            session = self._session
+            if session is None or not self._is_idle(session):
+                return False
+            if (time.monotonic() - self._created_at > self.max_age
+                    or len(session.identity_map) > self.max_identities):
+                logger.debug(f"Sesión renovada ({len(session.identity_map)} objetos cargados)")
+                self.close()
+                return True
+            session.rollback()
+            return False
+
+    def close(self):
+        """Cierra la sesión actual (se abre una nueva si se vuelve a usar)"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __getattr__(self, name):
+        # query, add, commit, rollback, get_bind, ... van a la sesión actual
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.session, name)
+
 @contextmanager
 def session_scope():
     """Provide a transactional scope around a series of operations."""
-    print("Iniciando nueva sesión de base de datos...")  # Debug log
     session = ScopedSession()
     try:
-        print("Sesión creada exitosamente")  # Debug log
         yield session
-        print("Haciendo commit de la transacción...")  # Debug log
         session.commit()
-        print("Commit exitoso")  # Debug log
+        log.sampled(logging.DEBUG, 'db.session.commit', every=SESSION_LOG_SAMPLE)
     except Exception as e:
-        print(f"Error en la transacción, haciendo rollback: {str(e)}")  # Debug log
         session.rollback()
+        log.event(logging.DEBUG, 'db.session.rollback', error=str(e))
         raise
     finally:
-        print("Cerrando sesión...")  # Debug log
         session.close()
-        print("Sesión cerrada")  # Debug log
 
 def get_db_session():
     """
-    Obtiene una nueva sesión de base de datos
+    Obtiene una unidad de trabajo nueva (ver UnitOfWork); quien la crea
+    debe cerrarla con close() al terminar
+    """
+    return UnitOfWork()
+
+def new_session():
+    """
+    Crea una sesión independiente para una sola operación; quien la crea
+    debe cerrarla
     """
-    return ScopedSession()
+    return Session()
 
 def cleanup_db_session():
     """
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+
+# Los rangos son semiabiertos [inicio, fin) para poder filtrar con
+# `columna >= inicio AND columna < fin` sin envolver la columna en funciones
+# (EXTRACT, DATE, ...), de modo que la base de datos pueda usar el índice.
+DateRange = Tuple[datetime, datetime]
+
+
+def day_range(reference: Optional[datetime] = None) -> DateRange:
+    """Devuelve el rango [inicio, fin) del día de `reference` (hoy por defecto)"""
+    reference = reference or datetime.now()
+    start = datetime(reference.year, reference.month, reference.day)
+    return start, start + timedelta(days=1)
+
+
+def month_range(reference: Optional[datetime] = None) -> DateRange:
+    """Devuelve el rango [inicio, fin) del mes de `reference` (mes actual por defecto)"""
+    reference = reference or datetime.now()
+    start = datetime(reference.year, reference.month, 1)
+    if reference.month == 12:
+        end = datetime(reference.year + 1, 1, 1)
+    else:
+        end = datetime(reference.year, reference.month + 1, 1)
+    return start, end
+
+
+def year_range(year: Optional[int] = None) -> DateRange:
+    """Devuelve el rango [inicio, fin) del año indicado (año actual por defecto)"""
+    year = year or datetime.now().year
+    return datetime(year, 1, 1), datetime(year + 1, 1, 1)
@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional, Union
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.pool import QueuePool
+
+from gym_manager import config
+
+logger = logging.getLogger(__name__)
+
+
+class _PoolCounters:
+    """Contadores de un pool que se conservan cuando el pool se recrea"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+
+    def record_wait(self, seconds: float, timed_out: bool):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+            if timed_out:
+                self.timeouts += 1
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool que cuenta las veces que una conexión tuvo que esperar porque
+    el pool estaba completo (pool_size + max_overflow conexiones en uso).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counters = _PoolCounters()
+
+    def _is_saturated(self) -> bool:
+        return self._max_overflow > -1 and self.checkedin() == 0 and self.overflow() >= self._max_overflow
+
+    def _do_get(self):
+        if not self._is_saturated():
+            return super()._do_get()
+        started = time.monotonic()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.counters.record_wait(time.monotonic() - started, timed_out)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.counters = self.counters
+        return pool
+
+
+class EngineRegistry:
+    """
+    Registro de engines: un solo engine (y un solo pool de conexiones) por
+    URL de base de datos para todo el proceso.
+
+    Las vistas, los servicios de backup/restauración y las utilidades piden
+    el engine con get_engine() en lugar de crear el suyo, de modo que una
+    instancia de la aplicación no abre varios pools contra el mismo servidor.
+    La configuración del pool se toma de config.py y puede cambiarse con
+    configure() antes de crear los engines.
+    """
+
+    def __init__(self, **settings):
+        self.settings = {
+            'pool_size': config.DB_POOL_SIZE,
+            'max_overflow': config.DB_MAX_OVERFLOW,
+            'pool_timeout': config.DB_POOL_TIMEOUT,
+            'pool_recycle': config.DB_POOL_RECYCLE,
+        }
+        self.settings.update(settings)
+        self._engines: Dict[str, Engine] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, **settings):
+        """Cambia la configuración de los engines que se creen a partir de ahora"""
+        with self._lock:
+            if self._engines:
+                logger.warning("Configuración del pool cambiada con engines ya creados: se aplica solo a los nuevos")
+            self.settings.update(settings)
+
+    @staticmethod
+    def _key(url: Union[str, URL]) -> str:
+        return make_url(url).render_as_string(hide_password=False)
+
+    def get_engine(self, url: Union[str, URL, None] = None) -> Engine:
+        """Obtiene el engine de una URL (por defecto config.DATABASE_URL), creándolo la primera vez"""
+        key = self._key(url or config.DATABASE_URL)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = self._create_engine(make_url(key))
+                self._engines[key] = engine
+                logger.info(f"Engine creado para {engine.url.render_as_string(hide_password=True)}")
+            return engine
+
+    def _create_engine(self, url: URL) -> Engine:
+        if url.get_backend_name() == 'sqlite':
+            # SQLite (pruebas y herramientas) usa el pool por defecto del dialecto
+            return create_engine(url)
+        return create_engine(
+            url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=self.settings['pool_size'],
+            max_overflow=self.settings['max_overflow'],
+            pool_timeout=self.settings['pool_timeout'],
+            pool_recycle=self.settings['pool_recycle'],
+            pool_pre_ping=True,  # Verificar conexión antes de usar
+        )
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Estado de cada pool: tamaño, conexiones libres y en uso, overflow
+        actual, esperas por una conexión (cantidad, segundos y timeouts)
+        """
+        with self._lock:
+            engines = list(self._engines.values())
+        result = {}
+        for engine in engines:
+            pool = engine.pool
+            entry = {'pool': type(pool).__name__}
+            if isinstance(pool, QueuePool):
+                entry.update({
+                    'size': pool.size(),
+                    'checked_in': pool.checkedin(),
+                    'checked_out': pool.checkedout(),
+                    'overflow': pool.overflow(),
+                })
+            counters = getattr(pool, 'counters', None)
+            if counters is not None:
+                entry.update({
+                    'waits': counters.waits,
+                    'wait_seconds': round(counters.wait_seconds, 3),
+                    'timeouts': counters.timeouts,
+                })
+            result[engine.url.render_as_string(hide_password=True)] = entry
+        return result
+
+    def dispose(self, url: Union[str, URL, None] = None):
+        """
+        Cierra las conexiones del pool de una URL, o de todos los pools si
+        no se indica (al cerrar la aplicación). Los engines siguen
+        registrados y vuelven a conectar si se usan.
+        """
+        with self._lock:
+            if url is None:
+                engines = list(self._engines.values())
+            else:
+                engine = self._engines.get(self._key(url))
+                engines = [engine] if engine is not None else []
+        for engine in engines:
+            engine.dispose()
+
+
+# Registro compartido por todo el proceso
+engine_registry = EngineRegistry()
+
+
+def get_engine(url: Union[str, URL, None] = None) -> Engine:
+    """Engine compartido de una URL (por defecto la base de datos de la aplicación)"""
+    return engine_registry.get_engine(url)
+
+
+def pool_stats() -> Dict[str, dict]:
+    """Estado de los pools de conexiones del proceso (ver EngineRegistry.stats)"""
+    return engine_registry.stats()
@@ -0,0 +1,77 @@
+"""
+Medición del tiempo de importación del arranque (python -X importtime).
+
+Uso:
+    python -m gym_manager.utils.import_timing               # gym_manager.main
+    python -m gym_manager.utils.import_timing gym_manager.views.home_view --top 30
+"""
+import argparse
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List
+
+# Línea de -X importtime: "import time: <self us> | <cumulative us> | <módulo con sangría>"
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+# Importaciones que no deberían cargarse al arrancar
+HEAVY_MODULES = ('reportlab', 'openpyxl', 'pandas', 'fpdf', 'plotly', 'matplotlib')
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure_imports(module: str = 'gym_manager.main') -> List[ImportTiming]:
+    """Importa `module` en un proceso nuevo con -X importtime y devuelve los tiempos por módulo"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {module}:\n{result.stderr[-2000:]}")
+    timings = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            timings.append(ImportTiming(
+                module=match.group(4),
+                self_us=int(match.group(1)),
+                cumulative_us=int(match.group(2)),
+                depth=len(match.group(3)) // 2,
+            ))
+    return timings
+
+
+def report(module: str, top: int = 20) -> int:
+    """
+    Muestra el tiempo total, los módulos más lentos (acumulado) y las
+    dependencias pesadas cargadas al importar `module`
+
+    Returns:
+        int: 1 si se cargó alguna dependencia pesada, 0 si no
+    """
+    timings = measure_imports(module)
+    total_us = sum(t.cumulative_us for t in timings if t.depth == 0)
+    print(f"Importar {module}: {total_us / 1000:.1f} ms ({len(timings)} módulos)")
+    print(f"\n{'acumulado (ms)':>15} {'propio (ms)':>12}  módulo")
+    for t in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        print(f"{t.cumulative_us / 1000:>15.1f} {t.self_us / 1000:>12.1f}  {t.module}")
+
+    heavy = sorted({t.module.split('.')[0] for t in timings if t.module.split('.')[0] in HEAVY_MODULES})
+    if heavy:
+        print(f"\nDependencias pesadas cargadas al arrancar: {', '.join(heavy)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempo de importación por módulo (python -X importtime)")
+    parser.add_argument('module', nargs='?', default='gym_manager.main')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(report(args.module, args.top))
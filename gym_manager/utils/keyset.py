@@ -0,0 +1,108 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional
+
+from sqlalchemy import and_, or_, Date, DateTime
+
+
+def encode_cursor(values: List[Any], direction: str) -> str:
+    """
+    Codifica los valores de la clave de orden en un cursor opaco
+    """
+    payload = {
+        'k': [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values],
+        'd': direction,
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str, columns) -> tuple:
+    """
+    Decodifica un cursor generado por encode_cursor
+
+    Returns:
+        tuple: (valores de la clave, dirección 'next' o 'prev')
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        values = payload['k']
+        direction = payload['d']
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValueError("Cursor de paginación inválido")
+
+    if direction not in ('next', 'prev') or len(values) != len(columns):
+        raise ValueError("Cursor de paginación inválido")
+
+    decoded = []
+    for column, value in zip(columns, values):
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(column.type, Date):
+            value = date.fromisoformat(value)
+        decoded.append(value)
+    return decoded, direction
+
+
+def _seek_predicate(columns, values, direction: str):
+    """
+    Construye el predicado (c1, c2, ...) < (v1, v2, ...) en forma expandida,
+    que el motor puede resolver con un recorrido de rango sobre el índice.
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        if direction == 'next':
+            clauses.append(and_(*equal_prefix, column < values[i]))
+        else:
+            clauses.append(and_(*equal_prefix, column > values[i]))
+    return or_(*clauses)
+
+
+def keyset_paginate(query, columns, cursor: Optional[str] = None, limit: int = 20) -> dict:
+    """
+    Pagina una consulta por clave (seek) en orden descendente de `columns`.
+
+    La última columna debe ser única (normalmente la clave primaria) para que
+    el orden sea total. El costo de cada página no depende de su profundidad.
+
+    Returns:
+        dict: {'items': [...], 'next_cursor': str | None, 'prev_cursor': str | None}
+    """
+    direction = 'next'
+    if cursor:
+        values, direction = decode_cursor(cursor, columns)
+        query = query.filter(_seek_predicate(columns, values, direction))
+
+    if direction == 'prev':
+        query = query.order_by(*[c.asc() for c in columns])
+    else:
+        query = query.order_by(*[c.desc() for c in columns])
+
+    # Pedir una fila extra para saber si hay más páginas en esta dirección
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == 'prev':
+        rows.reverse()
+
+    def key_of(row):
+        return [getattr(row, column.key) for column in columns]
+
+    # Al avanzar, hay página anterior si se partió de un cursor; al retroceder,
+    # siempre hay página siguiente (la que se acaba de dejar)
+    if direction == 'next':
+        has_next, has_prev = has_more, cursor is not None
+    else:
+        has_next, has_prev = True, has_more
+
+    next_cursor = encode_cursor(key_of(rows[-1]), 'next') if rows and has_next else None
+    prev_cursor = encode_cursor(key_of(rows[0]), 'prev') if rows and has_prev else None
+
+    return {
+        'items': rows,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+    }
@@ -0,0 +1,89 @@
+import itertools
+import logging
+import threading
+from typing import Dict, Optional
+
+from gym_manager import config
+
+# Logger raíz de la aplicación: el interruptor de depuración cambia su nivel
+APP_LOGGER = 'gym_manager'
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formatter que agrega los campos del evento (extra={'fields': {...}}) como
+    pares clave=valor al final del mensaje. Los campos se formatean solo si
+    el registro llega a emitirse.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            message += ' ' + ' '.join(f"{key}={value!r}" for key, value in fields.items())
+        return message
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """
+    Logger con eventos estructurados: un nombre de evento y campos clave=valor.
+
+    Uso:
+        log = get_logger(__name__)
+        log.event(logging.DEBUG, 'db.commit', tables=3)
+        log.sampled(logging.DEBUG, 'db.session', every=100)
+
+    Si el nivel no está habilitado no se arma el registro ni se formatean
+    los campos, de modo que en los caminos frecuentes el costo es una
+    comparación de nivel.
+    """
+
+    def __init__(self, logger: logging.Logger):
+        super().__init__(logger, {})
+        self._counters: Dict[str, itertools.count] = {}
+        self._lock = threading.Lock()
+
+    def event(self, level: int, name: str, exc_info=None, **fields):
+        """Registra un evento con sus campos si el nivel está habilitado"""
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, name, exc_info=exc_info, extra={'fields': fields}, stacklevel=2)
+
+    def sampled(self, level: int, name: str, every: int = 100, **fields):
+        """Registra uno de cada `every` eventos con el mismo nombre (se agrega sampled=every)"""
+        if not self.logger.isEnabledFor(level):
+            return
+        with self._lock:
+            counter = self._counters.setdefault(name, itertools.count())
+            index = next(counter)
+        if index % every == 0:
+            fields['sampled'] = every
+            self.logger.log(level, name, extra={'fields': fields}, stacklevel=2)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """Obtiene el logger estructurado de un módulo"""
+    return StructuredLogger(logging.getLogger(name))
+
+
+def set_debug(enabled: bool):
+    """Activa o desactiva el registro de depuración de la aplicación"""
+    logging.getLogger(APP_LOGGER).setLevel(logging.DEBUG if enabled else logging.INFO)
+
+
+def is_debug_enabled() -> bool:
+    return logging.getLogger(APP_LOGGER).isEnabledFor(logging.DEBUG)
+
+
+def configure_logging(debug: Optional[bool] = None):
+    """
+    Configura el registro de la aplicación: formato estructurado en la
+    consola y nivel según config.DEBUG_LOGGING (o `debug` si se indica)
+    """
+    root = logging.getLogger()
+    if not root.handlers:
+        root.addHandler(logging.StreamHandler())
+    for handler in root.handlers:
+        handler.setFormatter(StructuredFormatter(LOG_FORMAT))
+    root.setLevel(logging.INFO)
+    set_debug(config.DEBUG_LOGGING if debug is None else debug)
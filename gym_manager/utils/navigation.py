@@ -1,7 +1,5 @@
 import flet as ft
 from gym_manager.utils.database import get_db_session, cleanup_db_session
-import os
-from dotenv import load_dotenv
 import logging
 from sqlalchemy.orm import Session
 
@@ -11,6 +9,8 @@ logger = logging.getLogger(__name__)
 
 # Variable global para la sesión de la base de datos
 db_session: Session = None
+# Home abierto (se cierra al volver al login o al cerrar la aplicación)
+home_view = None
 
 def set_db_session(session: Session):
     """Establece la sesión de la base de datos global"""
@@ -29,7 +29,15 @@ def init_db():
         logger.error(f"Error al inicializar la base de datos: {str(e)}")
         raise
 
+def close_home_view():
+    """Cierra el home abierto, si lo hay, y libera su sesión y sus vistas"""
+    global home_view
+    if home_view is not None:
+        home_view.close()
+        home_view = None
+
 def navigate_to_login(page: ft.Page):
+    close_home_view()
     # Limpiar la página actual
     page.clean()
     
@@ -53,6 +61,7 @@ def navigate_to_login(page: ft.Page):
     LoginView(page, auth_controller)
 
 def navigate_to_home(page: ft.Page, user_rol: str, user_name: str):
+    global home_view
     # Limpiar la página actual
     page.clean()
     
@@ -73,7 +82,8 @@ def navigate_to_home(page: ft.Page, user_rol: str, user_name: str):
         # Importar aquí para evitar circular import
         from gym_manager.views.home_view import HomeView
         # Crear y mostrar vista de home
-        HomeView(page, user_rol, user_name)
+        close_home_view()
+        home_view = HomeView(page, user_rol, user_name)
         
         # Maximizar la ventana después de cargar la vista
         page.window_maximized = True
@@ -97,4 +107,5 @@ def navigate_to_home(page: ft.Page, user_rol: str, user_name: str):
 
 def cleanup():
     """Cleanup resources when the application closes."""
+    close_home_view()
     cleanup_db_session() 
\ No newline at end of file
@@ -1,5 +1,5 @@
 import flet as ft
-from typing import List, Callable, Any
+from typing import List, Callable, Any, Optional
 
 class PaginationController:
     """Controlador de paginación reutilizable para todas las vistas"""
@@ -10,17 +10,61 @@ class PaginationController:
         self.total_items = 0
         self.total_pages = 0
         self.all_items = []
+        # Fuente de datos paginada en la base de datos (ver set_query)
+        self.count_fn: Optional[Callable[[], int]] = None
+        self.fetch_fn: Optional[Callable[[int, int], List[Any]]] = None
+        self._page_cache_key = None
+        self._page_cache: List[Any] = []
         
     def set_items(self, items: List[Any]):
         """Establece los elementos a paginar"""
+        self.count_fn = None
+        self.fetch_fn = None
+        self._invalidate_page_cache()
         self.all_items = items
-        self.total_items = len(items)
+        self._set_total(len(items))
+
+    def set_query(self, count_fn: Callable[[], int], fetch_fn: Callable[[int, int], List[Any]]):
+        """
+        Establece una fuente de datos paginada en la base de datos.
+
+        count_fn() devuelve el total de filas y fetch_fn(offset, limit) solo
+        las filas de la página pedida, de modo que nunca se carga la tabla completa.
+        """
+        self.all_items = []
+        self.count_fn = count_fn
+        self.fetch_fn = fetch_fn
+        self.refresh()
+
+    def refresh(self):
+        """Vuelve a contar las filas de la consulta y descarta la página en cache"""
+        self._invalidate_page_cache()
+        if self.count_fn is not None:
+            self._set_total(self.count_fn())
+
+    @property
+    def is_query_backed(self) -> bool:
+        return self.fetch_fn is not None
+
+    def _set_total(self, total_items: int):
+        self.total_items = total_items
         self.total_pages = max(1, (self.total_items + self.items_per_page - 1) // self.items_per_page)
-        self.current_page = min(self.current_page, self.total_pages)
+        self.current_page = max(1, min(self.current_page, self.total_pages))
+
+    def _invalidate_page_cache(self):
+        self._page_cache_key = None
+        self._page_cache = []
         
     def get_current_page_items(self) -> List[Any]:
         """Obtiene los elementos de la página actual"""
         start_index = (self.current_page - 1) * self.items_per_page
+        if self.fetch_fn is not None:
+            # Evitar repetir la consulta si la página ya fue obtenida
+            cache_key = (start_index, self.items_per_page)
+            if self._page_cache_key != cache_key:
+                self._page_cache = list(self.fetch_fn(start_index, self.items_per_page))
+                self._page_cache_key = cache_key
+            return self._page_cache
         end_index = start_index + self.items_per_page
         return self.all_items[start_index:end_index]
         
@@ -190,6 +234,10 @@ class PaginationWidget:
         """Actualiza los elementos y refresca la paginación"""
         self.controller.set_items(items)
         self._update_pagination()
+
+    def refresh(self):
+        """Refresca los controles con el total actual del controlador"""
+        self._update_pagination()
     
     def get_widget(self) -> ft.Container:
         """Retorna el widget de paginación"""
@@ -0,0 +1,194 @@
+import re
+from typing import Iterator, Optional, Set
+
+# Caracteres leídos por vez del stream de entrada
+READ_CHUNK_CHARS = 256 * 1024
+
+# Fuera de comillas: fin de sentencia, apertura de comillas o inicio de comentario
+_NORMAL_RE = re.compile(r"[;'\"`#]|--|/\*")
+# Dentro de comillas: la comilla de cierre o una barra invertida de escape
+_QUOTED_RE = {
+    "'": re.compile(r"['\\]"),
+    '"': re.compile(r'["\\]'),
+    '`': re.compile(r'`'),
+}
+# Fin de cada tipo de comentario
+_COMMENT_END = {'--': '\n', '#': '\n', '/*': '*/'}
+# Tabla afectada por una sentencia de backup (CREATE TABLE, DELETE FROM, INSERT INTO)
+_TABLE_STATEMENT_RE = re.compile(
+    r"\s*(?:CREATE\s+TABLE(?:\s+IF\s+NOT\s+EXISTS)?|DELETE\s+FROM|INSERT\s+INTO)\s+`?(\w+)`?",
+    re.IGNORECASE
+)
+
+
+def iter_sql_statements(stream, chunk_size: int = READ_CHUNK_CHARS) -> Iterator[str]:
+    """
+    Divide un stream de texto SQL en sentencias, leyéndolo por bloques.
+
+    Reconoce comillas simples, dobles y backticks (con '' y \\ como escape,
+    igual que MySQL) y comentarios (--, # y /* */), de modo que un ';'
+    dentro de un valor o comentario no corta la sentencia. Los comentarios
+    previos a cada sentencia se descartan. La memoria usada queda acotada
+    por la sentencia más larga.
+
+    Args:
+        stream: objeto con read(n) que devuelve texto
+        chunk_size (int): caracteres leídos por vez
+
+    Yields:
+        str: cada sentencia, incluido el ';' final
+    """
+    buf = ''
+    start = 0       # inicio de la sentencia actual en buf
+    pos = 0         # próxima posición a examinar
+    state = None    # None, comilla abierta o comentario abierto
+    comment_is_leading = False
+    eof = False
+
+    while True:
+        match = None
+        need_more = False
+
+        if state is None:
+            match = _NORMAL_RE.search(buf, pos)
+            if match is None:
+                need_more = True
+                # Un '-' o '/' al final puede ser el inicio de un comentario
+                pos = max(pos, len(buf) - 1)
+            elif match.group() == ';':
+                statement = buf[start:match.end()].strip()
+                if statement != ';':
+                    yield statement
+                start = pos = match.end()
+            elif match.group() in _QUOTED_RE:
+                state = match.group()
+                pos = match.end()
+            else:
+                state = match.group()
+                comment_is_leading = not buf[start:match.start()].strip()
+                pos = match.end()
+        elif state in _QUOTED_RE:
+            match = _QUOTED_RE[state].search(buf, pos)
+            if match is None:
+                need_more = True
+                pos = len(buf)
+            elif match.end() == len(buf) and not eof:
+                # Hace falta el carácter siguiente ('' o \x)
+                need_more = True
+                pos = match.start()
+            elif match.group() == '\\':
+                pos = match.end() + 1
+            elif buf.startswith(state, match.end()):
+                # Comilla duplicada: es parte del valor
+                pos = match.end() + 1
+            else:
+                state = None
+                pos = match.end()
+        else:
+            end = buf.find(_COMMENT_END[state], pos)
+            if end < 0:
+                need_more = True
+                pos = max(pos, len(buf) - len(_COMMENT_END[state]) + 1)
+            else:
+                pos = end + len(_COMMENT_END[state])
+                if comment_is_leading:
+                    start = pos
+                state = None
+
+        if need_more:
+            if eof:
+                break
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                eof = True
+            # Descartar lo ya procesado para no acumular el archivo en memoria
+            buf = buf[start:] + chunk
+            pos -= start
+            start = 0
+
+    # Última sentencia sin ';' (raro, pero seguro)
+    if state is None or state in _QUOTED_RE:
+        statement = buf[start:].strip()
+        if statement:
+            yield statement
+
+
+# Encabezado de un INSERT ... VALUES con la lista de columnas
+_INSERT_RE = re.compile(r"\s*INSERT\s+INTO\s+`?\w+`?\s*\(([^)]*)\)\s*VALUES", re.IGNORECASE)
+# Elementos de la lista VALUES: separadores, cadenas entre comillas y literales sin comillas
+_VALUES_TOKEN_RE = re.compile(r"\s+|[(),;]|'(?:[^'\\]|\\.|'')*'|[^\s(),;']+", re.DOTALL)
+
+
+def wrap_insert_values(stmt: str, columns: Set[str], function: str) -> str:
+    """
+    Envuelve con `function(...)` las cadenas de las columnas indicadas en
+    un INSERT de una o varias filas, por ejemplo para aplicar FROM_BASE64 en
+    el servidor. Los NULL y las sentencias que no son INSERT no se modifican.
+
+    Args:
+        stmt (str): sentencia INSERT INTO `tabla` (columnas) VALUES (...), (...)
+        columns (Set[str]): columnas cuyos valores se envuelven
+        function (str): función SQL a aplicar
+
+    Returns:
+        str: la sentencia modificada (o la original si no corresponde)
+    """
+    match = _INSERT_RE.match(stmt)
+    if not match:
+        return stmt
+    names = [name.strip().strip('`') for name in match.group(1).split(',')]
+    targets = {i for i, name in enumerate(names) if name in columns}
+    if not targets:
+        return stmt
+
+    parts = [stmt[:match.end()]]
+    pos = match.end()
+    depth = 0
+    index = 0
+    while pos < len(stmt):
+        token = _VALUES_TOKEN_RE.match(stmt, pos)
+        if token is None:
+            # Comilla sin cerrar: la sentencia no es un INSERT generado por el backup
+            return stmt
+        value = token.group()
+        if value == '(':
+            depth += 1
+            index = 0
+        elif value == ')':
+            depth -= 1
+        elif value == ',' and depth == 1:
+            index += 1
+        elif value[0] == "'" and depth == 1 and index in targets:
+            value = f"{function}({value})"
+        parts.append(value)
+        pos = token.end()
+    return ''.join(parts)
+
+
+def count_insert_rows(stmt: str) -> int:
+    """Cuenta las filas de un INSERT de una o varias filas (0 si no es un INSERT con lista de columnas)"""
+    match = _INSERT_RE.match(stmt)
+    if not match:
+        return 0
+    rows = 0
+    depth = 0
+    pos = match.end()
+    while pos < len(stmt):
+        token = _VALUES_TOKEN_RE.match(stmt, pos)
+        if token is None:
+            break
+        value = token.group()
+        if value == '(':
+            if depth == 0:
+                rows += 1
+            depth += 1
+        elif value == ')':
+            depth -= 1
+        pos = token.end()
+    return rows
+
+
+def statement_table(stmt: str) -> Optional[str]:
+    """Obtiene la tabla afectada por una sentencia de backup (None si no afecta a una tabla)"""
+    match = _TABLE_STATEMENT_RE.match(stmt)
+    return match.group(1) if match else None
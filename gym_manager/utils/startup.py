@@ -0,0 +1,84 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Espera máxima de una operación que necesita el esquema (por ejemplo, el login)
+SCHEMA_WAIT_TIMEOUT = 60
+
+_started = False
+_schema_ready = threading.Event()
+_schema_error: Optional[Exception] = None
+
+
+def start_database_preparation():
+    """
+    Prepara la base de datos en segundo plano, fuera del camino de arranque:
+    crea las tablas que falten, genera el resumen diario de pagos si está
+    vacío y migra los documentos en línea al almacén. La ventana de login
+    se muestra mientras tanto; las operaciones que necesitan el esquema
+    esperan con wait_for_schema().
+    """
+    global _started
+    if _started:
+        return
+    _started = True
+    threading.Thread(target=_prepare_database, name='database-preparation', daemon=True).start()
+
+
+def wait_for_schema(timeout: float = SCHEMA_WAIT_TIMEOUT) -> bool:
+    """
+    Espera a que el esquema esté listo. Devuelve True de inmediato si la
+    preparación no se inició (scripts y herramientas) y False si falló o
+    no terminó a tiempo.
+    """
+    if not _started:
+        return True
+    return _schema_ready.wait(timeout) and _schema_error is None
+
+
+def schema_error() -> Optional[Exception]:
+    """Error de la preparación del esquema, si falló"""
+    return _schema_error
+
+
+def _prepare_database():
+    global _schema_error
+    # Imports diferidos: los modelos y servicios no cargan antes de mostrar el login
+    from gym_manager.models import Base
+    from gym_manager.services.document_store import DocumentStore
+    from gym_manager.services.payment_rollup_service import PaymentRollupService
+    from gym_manager.utils.database import engine, new_session
+
+    started = time.perf_counter()
+    try:
+        Base.metadata.create_all(engine)
+        logger.info(f"Esquema verificado en {time.perf_counter() - started:.2f} s")
+    except Exception as e:
+        _schema_error = e
+        logger.error(f"Error al conectar a la base de datos: {e}", exc_info=True)
+        return
+    finally:
+        _schema_ready.set()
+
+    session = new_session()
+    try:
+        # Cargar el resumen diario de pagos si la tabla se acaba de crear
+        try:
+            if PaymentRollupService(session).ensure_built():
+                logger.info("Resumen diario de pagos generado desde el historial")
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error al generar el resumen diario de pagos: {e}")
+
+        # Mover al almacén de documentos los comprobantes y rutinas guardados en línea
+        try:
+            DocumentStore(session).migrate_inline_documents()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error al migrar documentos al almacén: {e}")
+    finally:
+        session.close()
+    logger.info(f"Preparación de la base de datos completada en {time.perf_counter() - started:.2f} s")
@@ -2,10 +2,11 @@ import flet as ft
 from datetime import datetime
 import os
 from pathlib import Path
-from gym_manager.services.backup_service import BackupService
+from gym_manager.services.backup_service import BackupService, DEFAULT_BACKUP_FORMAT
 from gym_manager.services.restore_service import RestoreService
 import threading
 from gym_manager.views.base_view import BaseView
+from gym_manager.views.module_views import invalidate_views
 import traceback
 import logging
 from gym_manager.models.backup import Backup
@@ -256,6 +257,34 @@ class BackupView(BaseView):
             ),
         )
 
+        # Botón para backup incremental (solo cambios desde el último backup)
+        self.incremental_backup_button = ft.OutlinedButton(
+            "Backup Incremental",
+            icon=ft.icons.UPDATE,
+            on_click=lambda e: self.create_backup(e, incremental=True),
+            tooltip="Respaldar solo los cambios desde el último backup",
+            style=ft.ButtonStyle(
+                color=ft.colors.BLUE,
+                padding=ft.padding.symmetric(horizontal=20, vertical=10),
+            ),
+        )
+
+        # Formato de los backups nuevos: script SQL (por defecto) o filas
+        # comprimidas, más rápidas de restaurar mediante carga masiva
+        self.backup_format_dropdown = ft.Dropdown(
+            label="Formato",
+            width=190,
+            value=DEFAULT_BACKUP_FORMAT,
+            options=[
+                ft.dropdown.Option(key="sql", text="Script SQL"),
+                ft.dropdown.Option(key="rows", text="Filas (carga rápida)"),
+            ],
+            border_radius=10,
+            text_size=16,
+            tooltip="Formato de los backups nuevos",
+            on_change=self._on_backup_format_change,
+        )
+
         # Contador de registros (como MembersView)
         self.records_counter = ft.Text(
             "0 backups",
@@ -296,7 +325,7 @@ class BackupView(BaseView):
                         content=ft.Row(
                             controls=[
                                 self.welcome_title,
-                                ft.Row([self.new_backup_button], alignment=ft.MainAxisAlignment.END),
+                                ft.Row([self.backup_format_dropdown, self.incremental_backup_button, self.new_backup_button], alignment=ft.MainAxisAlignment.END),
                             ],
                             alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                         ),
@@ -459,6 +488,8 @@ class BackupView(BaseView):
                     self.progress_modal.hide()
                     
                     if success:
+                        # Los datos cambiaron por completo: reconstruir las vistas en cache
+                        invalidate_views()
                         # Mostrar diálogo de éxito
                         self.page.dialog = self.restore_success_dialog
                         self.restore_success_dialog.open = True
@@ -479,11 +510,15 @@ class BackupView(BaseView):
         except Exception as e:
             self._handle_error("Error al restaurar backup", e)
 
-    def create_backup(self, e):
-        """Crea un nuevo backup"""
+    def _on_backup_format_change(self, e):
+        """Aplica el formato elegido a los backups que se creen a continuación"""
+        self.backup_service.backup_format = self.backup_format_dropdown.value or DEFAULT_BACKUP_FORMAT
+
+    def create_backup(self, e, incremental: bool = False):
+        """Crea un nuevo backup (completo o incremental)"""
         try:
             # Mostrar modal de progreso
-            self.progress_modal.show("Creando backup...")
+            self.progress_modal.show("Creando backup incremental..." if incremental else "Creando backup...")
             
             def progress_callback(progress, status, detail, time_estimate):
                 self.progress_modal.update_progress(progress, status, detail, time_estimate)
@@ -492,7 +527,8 @@ class BackupView(BaseView):
                 try:
                     backup = self.backup_service.create_backup_with_progress(
                         progress_callback=progress_callback,
-                        created_by=self.current_user
+                        created_by=self.current_user,
+                        incremental=incremental
                     )
                     self.progress_modal.hide()
                     self.show_success_message(f"Backup creado exitosamente: {backup.name}")
@@ -559,6 +595,7 @@ class BackupView(BaseView):
     def _set_buttons_state(self, enabled: bool):
         """Habilita o deshabilita los botones de la interfaz"""
         self.new_backup_button.disabled = not enabled
+        self.incremental_backup_button.disabled = not enabled
         for row in self.backup_table.rows:
             for cell in row.cells:
                 if isinstance(cell.content, ft.Row):
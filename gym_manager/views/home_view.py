@@ -1,27 +1,39 @@
 import flet as ft
-from gym_manager.components.header import create_header
+from gym_manager.components.header import create_header, set_header_title
 from gym_manager.components.sidebar import create_sidebar
 from gym_manager.utils.navigation import navigate_to_login
 from gym_manager.utils.database import get_db_session
 from gym_manager.utils.roles import is_module_allowed, get_allowed_modules_by_role
 from gym_manager.views.module_views import (
-    MembersView, PaymentsView, ReportsView,
-    PaymentMethodsView, UsersView, BackupsView, RoutinesView
+    MembersView, PaymentsView, PaymentReceiptView, ReportsView,
+    PaymentMethodsView, UsersView, BackupsView, RoutinesView,
+    ViewCache, set_view_cache
 )
-from gym_manager.views.payment_receipt_view import PaymentReceiptView
-from gym_manager.controllers.payment_controller import PaymentController
-from gym_manager.controllers.member_controller import MemberController
-from datetime import datetime, timedelta
+from gym_manager.services.dashboard_service import DashboardService, DashboardSnapshot
+from datetime import datetime
 
 class HomeView:
     def __init__(self, page: ft.Page, user_rol: str, user_name: str = "Usuario"):
         self.page = page
         self.user_rol = user_rol
         self.user_name = user_name
-        # Inicializar controladores con nuevas sesiones
+        # Inicializar servicios con nuevas sesiones
         self.db_session = get_db_session()
-        self.payment_controller = PaymentController(self.db_session)
-        self.member_controller = MemberController(self.db_session)
+        self.dashboard_service = DashboardService(self.db_session)
+        # Vistas de los módulos ya construidas: se reutilizan al volver a ellos
+        self.view_cache = ViewCache(page)
+        set_view_cache(self.view_cache)
+        # Título de sección y constructor de la vista de cada módulo
+        self.module_views = {
+            "Miembros": ("Gestión de Miembros", lambda: MembersView(self.page)),
+            "Rutinas": ("Gestión de Rutinas", lambda: RoutinesView(self.page)),
+            "Pagos": ("Gestión de Pagos", lambda: PaymentsView(self.page)),
+            "Comprobantes": ("Comprobantes de Pago", lambda: PaymentReceiptView(self.page)),
+            "Estadísticas": ("Informes y Estadísticas", lambda: ReportsView(self.page)),
+            "Métodos de Pago": ("Métodos de Pago", lambda: PaymentMethodsView(self.page)),
+            "Usuarios": ("Gestión de Usuarios", lambda: UsersView(self.page)),
+            "Backup": ("Gestión de Backups", lambda: BackupsView(self.page, self.user_name)),
+        }
         # Inicializar el snackbar
         self.snack = ft.SnackBar(content=ft.Text(""))
         self.page.overlay.append(self.snack)
@@ -32,6 +44,15 @@ class HomeView:
         if hasattr(self, 'db_session'):
             self.db_session.close()
 
+    def close(self):
+        """Cierra las vistas en cache, quita del overlay los controles del home y cierra su sesión"""
+        self.view_cache.clear()
+        set_view_cache(None)
+        for control in (self.snack, getattr(self, 'loading_dialog', None)):
+            if control is not None and control in self.page.overlay:
+                self.page.overlay.remove(control)
+        self.db_session.close()
+
     def setup_page(self):
         self.page.title = "Gym Manager - Home"
         self.page.padding = 0
@@ -60,25 +81,7 @@ class HomeView:
 
         # Contenedor principal para el contenido
         self.main_content = ft.Container(
-            content=ft.Column(
-                controls=[
-                    ft.Text(f"¡Bienvenido, {self.user_name}! 👋", size=32, weight=ft.FontWeight.BOLD),
-                    ft.Text("Selecciona una opción del menú para comenzar.", size=16, color=ft.colors.GREY_700),
-                    ft.Container(height=20),
-                    self.create_stats_row(),
-                    ft.Container(height=30),  # Espacio entre las cards y las tablas
-                    ft.Row(
-                        controls=[
-                            self.create_recent_members_table(),
-                            ft.Container(width=20),  # Espacio entre tablas
-                            self.create_recent_payments_table(),
-                        ],
-                        expand=True,
-                    ),
-                ],
-                scroll=ft.ScrollMode.ADAPTIVE,  # Agregar scroll adaptativo
-                spacing=0,  # Controlar espaciado con márgenes de los hijos
-            ),
+            content=self.create_dashboard_content(),
             expand=True,
             padding=ft.padding.all(20),
             bgcolor=ft.colors.WHITE,
@@ -121,6 +124,27 @@ class HomeView:
         )
         self.page.update()
 
+    def create_dashboard_content(self):
+        return ft.Column(
+            controls=[
+                ft.Text(f"¡Bienvenido, {self.user_name}! 👋", size=32, weight=ft.FontWeight.BOLD),
+                ft.Text("Selecciona una opción del menú para comenzar.", size=16, color=ft.colors.GREY_700),
+                ft.Container(height=20),
+                self.create_stats_row(),
+                ft.Container(height=30),  # Espacio entre las cards y las tablas
+                ft.Row(
+                    controls=[
+                        self.create_recent_members_table(),
+                        ft.Container(width=20),  # Espacio entre tablas
+                        self.create_recent_payments_table(),
+                    ],
+                    expand=True,
+                ),
+            ],
+            scroll=ft.ScrollMode.ADAPTIVE,  # Agregar scroll adaptativo
+            spacing=0,  # Controlar espaciado con márgenes de los hijos
+        )
+
     def show_loading(self):
         try:
             self.loading_dialog.open = True
@@ -136,46 +160,20 @@ class HomeView:
             pass
 
     def create_stats_row(self):
-        # Obtener datos reales de pagos de hoy
-        hoy = datetime.now()
-        inicio_dia = hoy.replace(hour=0, minute=0, second=0, microsecond=0)
-        fin_dia = hoy.replace(hour=23, minute=59, second=59, microsecond=999999)
-        
-        pagos_hoy = self.payment_controller.get_payments({
-            'date_from': inicio_dia,
-            'date_to': fin_dia
-        })
-        # Filtrar solo pagos activos y sumar sus montos
-        total_pagos_hoy = sum(
-            pago.monto for pago in pagos_hoy 
-            if pago.estado == True  # Solo pagos activos
-        )
-
-        # Obtener nuevos miembros del mes actual
-        inicio_mes = datetime.now().replace(day=1, hour=0, minute=0, second=0)
-        fin_mes = (inicio_mes.replace(month=inicio_mes.month + 1) if inicio_mes.month < 12 
-                  else inicio_mes.replace(year=inicio_mes.year + 1, month=1)) - timedelta(days=1)
-        nuevos_miembros = self.member_controller.get_members({
-            'fecha_registro_desde': inicio_mes,
-            'fecha_registro_hasta': fin_mes
-        })
-        total_nuevos = len(nuevos_miembros)
-
-        # Obtener membresías que vencen esta semana
-        inicio_semana = datetime.now().replace(hour=0, minute=0, second=0)
-        fin_semana = inicio_semana + timedelta(days=7)
-        vencimientos = self.member_controller.get_expired_memberships_count()
-
-        # Obtener ingresos totales del mes actual
-        ingresos_mes = self.payment_controller.get_current_month_payments_sum()
+        # Todos los indicadores en una sola consulta; si falla (el servicio ya
+        # registró el error) se muestran en cero para que el home cargue igual
+        try:
+            snapshot = self.dashboard_service.snapshot()
+        except Exception:
+            snapshot = DashboardSnapshot.empty()
         nombre_mes = datetime.now().strftime("%B").capitalize()
 
         return ft.Row(
             controls=[
-                self.create_stat_card("💳 Pagos hoy", f"${total_pagos_hoy:,.2f}", ft.icons.PAYMENT, ft.colors.BLUE),
-                self.create_stat_card("🧍‍♂️ Nuevos miembros este mes", str(total_nuevos), ft.icons.PEOPLE, ft.colors.GREEN),
-                self.create_stat_card("📅 Vencimientos esta semana", str(vencimientos), ft.icons.CALENDAR_TODAY, ft.colors.ORANGE),
-                self.create_stat_card("📈 Ingresos en " + nombre_mes, f"${ingresos_mes:,.2f}", ft.icons.TRENDING_UP, ft.colors.PURPLE),
+                self.create_stat_card("💳 Pagos hoy", f"${snapshot.pagos_hoy:,.2f}", ft.icons.PAYMENT, ft.colors.BLUE),
+                self.create_stat_card("🧍‍♂️ Nuevos miembros este mes", str(snapshot.nuevos_miembros_mes), ft.icons.PEOPLE, ft.colors.GREEN),
+                self.create_stat_card("📅 Vencimientos esta semana", str(snapshot.membresias_vencidas), ft.icons.CALENDAR_TODAY, ft.colors.ORANGE),
+                self.create_stat_card("📈 Ingresos en " + nombre_mes, f"${snapshot.ingresos_mes:,.2f}", ft.icons.TRENDING_UP, ft.colors.PURPLE),
             ],
             alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
         )
@@ -205,11 +203,7 @@ class HomeView:
 
     def create_recent_members_table(self):
         # Obtener los últimos 5 miembros registrados
-        miembros_recientes = self.member_controller.get_members({
-            'limit': 5,
-            'order_by': 'fecha_registro',
-            'order_direction': 'desc'
-        })
+        miembros_recientes = self.dashboard_service.recent_members(5)
 
         # Crear la tabla
         return ft.Container(
@@ -269,11 +263,7 @@ class HomeView:
 
     def create_recent_payments_table(self):
         # Obtener los últimos 5 pagos
-        pagos_recientes = self.payment_controller.get_payments({
-            'limit': 5,
-            'order_by': 'fecha_pago',
-            'order_direction': 'desc'
-        })
+        pagos_recientes = self.dashboard_service.recent_payments(5)
 
         # Crear la tabla
         return ft.Container(
@@ -292,10 +282,10 @@ class HomeView:
                                 rows=[
                                     ft.DataRow(
                                         cells=[
-                                            ft.DataCell(ft.Text(f"{pago.miembro.nombre} {pago.miembro.apellido}")),
+                                            ft.DataCell(ft.Text(f"{pago.nombre} {pago.apellido}")),
                                             ft.DataCell(ft.Text(pago.fecha_pago.strftime("%d/%m/%Y"))),
                                             ft.DataCell(ft.Text(f"${pago.monto:,.2f}")),
-                                            ft.DataCell(ft.Text(pago.metodo_pago.descripcion)),
+                                            ft.DataCell(ft.Text(pago.metodo_pago)),
                                         ]
                                     ) for pago in pagos_recientes
                                 ],
@@ -335,12 +325,6 @@ class HomeView:
         )
 
     def handle_route_change(self, index: int):
-        # Mostrar loader global durante la navegación
-        self.show_loading()
-        # Limpiar el contenido actual
-        self.main_content.content = None
-        previous_title = self.section_title # Guardar título anterior por si acaso
-
         # Mapeo entre índice filtrado y texto de módulo visible actual según el rol
         visible_modules = get_allowed_modules_by_role(self.user_rol)
         # Garantizar el orden coincidente con el sidebar filtrado
@@ -368,90 +352,22 @@ class HomeView:
             self.show_message("No tienes permisos para acceder a este módulo", ft.colors.RED_400)
             return
 
-        # Título de sección según el módulo
-        if selected_module == "Dashboard":
-            self.section_title = "Dashboard"
-            self.main_content.content = ft.Column(
-                controls=[
-                    ft.Text(f"¡Bienvenido, {self.user_name}! 👋", size=32, weight=ft.FontWeight.BOLD),
-                    ft.Text("Selecciona una opción del menú para comenzar.", size=16, color=ft.colors.GREY_700),
-                    ft.Container(height=20),
-                    self.create_stats_row(),
-                    ft.Container(height=30),  # Espacio entre las cards y las tablas
-                    ft.Row(
-                        controls=[
-                            self.create_recent_members_table(),
-                            ft.Container(width=20),  # Espacio entre tablas
-                            self.create_recent_payments_table(),
-                        ],
-                        expand=True,
-                    ),
-                ],
-                scroll=ft.ScrollMode.ADAPTIVE,  # Agregar scroll adaptativo aquí también
-                spacing=0,  # Controlar espaciado con márgenes de los hijos
-            )
-        elif selected_module == "Miembros":
-            self.section_title = "Gestión de Miembros"
-            view = MembersView(self.page)
-            self.main_content.content = view.get_content()
-        elif selected_module == "Rutinas":
-            self.section_title = "Gestión de Rutinas"
-            view = RoutinesView(self.page)
-            self.main_content.content = view.get_content()
-        elif selected_module == "Pagos":
-            self.section_title = "Gestión de Pagos"
-            view = PaymentsView(self.page)
-            self.main_content.content = view.get_content()
-        elif selected_module == "Comprobantes":
-            self.section_title = "Comprobantes de Pago"
-            view = PaymentReceiptView(self.page)
-            self.main_content.content = view.get_content()
-        elif selected_module == "Estadísticas":
-            self.section_title = "Informes y Estadísticas"
-            view = ReportsView(self.page)
-            self.main_content.content = view.get_content()
-        elif selected_module == "Métodos de Pago":
-            self.section_title = "Métodos de Pago"
-            view = PaymentMethodsView(self.page)
-            self.main_content.content = view.get_content()
-        elif selected_module == "Usuarios":
-            self.section_title = "Gestión de Usuarios"
-            view = UsersView(self.page)
-            self.main_content.content = view.get_content()
-        elif selected_module == "Backup":
-            self.section_title = "Gestión de Backups"
-            view = BackupsView(self.page, self.user_name)
-            self.main_content.content = view.get_content()
-        
-        # Actualizar el header con el nuevo título
-        self.header = create_header(
-            page=self.page,
-            user_name=self.user_name,
-            user_role=self.user_rol,
-            on_logout=self.logout,
-            section_title=self.section_title
-        )
-        
+        # Mostrar loader global durante la navegación
+        self.show_loading()
         try:
-            # Reconstruir la interfaz
-            self.page.controls.clear()
-            self.page.add(
-                ft.Column(
-                    controls=[
-                        self.header,
-                        ft.Row(
-                            controls=[
-                                self.sidebar,
-                                ft.VerticalDivider(width=1),
-                                self.main_content,
-                            ],
-                            expand=True,
-                        ),
-                    ],
-                    spacing=0,
-                    expand=True,
-                )
-            )
+            if selected_module == "Dashboard":
+                self.section_title = "Dashboard"
+                # La vista anterior queda en la cache; volver al dashboard lee los datos actuales
+                self.view_cache.deactivate()
+                self.db_session.expire()
+                self.main_content.content = self.create_dashboard_content()
+            else:
+                self.section_title, factory = self.module_views[selected_module]
+                # Reutiliza la vista si está en la cache (solo refresca sus datos)
+                self.main_content.content = self.view_cache.show(selected_module, factory)
+
+            # Actualizar solo el título del header y el contenido principal
+            set_header_title(self.header, self.section_title)
             self.page.update()
         finally:
             # Ocultar loader tras completar la navegación
@@ -467,5 +383,7 @@ class HomeView:
         self.show_message("¡Hasta pronto! Cerrando sesión...", ft.colors.BLUE)
         # Esperar un momento para que se vea el mensaje
         self.page.update()
+        # Cerrar las vistas en cache, los controles del overlay y la sesión del home
+        self.close()
         # Navegar al login
         navigate_to_login(self.page) 
\ No newline at end of file
@@ -1,5 +1,6 @@
 import flet as ft
 from datetime import datetime
+import logging
 import os
 import subprocess
 import tempfile
@@ -9,19 +10,23 @@ from pathlib import Path
 from gym_manager.controllers.member_controller import MemberController
 from gym_manager.controllers.routine_controller import RoutineController
 from gym_manager.utils.database import get_db_session
+from gym_manager.utils.log import get_logger
 from gym_manager.utils.pagination import PaginationController, PaginationWidget
 from gym_manager.views.module_views import ModuleView
 from gym_manager.models.member import Miembro
 
+log = get_logger(__name__)
+
 class MembersView(ModuleView):
     def __init__(self, page: ft.Page):
         self.page = page
         self.title = "Gestión de Miembros"
         self.content = None
         
-        self.member_controller = MemberController(get_db_session())
-        self.routine_controller = RoutineController()
+        # Una sola unidad de trabajo para la vista (se cierra al salir, ver ModuleView.close)
         self.db_session = get_db_session()
+        self.member_controller = MemberController(self.db_session)
+        self.routine_controller = RoutineController()
         
         # Inicializar referencias
         self.new_member_name = ft.Ref[ft.TextField]()
@@ -416,11 +421,10 @@ class MembersView(ModuleView):
             import asyncio
             await asyncio.sleep(0.1)
             
-            members = self.member_controller.get_members()
-            
-            self.pagination_controller.set_items(members)
+            # Paginar en la base de datos: solo se cargan los miembros de la página visible
+            self._set_members_query()
             self.pagination_controller.current_page = 1
-            self.pagination_widget.update_items(members)
+            self.pagination_widget.refresh()
             
             self.update_members_table()
             
@@ -437,20 +441,13 @@ class MembersView(ModuleView):
         Carga los datos de miembros
         """
         try:
-            members = self.member_controller.get_members()
-            
             # Guardar la página actual si se debe preservar
             current_page = self.pagination_controller.current_page if preserve_page else 1
-            
-            self.pagination_controller.set_items(members)
             self.pagination_controller.current_page = current_page
             
-            # Ajustar la página si está fuera de rango
-            total_pages = self.pagination_controller.total_pages
-            if current_page > total_pages and total_pages > 0:
-                self.pagination_controller.current_page = total_pages
-            
-            self.pagination_widget.update_items(members)
+            # La página se ajusta al rango válido al recalcular el total
+            self._set_members_query()
+            self.pagination_widget.refresh()
             
             self.update_members_table()
             
@@ -462,10 +459,24 @@ class MembersView(ModuleView):
             except:
                 pass
 
+    def refresh(self):
+        """Recarga la página actual conservando los filtros al volver a la vista"""
+        super().refresh()
+        self.apply_filters(None)
+        self.page.update()
+
     def _on_page_change(self):
         """Callback cuando cambia la página"""
         self.update_members_table()
 
+    def _set_members_query(self, filters=None):
+        """Pagina los miembros que cumplen `filters` (count_members para el total, get_members por página)"""
+        filters = dict(filters or {})
+        self.pagination_controller.set_query(
+            lambda: self.member_controller.count_members(filters),
+            lambda offset, limit: self.member_controller.get_members(dict(filters, offset=offset, limit=limit))
+        )
+
     def update_members_table(self, miembros=None):
         """
         Actualiza la tabla con los miembros
@@ -731,9 +742,7 @@ class MembersView(ModuleView):
                 "fecha_inicio": self.start_date_picker.value
             }
             
-            # Log para debugging
-            print(f"Fecha de inicio que se enviará: {self.start_date_picker.value}")
-            print(f"Tipo de fecha de inicio: {type(self.start_date_picker.value)}")
+            log.event(logging.DEBUG, 'members.save', fecha_inicio=self.start_date_picker.value)
 
             if self.is_editing:
                 # Actualizar miembro existente
@@ -888,7 +897,7 @@ class MembersView(ModuleView):
             ]
 
             # Previsualización o descarga de archivo
-            if hasattr(rutina, 'documento_rutina') and rutina.documento_rutina:
+            if rutina.tiene_documento:
                 controls.append(ft.Text("Documento de Rutina", size=16, weight=ft.FontWeight.BOLD))
                 controls.append(
                     ft.ElevatedButton(
@@ -926,7 +935,8 @@ class MembersView(ModuleView):
         ext = '.pdf'
         # Si quieres mejorar esto, puedes guardar el nombre original del archivo y extraer la extensión
         with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp_file:
-            tmp_file.write(rutina.documento_rutina)
+            # El documento se lee recién ahora y por bloques
+            self.routine_controller.write_routine_document(rutina.id_rutina, tmp_file)
             tmp_file.flush()
             webbrowser.open(tmp_file.name)
 
@@ -945,19 +955,10 @@ class MembersView(ModuleView):
         if self.membership_type.value and self.membership_type.value != "Todos":
             filters['membership_type'] = self.membership_type.value
         
-        members = self.member_controller.get_members(filters)
-        # Actualizar paginación con los datos filtrados
-        self.pagination_controller.set_items(members)
-        # Solo resetear a página 1 si hay cambios significativos en los filtros
-        # Para cambios menores, mantener la página actual si es posible
-        total_pages = self.pagination_controller.total_pages
-        if self.pagination_controller.current_page > total_pages and total_pages > 0:
-            self.pagination_controller.current_page = total_pages
-        elif total_pages == 0:
-            self.pagination_controller.current_page = 1
-        # Si la página actual es válida, mantenerla
-        
-        self.pagination_widget.update_items(members)
+        # Actualizar paginación con los datos filtrados; la página actual se
+        # mantiene si sigue siendo válida
+        self._set_members_query(filters)
+        self.pagination_widget.refresh()
         self.update_members_table()
 
     def clear_filters(self, e):
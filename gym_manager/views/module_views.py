@@ -1,5 +1,22 @@
+from collections import OrderedDict
+import logging
+from typing import Callable, Dict, List, Optional
+
 import flet as ft
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm.state import InstanceState
 from gym_manager.utils.navigation import db_session
+from gym_manager.utils.database import UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+# Vistas de módulos que se mantienen construidas al navegar (las menos usadas se descartan)
+VIEW_CACHE_SIZE = 4
+
+def _is_detached(value) -> bool:
+    """El valor es un objeto ORM que ya no pertenece a ninguna sesión"""
+    state = sa_inspect(value, raiseerr=False)
+    return isinstance(state, InstanceState) and state.detached
 
 class ModuleView:
     def __init__(self, page: ft.Page, title: str):
@@ -23,6 +40,58 @@ class ModuleView:
             self.setup_view()
         return self.content
 
+    def close(self):
+        """
+        Libera las sesiones de la vista (y de las vistas que contiene) al
+        navegar a otro módulo
+        """
+        for value in list(vars(self).values()):
+            if value is not self and isinstance(value, (ModuleView, UnitOfWork)):
+                value.close()
+
+    def refresh(self):
+        """
+        Vuelve a leer los datos al mostrar de nuevo la vista desde la cache
+        de vistas, sin reconstruir los controles. Por defecto termina la
+        transacción de lectura de sus sesiones y refresca las vistas que
+        contiene; las vistas con tabla recargan la página actual.
+
+        Si una sesión se renovó, los objetos que la vista conservaba quedan
+        desasociados: se descartan y la recarga los vuelve a consultar.
+        """
+        for value in list(vars(self).values()):
+            if value is self:
+                continue
+            if isinstance(value, ModuleView):
+                value.refresh()
+            elif isinstance(value, UnitOfWork):
+                value.expire()
+        self._drop_detached()
+
+    def suspend(self):
+        """
+        Termina las transacciones de lectura de la vista cuando deja de
+        mostrarse pero sigue en la cache, para devolver las conexiones al pool
+        """
+        for value in list(vars(self).values()):
+            if value is self:
+                continue
+            if isinstance(value, ModuleView):
+                value.suspend()
+            elif isinstance(value, UnitOfWork):
+                value.expire()
+        self._drop_detached()
+
+    def _drop_detached(self):
+        """
+        Descarta las referencias a objetos ORM desasociados al renovarse una
+        sesión (seleccionados, listas a exportar), para no usarlos después
+        """
+        for name, value in list(vars(self).items()):
+            items = value if isinstance(value, list) else [value]
+            if items and all(_is_detached(item) for item in items):
+                setattr(self, name, None)
+
     def show_message(self, message: str, color: str = ft.colors.RED_400):
         """
         Muestra un mensaje en la interfaz
@@ -58,6 +127,14 @@ class PaymentsView(ModuleView):
         self.content = self.payment_view.get_content()
         self.page.update()
 
+class PaymentReceiptView(ModuleView):
+    def __init__(self, page: ft.Page):
+        super().__init__(page, "Comprobantes de Pago")
+        from gym_manager.views.payment_receipt_view import PaymentReceiptView as PaymentReceiptViewImpl
+        self.payment_receipt_view = PaymentReceiptViewImpl(page)
+        self.content = self.payment_receipt_view.get_content()
+        self.page.update()
+
 class ReportsView(ModuleView):
     def __init__(self, page: ft.Page):
         super().__init__(page, "Informes y Estadísticas")
@@ -82,6 +159,20 @@ class ReportsView(ModuleView):
         
         self.page.update()
 
+    def refresh(self):
+        # Las tarjetas y gráficos salen de query_cache: solo se consulta lo que cambió
+        super().refresh()
+        self.statistics_controller.db_session.expire()
+        self.page.loop.create_task(self.statistics_controller.initialize_statistics())
+
+    def suspend(self):
+        super().suspend()
+        self.statistics_controller.db_session.expire()
+
+    def close(self):
+        super().close()
+        self.statistics_controller.close()
+
 class PaymentMethodsView(ModuleView):
     def __init__(self, page: ft.Page):
         super().__init__(page, "Métodos de Pago")
@@ -107,4 +198,155 @@ class BackupsView(ModuleView):
         # Crear la vista de backup con los argumentos necesarios
         self.backup_view = BackupViewImpl(page, db_path, db_session, current_user)
         self.content = self.backup_view.get_content()
-        self.page.update() 
\ No newline at end of file
+        self.page.update()
+
+    def refresh(self):
+        # La sesión compartida puede renovarse aquí: la lista se vuelve a consultar
+        db_session.expire()
+        self.backup_view.load_backups(preserve_page=True)
+
+
+class ViewCache:
+    """
+    Cache LRU de las vistas de módulos de HomeView.
+
+    Al volver a un módulo se reutiliza su árbol de controles y solo se
+    refrescan los datos (ModuleView.refresh). Los controles que la vista
+    agrega a page.overlay (DatePickers, diálogos, FilePickers) se registran
+    mientras está activa y se quitan al descartarla, para que el overlay no
+    crezca con cada navegación.
+
+    Uso:
+        content = cache.show("Miembros", lambda: MembersView(page))
+        cache.invalidate("Pagos")   # se reconstruye la próxima vez
+        cache.clear()               # al cerrar sesión
+    """
+
+    def __init__(self, page: ft.Page, max_views: int = VIEW_CACHE_SIZE):
+        self.page = page
+        self.max_views = max_views
+        self._views: "OrderedDict[str, ModuleView]" = OrderedDict()
+        self._contents: Dict[str, ft.Control] = {}
+        self._overlay: Dict[str, List[ft.Control]] = {}
+        self._stale = set()
+        self._active: Optional[str] = None
+        self._overlay_mark = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def active_view(self) -> Optional[ModuleView]:
+        return self._views.get(self._active)
+
+    def show(self, module: str, factory: Callable[[], ModuleView]) -> ft.Control:
+        """
+        Activa la vista de un módulo: la reutiliza (refrescando sus datos)
+        si está en la cache o la construye con `factory`
+
+        Returns:
+            ft.Control: el contenido de la vista (get_content se llama una sola vez)
+        """
+        self.deactivate()
+        self._active = module
+        self._overlay_mark = {id(control) for control in self.page.overlay}
+
+        view = self._views.get(module)
+        if view is not None:
+            self._views.move_to_end(module)
+            self.hits += 1
+            view.refresh()
+            return self._contents[module]
+
+        self.misses += 1
+        view = factory()
+        content = view.get_content()
+        self._views[module] = view
+        self._contents[module] = content
+        self._overlay.setdefault(module, [])
+        while len(self._views) > self.max_views:
+            self._discard(next(iter(self._views)))
+            self.evictions += 1
+        return content
+
+    def deactivate(self):
+        """
+        Marca que la vista activa deja de mostrarse (por ejemplo, al volver
+        al dashboard) y le asigna los controles que agregó al overlay
+        """
+        module, self._active = self._active, None
+        if module is None or module not in self._views:
+            return
+        self._views[module].suspend()
+        owned = self._overlay[module]
+        owned_ids = {id(control) for control in owned}
+        owned.extend(
+            control for control in self.page.overlay
+            if id(control) not in self._overlay_mark and id(control) not in owned_ids
+        )
+        self._overlay_mark = set()
+        if module in self._stale:
+            self._discard(module)
+
+    def invalidate(self, *modules: str):
+        """
+        Descarta las vistas indicadas (todas si no se indica ninguna) para
+        que se reconstruyan la próxima vez. La vista que se está mostrando
+        se descarta al salir de ella.
+        """
+        for module in list(modules or self._views):
+            if module not in self._views:
+                continue
+            if module == self._active:
+                self._stale.add(module)
+            else:
+                self._discard(module)
+
+    def clear(self):
+        """Cierra y descarta todas las vistas (al cerrar sesión)"""
+        self.deactivate()
+        for module in list(self._views):
+            self._discard(module)
+
+    def stats(self) -> Dict[str, int]:
+        """Devuelve los contadores de aciertos, fallos y desalojos"""
+        return {
+            'size': len(self._views),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def _discard(self, module: str):
+        view = self._views.pop(module)
+        self._contents.pop(module, None)
+        self._stale.discard(module)
+        if module == self._active:
+            self._active = None
+        for control in self._overlay.pop(module, []):
+            if control in self.page.overlay:
+                self.page.overlay.remove(control)
+        try:
+            view.close()
+        except Exception as e:
+            logger.error(f"Error al cerrar la vista {module}: {e}")
+        logger.debug(f"Vista descartada de la cache: {module}")
+
+
+# Cache de vistas de la sesión actual (la registra HomeView)
+view_cache: Optional[ViewCache] = None
+
+
+def set_view_cache(cache: Optional[ViewCache]):
+    """Establece la cache de vistas global (None al cerrar sesión)"""
+    global view_cache
+    view_cache = cache
+
+
+def invalidate_views(*modules: str):
+    """
+    Pide reconstruir las vistas de los módulos indicados (todas si no se
+    indica ninguna), por ejemplo después de restaurar un backup
+    """
+    if view_cache is not None:
+        view_cache.invalidate(*modules) 
\ No newline at end of file
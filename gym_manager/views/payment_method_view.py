@@ -12,8 +12,9 @@ class PaymentMethodView(ModuleView):
         self.title = "Gestión de Métodos de Pago"
         self.content = None
         
-        # Inicializar controlador
-        self.payment_method_controller = PaymentMethodController(get_db_session())
+        # Inicializar controlador con la unidad de trabajo de la vista
+        self.db_session = get_db_session()
+        self.payment_method_controller = PaymentMethodController(self.db_session)
         
         # Inicializar paginación ANTES de setup_payment_method_view
         from gym_manager.utils.pagination import PaginationController, PaginationWidget
@@ -524,6 +525,11 @@ class PaymentMethodView(ModuleView):
             # Como fallback, al menos refrescar la tabla con lo que haya
             self.update_methods_table()
 
+    def refresh(self):
+        """Recarga la página actual conservando los filtros al volver a la vista"""
+        super().refresh()
+        self.refresh_methods_preserving_state()
+
     def update_methods_table(self, methods=None):
         """
         Actualiza la tabla de métodos de pago
@@ -644,7 +650,7 @@ class PaymentMethodView(ModuleView):
             most_used_method = None
             max_payments = 0
             for method in methods:
-                payment_count = len(method['pagos'])
+                payment_count = method['cantidad_pagos']
                 if payment_count > max_payments:
                     max_payments = payment_count
                     most_used_method = method
@@ -858,15 +864,11 @@ class PaymentMethodView(ModuleView):
 
     def show_history_modal(self, method):
         try:
-            # Obtener todos los métodos para calcular el total de pagos
-            all_methods = self.payment_method_controller.get_payment_methods()
-            total_pagos = sum(len(m['pagos']) for m in all_methods)
-            pagos = method['pagos'][-5:] if len(method['pagos']) > 0 else []
-            total_acumulado = sum(p['monto'] for p in method['pagos'])
-            porcentaje = (len(method['pagos']) / total_pagos * 100) if total_pagos > 0 else 0
+            # Los totales ya vienen agregados; solo se consultan los últimos 5 pagos
+            pagos = self.payment_method_controller.get_recent_payments(method['id_metodo_pago'], limit=5)
 
             # Actualizar contenido del modal
-            stats_text = f"Total acumulado: ${total_acumulado:,.2f} | Cantidad de pagos: {len(method['pagos'])} | % del total: {porcentaje:.1f}%"
+            stats_text = f"Total acumulado: ${method['total_pagos']:,.2f} | Cantidad de pagos: {method['cantidad_pagos']} | % del total: {method['porcentaje']:.1f}%"
             
             pagos_rows = []
             for pago in pagos:
@@ -15,8 +15,9 @@ class PaymentReceiptView(ModuleView):
         self.title = "Comprobantes de Pago"
         self.content = None
         
-        # Inicializar controlador
-        self.payment_receipt_controller = PaymentReceiptController(get_db_session())
+        # Inicializar controlador con la unidad de trabajo de la vista
+        self.db_session = get_db_session()
+        self.payment_receipt_controller = PaymentReceiptController(self.db_session)
         
         # Inicializar paginación ANTES de setup_view
         from gym_manager.utils.pagination import PaginationController, PaginationWidget
@@ -206,29 +207,49 @@ class PaymentReceiptView(ModuleView):
             import asyncio
             await asyncio.sleep(0.1)
             
-            filters = {}
-            if self.date_from_value:
-                filters['fecha_desde'] = self.date_from_value
-            if self.date_to_value:
-                filters['fecha_hasta'] = self.date_to_value
-
-            receipts = self.payment_receipt_controller.get_receipts(filters)
-            
-            # Actualizar paginación
-            self.pagination_controller.set_items(receipts)
+            # Actualizar paginación: solo se consulta la página visible
+            self._set_receipts_query(self._collect_filters())
             self.pagination_controller.current_page = 1
-            self.pagination_widget.update_items(receipts)
+            self.pagination_widget.refresh()
             
             # Actualizar tabla
-            self.update_receipts_table(receipts)
+            self.update_receipts_table()
             
         except Exception as e:
             self.show_message(f"Error al cargar los comprobantes: {str(e)}", ft.colors.RED)
     
+    def refresh(self):
+        """Recarga la página actual conservando los filtros al volver a la vista"""
+        super().refresh()
+        try:
+            # set_query conserva la página actual y la ajusta si quedó fuera de rango
+            self._set_receipts_query(self._collect_filters())
+            self.pagination_widget.refresh()
+            self.update_receipts_table()
+            self.page.update()
+        except Exception as e:
+            self.show_message(f"Error al cargar los comprobantes: {str(e)}", ft.colors.RED)
+
     def _on_page_change(self):
         """Callback cuando cambia la página"""
         self.update_receipts_table()
 
+    def _collect_filters(self):
+        filters = {}
+        if self.date_from_value:
+            filters['fecha_desde'] = self.date_from_value
+        if self.date_to_value:
+            filters['fecha_hasta'] = self.date_to_value
+        return filters
+
+    def _set_receipts_query(self, filters=None):
+        """Pagina los comprobantes del rango de fechas de `filters`; las filas no cargan el PDF"""
+        filters = dict(filters or {})
+        self.pagination_controller.set_query(
+            lambda: self.payment_receipt_controller.count_receipts(filters),
+            lambda offset, limit: self.payment_receipt_controller.get_receipts(dict(filters, offset=offset, limit=limit))
+        )
+
     def open_date_picker(self, picker):
         picker.open = True
         self.page.update()
@@ -251,26 +272,13 @@ class PaymentReceiptView(ModuleView):
         Carga los datos de los comprobantes
         """
         try:
-            filters = {}
-            if self.date_from_value:
-                filters['fecha_desde'] = self.date_from_value
-            if self.date_to_value:
-                filters['fecha_hasta'] = self.date_to_value
-
-            receipts = self.payment_receipt_controller.get_receipts(filters)
-            
             # Guardar la página actual si se debe preservar
             current_page = self.pagination_controller.current_page if preserve_page else 1
-            
-            self.pagination_controller.set_items(receipts)
             self.pagination_controller.current_page = current_page
             
-            # Ajustar la página si está fuera de rango
-            total_pages = self.pagination_controller.total_pages
-            if current_page > total_pages and total_pages > 0:
-                self.pagination_controller.current_page = total_pages
-            
-            self.pagination_widget.update_items(receipts)
+            # La página se ajusta al rango válido al recalcular el total
+            self._set_receipts_query(self._collect_filters())
+            self.pagination_widget.refresh()
             self.update_receipts_table()
         except Exception as e:
             self.show_message(f"Error al cargar los comprobantes: {str(e)}", ft.colors.RED)
@@ -3,22 +3,21 @@ from gym_manager.views.module_views import ModuleView
 from gym_manager.models.payment import Pago
 from gym_manager.controllers.payment_controller import PaymentController
 from gym_manager.utils.database import get_db_session
+from gym_manager.utils.log import get_logger
 from gym_manager.controllers.monthly_fee_controller import MonthlyFeeController
+from gym_manager.controllers.payment_method_controller import PaymentMethodController
 from datetime import datetime
 from gym_manager.models.member import Miembro
 from gym_manager.models.payment_method import MetodoPago
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 import os
-from gym_manager.models.monthly_fee import CuotaMensual
 from gym_manager.utils.database import session_scope
 from sqlalchemy.orm import joinedload
 import subprocess
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+# reportlab y openpyxl se importan al exportar: no cargan al abrir la vista
 from types import SimpleNamespace
+import logging
+
+log = get_logger(__name__)
 
 class PaymentsView(ModuleView):
     def __init__(self, page: ft.Page):
@@ -28,9 +27,11 @@ class PaymentsView(ModuleView):
         self.content = None
         
         # Inicializar controladores
-        self.payment_controller = PaymentController(get_db_session())
-        self.monthly_fee_controller = MonthlyFeeController(get_db_session())
+        # Una sola unidad de trabajo para la vista (se cierra al salir, ver ModuleView.close)
         self.db_session = get_db_session()
+        self.payment_controller = PaymentController(self.db_session)
+        self.monthly_fee_controller = MonthlyFeeController(self.db_session)
+        self.payment_method_controller = PaymentMethodController(self.db_session)
         self.current_monthly_fee = None  # Variable para almacenar la cuota mensual actual
         self.selected_member_data = None  # Variable para almacenar el miembro seleccionado
         
@@ -824,37 +825,27 @@ class PaymentsView(ModuleView):
             import asyncio
             await asyncio.sleep(0.1)
             
-            # Cargar pagos usando session_scope para evitar problemas de sesión
-            with session_scope() as session:
-                # Recrear el controlador con la nueva sesión
-                temp_controller = PaymentController(session)
-                payments = [p for p in temp_controller.get_payments() if p.estado == 1]
-                
-                # Mapear a objetos livianos antes de cerrar la sesión
-                mapped_payments = self._map_payments(payments)
-                # Actualizar paginación
-                self.pagination_controller.set_items(mapped_payments)
-                self.pagination_controller.current_page = 1
-                self.pagination_widget.update_items(mapped_payments)
-                
-                # Actualizar tabla (usar página actual)
-                self.update_payments_table()
+            # Paginar en la base de datos: solo se cargan los pagos de la página visible
+            self._set_payments_query({'estado': 1})
+            self.pagination_controller.current_page = 1
+            self.pagination_widget.refresh()
             
-            # Cargar la cuota mensual actual
+            # Actualizar tabla (usar página actual)
+            self.update_payments_table()
+            
+            # Cargar la cuota mensual actual (en cache)
             try:
-                with session_scope() as session:
-                    current_fee = session.query(CuotaMensual).filter_by(activo=1).first()
-                    self.current_monthly_fee = current_fee.monto if current_fee else None
+                current_fee = self.monthly_fee_controller.get_current_fee()
+                self.current_monthly_fee = current_fee.monto if current_fee else None
             except Exception:
                 self.current_monthly_fee = None
 
-            # Cargar métodos de pago activos usando session_scope
+            # Cargar métodos de pago activos (en cache)
             try:
-                with session_scope() as session:
-                    active_payment_methods = session.query(MetodoPago).filter_by(estado=True).all()
-                    self.new_payment_method_field.options = [
-                        ft.dropdown.Option(method.descripcion) for method in active_payment_methods
-                    ]
+                active_payment_methods = self.payment_method_controller.get_active_payment_methods()
+                self.new_payment_method_field.options = [
+                    ft.dropdown.Option(method['descripcion']) for method in active_payment_methods
+                ]
             except Exception:
                 pass
                 
@@ -865,6 +856,25 @@ class PaymentsView(ModuleView):
         """Callback cuando cambia la página"""
         self.update_payments_table()
 
+    def _set_payments_query(self, filters=None):
+        """
+        Pagina los pagos que cumplen `filters`. Cada consulta usa su propia
+        sesión y las filas se mapean a objetos livianos antes de cerrarla.
+        """
+        filters = dict(filters or {})
+
+        def count_payments():
+            with session_scope() as session:
+                return PaymentController(session).count_payments(filters)
+
+        def fetch_payments(offset, limit):
+            # Mapear a objetos livianos antes de cerrar la sesión
+            with session_scope() as session:
+                page_filters = dict(filters, offset=offset, limit=limit)
+                return self._map_payments(PaymentController(session).get_payments(page_filters))
+
+        self.pagination_controller.set_query(count_payments, fetch_payments)
+
     def create_summary_card(self, title: str, value: str, icon: str, color: str):
         return ft.Container(
             content=ft.Column(
@@ -981,52 +991,39 @@ class PaymentsView(ModuleView):
         """
         Carga los datos iniciales de la vista
         """
-        # Cargar pagos usando session_scope para evitar problemas de sesión
+        # Cargar solo la página visible de pagos desde la base de datos
         try:
-            with session_scope() as session:
-                # Recrear el controlador con la nueva sesión
-                temp_controller = PaymentController(session)
-                payments = [p for p in temp_controller.get_payments() if p.estado == 1]
-                mapped_payments = self._map_payments(payments)
-                
-                # Guardar la página actual si se debe preservar
-                current_page = self.pagination_controller.current_page if preserve_page else 1
-                
-                self.pagination_controller.set_items(mapped_payments)
-                self.pagination_controller.current_page = current_page
-                
-                # Ajustar la página si está fuera de rango
-                total_pages = self.pagination_controller.total_pages
-                if current_page > total_pages and total_pages > 0:
-                    self.pagination_controller.current_page = total_pages
-                
-                self.pagination_widget.update_items(mapped_payments)
-                
-                # Actualizar la tabla con los datos de la página actual
-                current_page_items = self.pagination_controller.get_current_page_items()
-                self.update_payments_table(current_page_items)
+            # Guardar la página actual si se debe preservar
+            current_page = self.pagination_controller.current_page if preserve_page else 1
+            self.pagination_controller.current_page = current_page
+            
+            # La página se ajusta al rango válido al recalcular el total
+            self._set_payments_query({'estado': 1})
+            self.pagination_widget.refresh()
+            
+            # Actualizar la tabla con los datos de la página actual
+            current_page_items = self.pagination_controller.get_current_page_items()
+            self.update_payments_table(current_page_items)
         except Exception as e:
-            print(f"Error en load_data: {e}")  # Debug
+            log.event(logging.ERROR, 'payments.load_data.error', error=str(e))
             self.update_payments_table([])
 
-        # Cargar la cuota mensual actual
+        # Cargar la cuota mensual actual (en cache)
         try:
-            with session_scope() as session:
-                current_fee = session.query(CuotaMensual).filter_by(activo=1).first()
-                self.current_monthly_fee = current_fee.monto if current_fee else None
+            current_fee = self.monthly_fee_controller.get_current_fee()
+            self.current_monthly_fee = current_fee.monto if current_fee else None
         except Exception:
             self.current_monthly_fee = None
 
-        # Cargar métodos de pago activos usando session_scope
+        # Cargar métodos de pago activos (en cache)
         try:
-            with session_scope() as session:
-                active_payment_methods = session.query(MetodoPago).filter_by(estado=True).all()
-                self.new_payment_method_field.options = [
-                    ft.dropdown.Option(method.descripcion) for method in active_payment_methods
-                ]
-                self.edit_payment_method_field.options = [
-                    ft.dropdown.Option(method.descripcion) for method in active_payment_methods
-                ]
+            active_payment_methods = self.payment_method_controller.get_active_payment_methods()
+            self.new_payment_method_field.options = [
+                ft.dropdown.Option(method['descripcion']) for method in active_payment_methods
+            ]
+            self.edit_payment_method_field.options = [
+                ft.dropdown.Option(method['descripcion']) for method in active_payment_methods
+            ]
         except Exception:
             pass
         
@@ -1047,6 +1044,8 @@ class PaymentsView(ModuleView):
             filters['estado'] = 1
         elif getattr(self, 'status_filter', None) and self.status_filter.value == "Cancelado":
             filters['estado'] = 0
+        if getattr(self, 'payment_method_filter', None) and self.payment_method_filter.value in ("Mensual", "Anual"):
+            filters['membership_type'] = self.payment_method_filter.value
         return filters
 
     def refresh_payments_preserving_state(self):
@@ -1054,29 +1053,21 @@ class PaymentsView(ModuleView):
         Recarga la grilla de pagos preservando filtros y la página actual.
         """
         try:
-            current_page = self.pagination_controller.current_page
             filters = self._collect_payment_filters()
-            with session_scope() as session:
-                temp_controller = PaymentController(session)
-                payments = temp_controller.get_payments(filters)
-                # Por si el controlador no aplicó estado, filtrar aquí también
-                if 'estado' in filters:
-                    payments = [p for p in payments if p.estado == filters['estado']]
-                mapped_payments = self._map_payments(payments)
-                self.pagination_controller.set_items(mapped_payments)
-                total_pages = self.pagination_controller.total_pages if hasattr(self.pagination_controller, 'total_pages') else self.pagination_controller.get_total_pages()
-                if current_page > total_pages and total_pages > 0:
-                    current_page = total_pages
-                if total_pages == 0:
-                    current_page = 1
-                self.pagination_controller.current_page = current_page
-                self.pagination_widget.update_items(mapped_payments)
-                self.update_payments_table()
-                self.page.update()
+            # set_query conserva la página actual y la ajusta si quedó fuera de rango
+            self._set_payments_query(filters)
+            self.pagination_widget.refresh()
+            self.update_payments_table()
+            self.page.update()
         except Exception:
             # Como fallback, al menos refrescar la tabla con lo que haya
             self.update_payments_table()
 
+    def refresh(self):
+        """Recarga la página actual conservando los filtros al volver a la vista"""
+        super().refresh()
+        self.refresh_payments_preserving_state()
+
     def update_payments_table(self, payments=None):
         """
         Actualiza la tabla de pagos con datos reales
@@ -1207,36 +1198,16 @@ class PaymentsView(ModuleView):
         # Filtro por método de pago (se populará con métodos activos)
         selected_methods = self.payment_method_filter.value if hasattr(self, 'payment_method_filter') else "Todos"
         
+        # Aplicar filtro de tipo de membresía si corresponde
+        if selected_methods in ("Mensual", "Anual"):
+            filters['membership_type'] = selected_methods
+        
         try:
-            with session_scope() as session:
-                # Recrear el controlador con la nueva sesión
-                temp_controller = PaymentController(session)
-                payments = temp_controller.get_payments(filters)
-                # Si el filtro es por estado, filtrar aquí también por si acaso
-                if 'estado' in filters:
-                    payments = [p for p in payments if p.estado == filters['estado']]
-
-                # Aplicar filtro de tipo de membresía si corresponde
-                if selected_methods in ("Mensual", "Anual"):
-                    try:
-                        payments = [p for p in payments if getattr(p.miembro, 'tipo_membresia', None) == selected_methods]
-                    except Exception:
-                        pass
-
-                mapped_payments = self._map_payments(payments)
-                # Actualizar paginación con los datos filtrados
-                self.pagination_controller.set_items(mapped_payments)
-                # Solo resetear a página 1 si hay cambios significativos en los filtros
-                # Para cambios menores, mantener la página actual si es posible
-                total_pages = self.pagination_controller.total_pages
-                if self.pagination_controller.current_page > total_pages and total_pages > 0:
-                    self.pagination_controller.current_page = total_pages
-                elif total_pages == 0:
-                    self.pagination_controller.current_page = 1
-                # Si la página actual es válida, mantenerla
-                
-                self.pagination_widget.update_items(mapped_payments)
-                self.update_payments_table()
+            # Actualizar paginación con los datos filtrados; la página actual se
+            # mantiene si sigue siendo válida
+            self._set_payments_query(filters)
+            self.pagination_widget.refresh()
+            self.update_payments_table()
         except Exception:
             self.update_payments_table([])
 
@@ -1273,9 +1244,9 @@ class PaymentsView(ModuleView):
                 
                 # Asegurar que el dropdown de métodos de pago de edición tenga opciones
                 try:
-                    active_payment_methods = session.query(MetodoPago).filter_by(estado=True).all()
+                    active_payment_methods = self.payment_method_controller.get_active_payment_methods()
                     self.edit_payment_method_field.options = [
-                        ft.dropdown.Option(method.descripcion) for method in active_payment_methods
+                        ft.dropdown.Option(method['descripcion']) for method in active_payment_methods
                     ]
                 except Exception:
                     self.edit_payment_method_field.options = []
@@ -1346,10 +1317,6 @@ class PaymentsView(ModuleView):
         self.page.update()
 
     def update_payment(self, e):
-        try:
-            print("DEBUG[PaymentsView]: update_payment handler invoked")
-        except Exception:
-            pass
         if not hasattr(self, 'selected_payment_id') or not self.selected_payment_id:
             self.show_message("No hay pago seleccionado para editar", ft.colors.RED)
             return
@@ -1372,10 +1339,7 @@ class PaymentsView(ModuleView):
         if not method_id:
             self.show_message("No se pudo resolver el método de pago", ft.colors.RED)
             return
-        try:
-            print(f"DEBUG[PaymentsView]: update_payment -> elegido='{chosen_method_desc}', id_resuelto={method_id}")
-        except Exception:
-            pass
+        log.event(logging.DEBUG, 'payments.update.method', method=chosen_method_desc, method_id=method_id)
         
         payment_data = {
             'fecha_pago': self.edit_payment_date_value,
@@ -1384,16 +1348,8 @@ class PaymentsView(ModuleView):
             'id_metodo_pago': method_id,
             'referencia': self.edit_payment_observations_field.value
         }
-        try:
-            print(f"DEBUG[PaymentsView]: update_payment -> enviando update con payment_id={self.selected_payment_id}")
-        except Exception:
-            pass
-        
         success, message = self.payment_controller.update_payment(self.selected_payment_id, payment_data)
-        try:
-            print(f"DEBUG[PaymentsView]: update_payment -> resultado success={success}, message='{message}'")
-        except Exception:
-            pass
+        log.event(logging.DEBUG, 'payments.update', payment_id=self.selected_payment_id, success=success, message=message)
         if success:
             self.show_message(message, ft.colors.GREEN)
             self.close_edit_modal(e)
@@ -1463,6 +1419,10 @@ class PaymentsView(ModuleView):
             return
 
         try:
+            from reportlab.lib import colors
+            from reportlab.lib.pagesizes import letter
+            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
             # Crear el documento PDF
             downloads_path = os.path.expanduser("~/Downloads")
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -1743,6 +1703,10 @@ class PaymentsView(ModuleView):
                     })
                     
                     # Generar el comprobante PDF
+                    from reportlab.lib import colors
+                    from reportlab.lib.pagesizes import letter
+                    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+                    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
                     downloads_path = os.path.expanduser("~/Downloads")
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     pdf_path = os.path.join(downloads_path, f"comprobante_pago_{timestamp}.pdf")
@@ -2246,6 +2210,9 @@ class PaymentsView(ModuleView):
         if hasattr(self, 'overdue_alert'):
             self.overdue_alert.open = False
             self.page.update()
+            # La alerta se crea de nuevo cada vez: no dejarla en el overlay
+            if self.overdue_alert in self.page.overlay:
+                self.page.overlay.remove(self.overdue_alert)
 
     def show_edit_fee_modal(self, e):
         """
@@ -2356,6 +2323,9 @@ class PaymentsView(ModuleView):
         Realiza la exportación a Excel
         """
         try:
+            import openpyxl
+            from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+
             # Crear un nuevo libro de Excel
             wb = openpyxl.Workbook()
             ws = wb.active
@@ -2465,6 +2435,10 @@ class PaymentsView(ModuleView):
         Realiza la exportación a PDF
         """
         try:
+            from reportlab.lib import colors
+            from reportlab.lib.pagesizes import letter
+            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
             # Crear el documento PDF
             doc = SimpleDocTemplate(
                 os.path.join(downloads_path, f"pagos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"),
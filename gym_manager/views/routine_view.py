@@ -1,6 +1,5 @@
 import flet as ft
 from gym_manager.views.module_views import ModuleView
-from gym_manager.utils.database import get_db_session
 from gym_manager.models.routine import Rutina
 from gym_manager.controllers.routine_controller import RoutineController
 from gym_manager.utils.pagination import PaginationController, PaginationWidget
@@ -267,11 +266,10 @@ class RoutinesView(ModuleView):
             import asyncio
             await asyncio.sleep(0.1)
             
-            rutinas = self.routine_controller.get_routines()
-            
-            self.pagination_controller.set_items(rutinas)
+            # Paginar en la base de datos: solo se cargan las rutinas de la página visible
+            self._set_routines_query()
             self.pagination_controller.current_page = 1
-            self.pagination_widget.update_items(rutinas)
+            self.pagination_widget.refresh()
             
             self.update_routines_table()
             
@@ -311,24 +309,17 @@ class RoutinesView(ModuleView):
         Carga los datos iniciales de la vista y actualiza la UI
         """
         try:
-            rutinas = self.routine_controller.get_routines()
-            
-            if not rutinas:
-                self.show_message("No hay rutinas registradas", ft.colors.ORANGE)
-            
             # Guardar la página actual si se debe preservar
             current_page = self.pagination_controller.current_page if preserve_page else 1
-            
-            # Actualizar paginación
-            self.pagination_controller.set_items(rutinas)
             self.pagination_controller.current_page = current_page
             
-            # Ajustar la página si está fuera de rango
-            total_pages = self.pagination_controller.total_pages
-            if current_page > total_pages and total_pages > 0:
-                self.pagination_controller.current_page = total_pages
+            # Actualizar paginación; la página se ajusta al rango válido al recalcular el total
+            self._set_routines_query()
+            
+            if not self.pagination_controller.total_items:
+                self.show_message("No hay rutinas registradas", ft.colors.ORANGE)
             
-            self.pagination_widget.update_items(rutinas)
+            self.pagination_widget.refresh()
             
             self.update_routines_table()
             self.page.update()
@@ -340,6 +331,14 @@ class RoutinesView(ModuleView):
         """Callback cuando cambia la página"""
         self.update_routines_table()
 
+    def _set_routines_query(self, filters=None):
+        """Pagina las rutinas que cumplen `filters`; el controlador abre una sesión por consulta"""
+        filters = dict(filters or {})
+        self.pagination_controller.set_query(
+            lambda: self.routine_controller.count_routines(filters),
+            lambda offset, limit: self.routine_controller.get_routines(dict(filters, offset=offset, limit=limit))
+        )
+
     def _collect_filters(self):
         filters = {}
         if self.search_field.value:
@@ -349,17 +348,10 @@ class RoutinesView(ModuleView):
         return filters
 
     def refresh_routines_preserving_state(self):
-        current_page = self.pagination_controller.current_page
         filters = self._collect_filters()
-        rutinas = self.routine_controller.get_routines(filters)
-        self.pagination_controller.set_items(rutinas)
-        total_pages = self.pagination_controller.total_pages if hasattr(self.pagination_controller, 'total_pages') else self.pagination_controller.get_total_pages()
-        if total_pages == 0:
-            current_page = 1
-        elif current_page > total_pages:
-            current_page = total_pages
-        self.pagination_controller.current_page = current_page
-        self.pagination_widget.update_items(rutinas)
+        # set_query conserva la página actual y la ajusta si quedó fuera de rango
+        self._set_routines_query(filters)
+        self.pagination_widget.refresh()
         self.update_routines_table()
         try:
             self.routines_table.update()
@@ -367,6 +359,11 @@ class RoutinesView(ModuleView):
             pass
         self.page.update()
 
+    def refresh(self):
+        """Recarga la página actual conservando los filtros al volver a la vista"""
+        super().refresh()
+        self.refresh_routines_preserving_state()
+
     def update_routines_table(self, rutinas=None):
         """
         Actualiza la tabla con las rutinas
@@ -419,8 +416,8 @@ class RoutinesView(ModuleView):
 
         for rutina in rutinas:
             
-            # Contar miembros asignados
-            miembros_asignados = self.routine_controller.count_members_assigned_to_routine(rutina.id_rutina)
+            # Miembros asignados (calculado en la misma consulta del listado)
+            miembros_asignados = rutina.miembros_asignados
             
             # Crear botones de acciones
             action_buttons = [
@@ -814,7 +811,7 @@ class RoutinesView(ModuleView):
             ft.Divider(),
         ]
         # Previsualización o descarga de archivo
-        if hasattr(rutina, 'documento_rutina') and rutina.documento_rutina:
+        if rutina.tiene_documento:
             controls.append(ft.Text("Documento de Rutina", size=16, weight=ft.FontWeight.BOLD))
             controls.append(
                 ft.ElevatedButton(
@@ -847,7 +844,8 @@ class RoutinesView(ModuleView):
         ext = '.pdf'
         # Si quieres mejorar esto, puedes guardar el nombre original del archivo y extraer la extensión
         with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp_file:
-            tmp_file.write(rutina.documento_rutina)
+            # El documento se lee recién ahora y por bloques
+            self.routine_controller.write_routine_document(rutina.id_rutina, tmp_file)
             tmp_file.flush()
             webbrowser.open(tmp_file.name)
 
@@ -864,20 +862,10 @@ class RoutinesView(ModuleView):
             if self.difficulty_filter.value and self.difficulty_filter.value != "Todas":
                 filters['nivel_dificultad'] = self.difficulty_filter.value
             
-            rutinas = self.routine_controller.get_routines(filters)
-            
-            # Actualizar paginación con los datos filtrados
-            self.pagination_controller.set_items(rutinas)
-            # Solo resetear a página 1 si hay cambios significativos en los filtros
-            # Para cambios menores, mantener la página actual si es posible
-            total_pages = self.pagination_controller.total_pages
-            if self.pagination_controller.current_page > total_pages and total_pages > 0:
-                self.pagination_controller.current_page = total_pages
-            elif total_pages == 0:
-                self.pagination_controller.current_page = 1
-            # Si la página actual es válida, mantenerla
-            
-            self.pagination_widget.update_items(rutinas)
+            # Actualizar paginación con los datos filtrados; la página actual se
+            # mantiene si sigue siendo válida
+            self._set_routines_query(filters)
+            self.pagination_widget.refresh()
             self.update_routines_table()
         except Exception as ex:
             self.show_message(f"Error al aplicar filtros: {str(ex)}", ft.colors.RED)
@@ -1070,7 +1058,7 @@ class RoutinesView(ModuleView):
 
             # Miembros Asignados
             cell = ws.cell(row=row, column=4)
-            miembros_asignados = self.routine_controller.count_members_assigned_to_routine(rutina.id_rutina)
+            miembros_asignados = rutina.miembros_asignados
             cell.value = miembros_asignados
             cell.border = border
             cell.alignment = Alignment(horizontal='center', vertical='center')
@@ -1159,7 +1147,7 @@ class RoutinesView(ModuleView):
             data = [["Nombre", "Dificultad", "Descripción", "Miembros Asignados", "Fecha Creación"]]
             
             for rutina in rutinas:
-                miembros_asignados = self.routine_controller.count_members_assigned_to_routine(rutina.id_rutina)
+                miembros_asignados = rutina.miembros_asignados
                 data.append([
                     rutina.nombre,
                     rutina.nivel_dificultad,
@@ -16,8 +16,9 @@ class UsersView(ModuleView):
         self.title = "Gestión de Usuarios"
         self.content = None
         
-        # Inicializar controlador
-        self.user_controller = UserController()
+        # Inicializar controlador con la unidad de trabajo de la vista
+        self.db_session = get_db_session()
+        self.user_controller = UserController(self.db_session)
         
         # Inicializar paginación ANTES de setup_view
         self.pagination_controller = PaginationController(items_per_page=10)
@@ -408,11 +409,10 @@ class UsersView(ModuleView):
             import asyncio
             await asyncio.sleep(0.1)
             
-            usuarios = self.user_controller.get_users()
-            
-            self.pagination_controller.set_items(usuarios)
+            # Paginar en la base de datos: solo se cargan los usuarios de la página visible
+            self._set_users_query()
             self.pagination_controller.current_page = 1
-            self.pagination_widget.update_items(usuarios)
+            self.pagination_widget.refresh()
             
             self.update_users_table()
             
@@ -424,20 +424,13 @@ class UsersView(ModuleView):
         Carga los datos iniciales de la vista
         """
         try:
-            usuarios = self.user_controller.get_users()
-            
             # Guardar la página actual si se debe preservar
             current_page = self.pagination_controller.current_page if preserve_page else 1
-            
-            self.pagination_controller.set_items(usuarios)
             self.pagination_controller.current_page = current_page
             
-            # Ajustar la página si está fuera de rango
-            total_pages = self.pagination_controller.total_pages
-            if current_page > total_pages and total_pages > 0:
-                self.pagination_controller.current_page = total_pages
-            
-            self.pagination_widget.update_items(usuarios)
+            # La página se ajusta al rango válido al recalcular el total
+            self._set_users_query()
+            self.pagination_widget.refresh()
             
             self.update_users_table()
             
@@ -450,41 +443,29 @@ class UsersView(ModuleView):
 
     def _collect_filters(self):
         filters = {}
-        if self.search_field.value:
+        if self.search_field.value and self.search_field.value.strip():
             filters['search'] = self.search_field.value
         if self.filtro_rol.value and self.filtro_rol.value != "Todos":
             filters['rol'] = self.filtro_rol.value
-        if self.filtro_estado.value and self.filtro_estado.value != "Todos":
-            filters['estado'] = self.filtro_estado.value
-        return filters
-
-    def refresh_users_preserving_state(self):
-        current_page = self.pagination_controller.current_page
-        # Reutilizamos get_users() y filtramos client-side igual que aplicar_filtros
-        usuarios = self.user_controller.get_users()
-        search_text = (self.search_field.value or "").strip().lower()
-        if search_text:
-            usuarios = [u for u in usuarios if (u.nombre and search_text in u.nombre.lower()) or (u.apellido and search_text in u.apellido.lower())]
-        if self.filtro_rol.value != "Todos":
-            usuarios = [u for u in usuarios if u.rol == self.filtro_rol.value]
         if self.filtro_estado.value == "Activos":
-            usuarios = [u for u in usuarios if u.estado]
+            filters['estado'] = True
         elif self.filtro_estado.value == "Inactivos":
-            usuarios = [u for u in usuarios if not u.estado]
-        self.pagination_controller.set_items(usuarios)
-        total_pages = (
-            self.pagination_controller.get_total_pages()
-            if hasattr(self.pagination_controller, 'get_total_pages')
-            else self.pagination_controller.total_pages
-            if hasattr(self.pagination_controller, 'total_pages')
-            else 1
+            filters['estado'] = False
+        return filters
+
+    def _set_users_query(self, filters=None):
+        """Pagina los usuarios que cumplen `filters` con la sesión del controlador de usuarios"""
+        filters = dict(filters or {})
+        self.pagination_controller.set_query(
+            lambda: self.user_controller.count_users(filters),
+            lambda offset, limit: self.user_controller.get_users(dict(filters, offset=offset, limit=limit))
         )
-        if total_pages == 0:
-            current_page = 1
-        elif current_page > total_pages:
-            current_page = total_pages
-        self.pagination_controller.current_page = current_page
-        self.pagination_widget.update_items(usuarios)
+
+    def refresh_users_preserving_state(self):
+        # Los filtros se resuelven en la base de datos; set_query conserva la
+        # página actual y la ajusta si quedó fuera de rango
+        self._set_users_query(self._collect_filters())
+        self.pagination_widget.refresh()
         self.update_users_table()
         try:
             self.users_table.update()
@@ -492,6 +473,11 @@ class UsersView(ModuleView):
             pass
         self.page.update()
 
+    def refresh(self):
+        """Recarga la página actual conservando los filtros al volver a la vista"""
+        super().refresh()
+        self.refresh_users_preserving_state()
+
     def update_users_table(self, usuarios=None):
         """
         Actualiza la tabla de usuarios con datos reales
@@ -706,8 +692,8 @@ class UsersView(ModuleView):
             if self.usuario_editando:
                 # Validar que no se intente cambiar el rol del último admin
                 if self.usuario_editando.rol == "admin" and self.rol.value != "admin":
-                    admins = [u for u in self.user_controller.get_users() if u.rol == "admin" and u.estado]
-                    if len(admins) <= 1:
+                    admins = self.user_controller.count_users({'rol': "admin", 'estado': True})
+                    if admins <= 1:
                         self.show_message("No se puede cambiar el rol del último administrador activo", ft.colors.RED)
                         return
 
@@ -914,43 +900,10 @@ class UsersView(ModuleView):
         Aplica los filtros seleccionados
         """
         try:
-            usuarios = self.user_controller.get_users()
-            usuarios_filtrados = []
-
-            # Filtrar por búsqueda (nombre o apellido)
-            search_text = (self.search_field.value or "").strip().lower()
-            if search_text:
-                usuarios_filtrados = [
-                    u for u in usuarios
-                    if (u.nombre and search_text in u.nombre.lower()) or (u.apellido and search_text in u.apellido.lower())
-                ]
-            else:
-                usuarios_filtrados = usuarios
-
-            # Filtrar por rol
-            if self.filtro_rol.value != "Todos":
-                usuarios_filtrados = [u for u in usuarios if u.rol == self.filtro_rol.value]
-            else:
-                usuarios_filtrados = usuarios_filtrados
-
-            # Filtrar por estado
-            if self.filtro_estado.value == "Activos":
-                usuarios_filtrados = [u for u in usuarios_filtrados if u.estado]
-            elif self.filtro_estado.value == "Inactivos":
-                usuarios_filtrados = [u for u in usuarios_filtrados if not u.estado]
-
-            # Actualizar paginación con los datos filtrados
-            self.pagination_controller.set_items(usuarios_filtrados)
-            # Solo resetear a página 1 si hay cambios significativos en los filtros
-            # Para cambios menores, mantener la página actual si es posible
-            total_pages = self.pagination_controller.total_pages
-            if self.pagination_controller.current_page > total_pages and total_pages > 0:
-                self.pagination_controller.current_page = total_pages
-            elif total_pages == 0:
-                self.pagination_controller.current_page = 1
-            # Si la página actual es válida, mantenerla
-            
-            self.pagination_widget.update_items(usuarios_filtrados)
+            # Filtrar por búsqueda (nombre o apellido), rol y estado en la base de datos;
+            # la página actual se mantiene si sigue siendo válida
+            self._set_users_query(self._collect_filters())
+            self.pagination_widget.refresh()
             self.update_users_table()
         except Exception as ex:
             self.show_message(f"Error al aplicar filtros: {str(ex)}", ft.colors.RED)
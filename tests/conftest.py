@@ -0,0 +1,161 @@
+"""
+Fixtures compartidas de las pruebas.
+
+`session` es una sesión sobre una base SQLite en memoria con el esquema
+completo; `captured_selects` registra los SELECT que emite esa sesión.
+
+El backup y la verificación usan sentencias de MySQL (SHOW TABLES, SHOW
+COLUMNS, SHOW KEYS, SHOW CREATE TABLE) y funciones como CRC32 y BIT_XOR.
+`mysql_like_engine` crea un engine SQLite en archivo que traduce esas
+sentencias y registra esas funciones, para ejecutar BackupService sin un
+servidor MySQL.
+"""
+import re
+import zlib
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from gym_manager.models import Base
+
+_SHOW_TABLES_RE = re.compile(r"^\s*SHOW\s+TABLES\s*$", re.IGNORECASE)
+_SHOW_COLUMNS_RE = re.compile(r"^\s*SHOW\s+COLUMNS\s+FROM\s+`(\w+)`\s*$", re.IGNORECASE)
+_SHOW_KEYS_RE = re.compile(r"^\s*SHOW\s+KEYS\s+FROM\s+`(\w+)`\s+WHERE\s+Key_name\s*=\s*'PRIMARY'\s*$", re.IGNORECASE)
+_SHOW_CREATE_RE = re.compile(r"^\s*SHOW\s+CREATE\s+TABLE\s+`(\w+)`\s*$", re.IGNORECASE)
+# ISNULL es una palabra reservada en SQLite: se llama a la función registrada como IS_NULL
+_ISNULL_RE = re.compile(r"\bISNULL\(", re.IGNORECASE)
+
+
+def _translate(statement: str) -> str:
+    """Traduce a SQLite las sentencias de MySQL que usan el backup y la verificación"""
+    if _SHOW_TABLES_RE.match(statement):
+        return "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    match = _SHOW_COLUMNS_RE.match(statement)
+    if match:
+        # Field, Type, Null, Key, Default, Extra
+        return (f"SELECT name, type, CASE WHEN \"notnull\" THEN 'NO' ELSE 'YES' END, "
+                f"CASE WHEN pk THEN 'PRI' ELSE '' END, dflt_value, '' "
+                f"FROM pragma_table_info('{match.group(1)}') ORDER BY cid")
+    match = _SHOW_KEYS_RE.match(statement)
+    if match:
+        # Table, Non_unique, Key_name, Seq_in_index, Column_name
+        return (f"SELECT '{match.group(1)}', 0, 'PRIMARY', pk, name "
+                f"FROM pragma_table_info('{match.group(1)}') WHERE pk > 0")
+    match = _SHOW_CREATE_RE.match(statement)
+    if match:
+        return f"SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name = '{match.group(1)}'"
+    return _ISNULL_RE.sub("IS_NULL(", statement)
+
+
+def _text_value(value) -> str:
+    return value.hex() if isinstance(value, bytes) else str(value)
+
+
+def _concat_ws(separator, *values):
+    return separator.join(_text_value(value) for value in values if value is not None)
+
+
+def _crc32(value):
+    return None if value is None else zlib.crc32(_text_value(value).encode('utf-8'))
+
+
+class _BitXor:
+    def __init__(self):
+        self.value = None
+
+    def step(self, value):
+        if value is not None:
+            self.value = (self.value or 0) ^ int(value)
+
+    def finalize(self):
+        return self.value
+
+
+def mysql_like_engine(path):
+    """Engine SQLite (archivo en `path`) que entiende las sentencias MySQL del backup"""
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, 'connect')
+    def register_functions(dbapi_connection, connection_record):
+        dbapi_connection.create_function('IS_NULL', 1, lambda value: int(value is None))
+        dbapi_connection.create_function('CRC32', 1, _crc32)
+        dbapi_connection.create_function('CONCAT_WS', -1, _concat_ws)
+        dbapi_connection.create_aggregate('BIT_XOR', 1, _BitXor)
+
+    @event.listens_for(engine, 'before_cursor_execute', retval=True)
+    def translate(conn, cursor, statement, parameters, context, executemany):
+        return _translate(statement), parameters
+
+    return engine
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def captured_selects(session):
+    """
+    Función que ejecuta una acción y devuelve los SELECT que emitió la
+    sesión, con sus parámetros
+    """
+    engine = session.get_bind()
+
+    def capture_selects(action):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append((statement, parameters))
+
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            action()
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+        assert statements, "la acción no ejecutó ninguna consulta"
+        return statements
+
+    return capture_selects
+
+
+class _Clock(datetime):
+    """datetime.now() que avanza un segundo por llamada (los nombres de backup llevan la hora)"""
+    current = datetime(2026, 1, 1, 12, 0, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        cls.current += timedelta(seconds=1)
+        return cls.current
+
+
+@pytest.fixture
+def backup_env(tmp_path, monkeypatch):
+    """
+    Base de datos SQLite con el esquema completo y una fábrica de
+    BackupService que escribe en tmp_path y usa ese engine
+    """
+    from gym_manager.services import backup_service
+
+    monkeypatch.setenv('LOCALAPPDATA', str(tmp_path))
+    monkeypatch.setattr(backup_service, 'datetime', _Clock)
+    engine = mysql_like_engine(tmp_path / 'gym.db')
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(backup_service, 'get_engine', lambda url=None: engine)
+    session = sessionmaker(bind=engine)()
+
+    def make_service(**options):
+        return backup_service.BackupService(session, **options)
+
+    yield SimpleNamespace(engine=engine, session=session, make_service=make_service)
+    session.close()
+    engine.dispose()
@@ -0,0 +1,57 @@
+"""
+Códecs de los archivos de backup: lo que escribe BackupWriter se lee igual
+con open_backup_reader, incluidos los archivos formados por varios
+segmentos comprimidos concatenados (backups paralelos).
+"""
+import pytest
+
+from gym_manager.services.backup_codec import CODECS, BackupWriter, file_sha256, get_codec, open_backup_reader
+
+CONTENT = "-- encabezado\nINSERT INTO `t` (`a`) VALUES ('ñandú; \\\\ ''x''\n\tfin');\n" * 200
+
+CODEC_NAMES = [
+    'none',
+    'gzip',
+    pytest.param('zstd', marks=pytest.mark.skipif('zstd' not in CODECS, reason="zstandard no está instalado")),
+]
+
+
+def backup_path(tmp_path, codec_name, name='backup'):
+    return tmp_path / f"{name}.sql{get_codec(codec_name).extension}"
+
+
+@pytest.mark.parametrize('codec_name', CODEC_NAMES)
+def test_write_read_round_trip(tmp_path, codec_name):
+    path = backup_path(tmp_path, codec_name)
+    with BackupWriter(path, get_codec(codec_name), hash_content=True) as writer:
+        writer.write(CONTENT)
+
+    assert writer.uncompressed_bytes == len(CONTENT.encode('utf-8'))
+    with open_backup_reader(path, hash_file=True) as reader:
+        assert reader.read() == CONTENT
+        assert reader.file_sha256() == file_sha256(path)
+
+
+@pytest.mark.parametrize('codec_name', CODEC_NAMES)
+def test_concatenated_segments_read_as_one_file(tmp_path, codec_name):
+    codec = get_codec(codec_name)
+    parts = ["-- encabezado\n", CONTENT, "", "INSERT INTO `u` (`b`) VALUES (1);\n", "-- Fin del backup\n"]
+    segments = []
+    for i, part in enumerate(parts):
+        segment = tmp_path / f"{i}.seg"
+        with BackupWriter(segment, codec) as writer:
+            writer.write(part)
+        segments.append(segment)
+
+    path = backup_path(tmp_path, codec_name)
+    with open(path, 'wb') as out:
+        for segment in segments:
+            out.write(segment.read_bytes())
+
+    with open_backup_reader(path, buffer_size=64) as reader:
+        assert reader.read() == ''.join(parts)
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        get_codec('lz4')
@@ -0,0 +1,145 @@
+"""
+Formato de los backups SQL: cada valor se escribe como literal de MySQL
+(_format_value) y las filas se agrupan en INSERT extendidos de hasta
+max_insert_bytes. Los backups ya escritos dependen de este formato, así que
+se prueba escribiendo y volviendo a leer los valores.
+"""
+import io
+import re
+
+import pytest
+from sqlalchemy import text
+
+from gym_manager.services.backup_codec import open_backup_reader
+from gym_manager.services.backup_service import BLOB_HEX_HEADER, BackupService
+from gym_manager.utils.sql_tokenizer import iter_sql_statements, statement_table
+
+# NULL, literal hexadecimal, cadena entre comillas (con \x y '' como escape) o número
+_LITERAL_RE = re.compile(r"NULL|X'([0-9a-f]*)'|'((?:[^'\\]|\\.|'')*)'|(-?[0-9.]+(?:e[+-]?[0-9]+)?)",
+                         re.IGNORECASE | re.DOTALL)
+# Escapes de MySQL dentro de una cadena entre comillas
+_UNESCAPE_RE = re.compile(r"\\(.)|''", re.DOTALL)
+_UNESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '0': '\0', 'b': '\b', 'Z': '\x1a'}
+
+TEXT_VALUES = [
+    '',
+    "O'Brien",
+    'a\\b',
+    'C:\\nuevo\\tabla',
+    'x;y',
+    'línea\nnueva\tcon tab',
+    "'); DROP TABLE pagos; --",
+    '\\',
+]
+
+BLOB_VALUES = [b'', b"\x00\x01'\\", bytes(range(256)), 'texto'.encode('utf-8') + b'\n\t;']
+
+
+def parse_literal(stmt: str, pos: int):
+    """Lee el literal de MySQL que empieza en `pos`; devuelve (valor, posición siguiente)"""
+    match = _LITERAL_RE.match(stmt, pos)
+    assert match, f"literal inválido en: {stmt[pos:pos + 30]!r}"
+    if match.group(1) is not None:
+        value = bytes.fromhex(match.group(1))
+    elif match.group(2) is not None:
+        value = _UNESCAPE_RE.sub(
+            lambda m: "'" if m.group(1) is None else _UNESCAPES.get(m.group(1), m.group(1)), match.group(2)
+        )
+    elif match.group(3) is not None:
+        number = match.group(3)
+        value = float(number) if any(c in number for c in '.eE') else int(number)
+    else:
+        value = None
+    return value, match.end()
+
+
+def parse_insert_rows(stmt: str) -> list:
+    """Filas de un INSERT ... VALUES (...), (...) como listas de valores de Python"""
+    pos = stmt.index(') VALUES') + len(') VALUES')
+    rows = []
+    row = None
+    while pos < len(stmt):
+        char = stmt[pos]
+        if char in ' \n,;':
+            pos += 1
+        elif char == '(':
+            row = []
+            pos += 1
+        elif char == ')':
+            rows.append(row)
+            pos += 1
+        else:
+            value, pos = parse_literal(stmt, pos)
+            row.append(value)
+    return rows
+
+
+@pytest.mark.parametrize('value', [None, 0, -5, 3.25, *TEXT_VALUES])
+def test_format_value_round_trip(value):
+    literal = BackupService._format_value(value, is_blob=False)
+    parsed, end = parse_literal(literal, 0)
+    assert end == len(literal)
+    assert parsed == value
+
+
+def test_backslash_and_quote_are_escaped():
+    assert BackupService._format_value("it's \\n", is_blob=False) == "'it''s \\\\n'"
+
+
+@pytest.mark.parametrize('value', BLOB_VALUES)
+def test_blob_round_trip(value):
+    literal = BackupService._format_value(value, is_blob=True)
+    assert literal == f"X'{value.hex()}'"
+    assert parse_literal(literal, 0) == (value, len(literal))
+    # memoryview y bytearray (según el driver) se escriben igual
+    assert BackupService._format_value(memoryview(value), is_blob=True) == literal
+    assert BackupService._format_value(bytearray(value), is_blob=True) == literal
+
+
+def test_blob_backup_round_trip(backup_env):
+    with backup_env.engine.begin() as conn:
+        for i, value in enumerate(BLOB_VALUES):
+            conn.execute(text("INSERT INTO documentos (hash, contenido, compresion, tamano, referencias, "
+                              "fecha_creacion) VALUES (:h, :c, 'none', :t, 1, '2026-01-01 10:00:00')"),
+                         {'h': f'h{i}', 'c': value, 't': len(value)})
+    service = backup_env.make_service(backup_format='sql')
+    backup = service.create_backup()
+
+    with open_backup_reader(service._backup_file_path(backup)) as reader:
+        content = reader.read()
+    # El encabezado indica al restore que los BLOB van en hexadecimal y no en Base64
+    assert BLOB_HEX_HEADER in content
+    inserts = [stmt for stmt in iter_sql_statements(io.StringIO(content))
+               if statement_table(stmt) == 'documentos' and stmt.startswith('INSERT')]
+    rows = [row for stmt in inserts for row in parse_insert_rows(stmt)]
+    assert [row[2] for row in rows] == BLOB_VALUES
+
+
+@pytest.mark.parametrize('max_insert_bytes', [0, 120, 1024 * 1024])
+def test_extended_inserts_round_trip(backup_env, max_insert_bytes):
+    with backup_env.engine.begin() as conn:
+        for i, value in enumerate(TEXT_VALUES):
+            conn.execute(text("INSERT INTO metodos_pago (descripcion, estado) VALUES (:d, :e)"),
+                         {'d': value, 'e': i % 2})
+        conn.execute(text("INSERT INTO usuarios (nombre, apellido, rol, contraseña, estado) "
+                          "VALUES ('ana', 'x', 'admin', 'y', 1)"))
+    service = backup_env.make_service(backup_format='sql', max_insert_bytes=max_insert_bytes)
+    backup = service.create_backup()
+
+    inserts = []
+    with open_backup_reader(service._backup_file_path(backup)) as reader:
+        for stmt in iter_sql_statements(reader):
+            if statement_table(stmt) == 'metodos_pago' and stmt.startswith('INSERT'):
+                inserts.append(stmt)
+
+    rows = [row for stmt in inserts for row in parse_insert_rows(stmt)]
+    assert rows == [[i + 1, value, i % 2] for i, value in enumerate(TEXT_VALUES)]
+    if max_insert_bytes == 0:
+        # Un INSERT por fila
+        assert len(inserts) == len(TEXT_VALUES)
+    elif max_insert_bytes == 120:
+        # Varias sentencias, cada una dentro del límite salvo una fila sola más grande
+        assert 1 < len(inserts) < len(TEXT_VALUES)
+        assert all(len(stmt) <= 120 or len(parse_insert_rows(stmt)) == 1 for stmt in inserts)
+    else:
+        assert len(inserts) == 1
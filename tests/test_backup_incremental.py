@@ -0,0 +1,123 @@
+"""
+Backups incrementales: marca de agua por tabla, checksum de las filas ya
+respaldadas, reemplazo completo de una tabla que cambió y cadena de
+restauración (orden, borrado en cascada y protección de las bases).
+"""
+from collections import defaultdict
+
+import pytest
+from sqlalchemy import text
+
+from gym_manager.models.backup import Backup
+from gym_manager.services.backup_codec import open_backup_reader
+from gym_manager.utils.sql_tokenizer import count_insert_rows, iter_sql_statements, statement_table
+
+
+def execute(env, sql):
+    with env.engine.begin() as conn:
+        conn.execute(text(sql))
+
+
+def statements_by_table(service, backup):
+    """Sentencias del archivo de un backup SQL agrupadas por tabla"""
+    statements = defaultdict(list)
+    with open_backup_reader(service._backup_file_path(backup)) as reader:
+        for stmt in iter_sql_statements(reader):
+            table = statement_table(stmt)
+            if table:
+                statements[table].append(stmt)
+    return statements
+
+
+def inserted_rows(statements):
+    return sum(count_insert_rows(stmt) for stmt in statements)
+
+
+@pytest.fixture
+def service(backup_env):
+    execute(backup_env, "INSERT INTO metodos_pago (descripcion, estado) VALUES ('Efectivo', 1), ('Tarjeta', 1)")
+    return backup_env.make_service(backup_format='sql')
+
+
+def test_append_only_table_exports_new_rows(backup_env, service):
+    full = service.create_backup()
+    execute(backup_env, "INSERT INTO metodos_pago (descripcion, estado) VALUES ('Transferencia', 1)")
+
+    incremental = service.create_backup(incremental=True)
+
+    assert incremental.backup_type == 'incremental'
+    assert incremental.parent_id == full.id
+    statements = statements_by_table(service, incremental)['metodos_pago']
+    # Sin CREATE ni DELETE: solo el INSERT de la fila nueva
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO `metodos_pago`")
+    assert "'Transferencia'" in statements[0] and "'Efectivo'" not in statements[0]
+    assert incremental.marks['metodos_pago']['max_pk'] == 3
+    # Las tablas sin cambios no exportan filas
+    assert inserted_rows(statements_by_table(service, incremental)['usuarios']) == 0
+
+
+@pytest.mark.parametrize('change', [
+    "UPDATE metodos_pago SET descripcion = 'Débito' WHERE id_metodo_pago = 1",
+    "DELETE FROM metodos_pago WHERE id_metodo_pago = 1",
+])
+def test_changed_rows_below_mark_replace_table(backup_env, service, change):
+    service.create_backup()
+    execute(backup_env, change)
+    execute(backup_env, "INSERT INTO metodos_pago (descripcion, estado) VALUES ('Transferencia', 1)")
+
+    with backup_env.engine.connect() as conn:
+        plan = service._plan_table_dump(conn, 'metodos_pago', service._get_incremental_base().marks)
+    assert plan.replace and plan.create_stmt
+
+    incremental = service.create_backup(incremental=True)
+    statements = statements_by_table(service, incremental)['metodos_pago']
+    assert statements[0].startswith("CREATE TABLE IF NOT EXISTS")
+    assert statements[1] == "DELETE FROM `metodos_pago`;"
+    # La tabla se vuelve a exportar completa
+    with backup_env.engine.connect() as conn:
+        remaining = conn.execute(text("SELECT COUNT(*) FROM metodos_pago")).scalar()
+    assert inserted_rows(statements) == remaining
+
+
+def test_chain_order_and_cascade_delete(backup_env, service):
+    full = service.create_backup()
+    execute(backup_env, "INSERT INTO metodos_pago (descripcion, estado) VALUES ('Transferencia', 1)")
+    first = service.create_backup(incremental=True)
+    execute(backup_env, "INSERT INTO metodos_pago (descripcion, estado) VALUES ('Cheque', 1)")
+    second = service.create_backup(incremental=True)
+
+    assert second.parent_id == first.id
+    assert [b.id for b in service.get_backup_chain(second)] == [full.id, first.id, second.id]
+
+    paths = [service._backup_file_path(b) for b in (full, first, second)]
+    success, _ = service.delete_backup(first.id)
+    assert success
+    # El incremental que dependía de él también se elimina; la base queda
+    assert [b.id for b in service.get_backups()] == [full.id]
+    assert [p.exists() for p in paths] == [True, False, False]
+
+
+def test_chain_with_missing_or_failed_parent_is_rejected(backup_env, service):
+    full = service.create_backup()
+    incremental = service.create_backup(incremental=True)
+
+    full.status = 'failed'
+    backup_env.session.commit()
+    with pytest.raises(ValueError):
+        service.get_backup_chain(incremental)
+    # Un incremental sin cadena válida no sirve de base: el siguiente es completo
+    assert service._get_incremental_base() is None
+
+
+def test_cleanup_keeps_bases_of_kept_incrementals(backup_env, service):
+    oldest = service.create_backup()
+    base = service.create_backup()
+    incremental = service.create_backup(incremental=True)
+    assert incremental.parent_id == base.id
+
+    service._clean_old_backups(max_backups=1)
+
+    kept = {b.id for b in backup_env.session.query(Backup).all()}
+    assert kept == {base.id, incremental.id}
+    assert not service._backup_file_path(oldest).exists()
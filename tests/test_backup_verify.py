@@ -0,0 +1,89 @@
+"""
+El manifiesto de un backup se calcula al escribirlo y se vuelve a calcular
+al verificarlo: un backup recién creado debe verificar sin diferencias
+(formato SQL y por filas, secuencial y en paralelo) y un archivo alterado o
+truncado debe informarse.
+"""
+import gzip
+import zipfile
+
+import pytest
+from sqlalchemy import text
+
+from gym_manager.services.backup_rows import MANIFEST_NAME
+
+
+def execute(env, sql, **params):
+    with env.engine.begin() as conn:
+        conn.execute(text(sql), params)
+
+
+@pytest.fixture(params=[('sql', 1), ('sql', 3), ('rows', 1), ('rows', 3)],
+                ids=['sql', 'sql-parallel', 'rows', 'rows-parallel'])
+def backup(request, backup_env):
+    execute(backup_env, "INSERT INTO metodos_pago (descripcion, estado) VALUES "
+                        "('Efectivo', 1), ('Tarjeta; \"crédito\"', 1), ('O''Brien\\\\pago', 0)")
+    execute(backup_env, "INSERT INTO usuarios (nombre, apellido, rol, contraseña, estado) VALUES "
+                        "('ana', 'línea\nnueva\tcon tab', 'admin', 'x', 1)")
+    execute(backup_env, "INSERT INTO documentos (hash, contenido, compresion, tamano, referencias, fecha_creacion) "
+                        "VALUES ('h1', :data, 'none', 4, 1, '2026-01-01 10:00:00')", data=b"\x00\x01'\\")
+    backup_format, workers = request.param
+    service = backup_env.make_service(backup_format=backup_format, workers=workers)
+    return service, service.create_backup()
+
+
+def replace_in_file(service, backup, old: bytes, new: bytes):
+    """Reescribe el archivo del backup cambiando `old` por `new` en los datos sin comprimir"""
+    path = service._backup_file_path(backup)
+    if backup.name.endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            members = {name: archive.read(name) for name in archive.namelist()}
+        with zipfile.ZipFile(path, 'w') as archive:
+            for name, data in members.items():
+                if name != MANIFEST_NAME:
+                    data = gzip.compress(gzip.decompress(data).replace(old, new))
+                archive.writestr(name, data)
+    else:
+        path.write_bytes(gzip.compress(gzip.decompress(path.read_bytes()).replace(old, new)))
+
+
+def test_fresh_backup_verifies_clean(backup):
+    service, created = backup
+    success, message = service.verify(created.id)
+    assert success, message
+    assert service.verify_restored(created) == []
+
+
+def test_tampered_backup_is_reported(backup):
+    service, created = backup
+    replace_in_file(service, created, b'Efectivo', b'Efectivx')
+
+    success, message = service.verify(created.id)
+
+    assert not success
+    assert "metodos_pago: el SHA-256 de los datos no coincide" in message
+
+
+def test_truncated_backup_is_reported(backup):
+    service, created = backup
+    path = service._backup_file_path(created)
+    path.write_bytes(path.read_bytes()[:path.stat().st_size // 2])
+
+    success, message = service.verify(created.id)
+
+    assert not success
+    assert message.startswith("El archivo de backup está dañado")
+
+
+def test_changed_database_is_reported_by_verify_restored(backup_env, backup):
+    service, created = backup
+    execute(backup_env, "UPDATE metodos_pago SET estado = 1 WHERE descripcion = 'Efectivo'")
+    assert service.verify_restored(created) == []
+
+    execute(backup_env, "UPDATE metodos_pago SET descripcion = 'Débito' WHERE descripcion = 'Efectivo'")
+    execute(backup_env, "DELETE FROM usuarios")
+
+    assert service.verify_restored(created) == [
+        "metodos_pago: el checksum de las filas no coincide",
+        "usuarios: 0 filas, se esperaban 1",
+    ]
@@ -0,0 +1,56 @@
+"""
+Las sumas por período deben filtrar con rangos semiabiertos
+(`fecha >= inicio AND fecha < fin`) sin envolver la columna de fecha en
+funciones (EXTRACT, DATE, YEAR, ...), para que se usen los índices.
+"""
+import re
+from datetime import datetime
+
+import pytest
+
+from gym_manager.controllers.payment_controller import PaymentController
+from gym_manager.utils.date_ranges import day_range, month_range, year_range
+
+REFERENCE = datetime(2024, 12, 31, 18, 30)
+# Una función (EXTRACT, DATE, YEAR, STRFTIME, ...) aplicada a una columna de fecha
+_WRAPPED_DATE_RE = re.compile(r"\b\w+\s*\([^()]*\bfecha(?:_pago)?\b", re.IGNORECASE)
+
+
+def where_clause(statement: str) -> str:
+    """Parte WHERE de una sentencia (sin GROUP BY / ORDER BY / LIMIT)"""
+    parts = re.split(r'\sWHERE\s', statement, maxsplit=1)
+    where = parts[1] if len(parts) > 1 else ''
+    return re.split(r'\s(?:GROUP BY|ORDER BY|LIMIT)\s', where)[0]
+
+
+def test_ranges_are_half_open():
+    assert day_range(REFERENCE) == (datetime(2024, 12, 31), datetime(2025, 1, 1))
+    assert month_range(REFERENCE) == (datetime(2024, 12, 1), datetime(2025, 1, 1))
+    assert month_range(datetime(2024, 2, 10)) == (datetime(2024, 2, 1), datetime(2024, 3, 1))
+    assert year_range(2024) == (datetime(2024, 1, 1), datetime(2025, 1, 1))
+
+
+@pytest.mark.parametrize('date_range', [day_range(REFERENCE), month_range(REFERENCE), year_range(REFERENCE.year)],
+                         ids=['day', 'month', 'year'])
+def test_payments_sum_filters_fecha_pago_without_functions(session, captured_selects, date_range):
+    start, end = date_range
+    [(statement, parameters)] = captured_selects(lambda: PaymentController(session).get_payments_sum(start, end))
+    where = where_clause(statement)
+
+    assert not _WRAPPED_DATE_RE.search(where), where
+    assert re.search(r"pagos\.fecha_pago >= \?", where), where
+    assert re.search(r"pagos\.fecha_pago < \?", where), where
+    assert '<=' not in where, where
+    # SQLite recibe las fechas como texto ISO
+    bounds = [datetime.fromisoformat(p) for p in parameters if isinstance(p, str)]
+    assert bounds == [start, end]
+
+
+@pytest.mark.parametrize('method', ['get_today_payments_sum', 'get_current_month_payments_sum',
+                                    'get_current_year_payments_sum'])
+def test_period_sums_filter_without_functions(session, captured_selects, method):
+    for statement, _ in captured_selects(getattr(PaymentController(session), method)):
+        where = where_clause(statement)
+        assert not _WRAPPED_DATE_RE.search(where), where
+        assert re.search(r"\bfecha(?:_pago)? >= \?", where), where
+        assert re.search(r"\bfecha(?:_pago)? < \?", where), where
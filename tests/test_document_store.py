@@ -0,0 +1,51 @@
+"""
+DocumentStore.put y release ajustan las referencias en la base con una sola
+sentencia, sin leer y reescribir la fila del documento.
+"""
+from datetime import datetime
+
+from gym_manager.models.document import Documento
+from gym_manager.services.document_store import DocumentStore
+
+
+def references(session, digest):
+    return session.query(Documento.referencias).filter(Documento.hash == digest).scalar()
+
+
+def test_put_same_content_adds_reference(session):
+    store = DocumentStore(session)
+    content = b'comprobante ' * 100
+
+    digest = store.put(content)
+    assert store.put(content) == digest
+
+    assert session.query(Documento).count() == 1
+    assert references(session, digest) == 2
+    assert store.get(digest) == content
+
+
+def test_put_after_concurrent_insert_does_not_fail(session):
+    # Otra transacción ya insertó el mismo documento (la fila existe aunque
+    # esta sesión nunca la haya leído)
+    store = DocumentStore(session)
+    content = b'rutina'
+    digest = store.content_hash(content)
+    session.add(Documento(hash=digest, contenido=content, compresion='none', tamano=len(content),
+                          referencias=1, fecha_creacion=datetime.now()))
+    session.commit()
+    session.expunge_all()
+
+    assert store.put(content) == digest
+    assert references(session, digest) == 2
+
+
+def test_release_deletes_unused_document(session):
+    store = DocumentStore(session)
+    digest = store.put(b'unico')
+    store.put(b'unico')
+
+    store.release(digest)
+    assert references(session, digest) == 1
+
+    store.release(digest)
+    assert session.query(Documento).count() == 0
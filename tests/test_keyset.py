@@ -0,0 +1,93 @@
+"""
+Paginación por clave: el cursor guarda los valores de (fecha, id) de la
+última fila mostrada, así que avanzar y retroceder debe recorrer las mismas
+filas aunque se repita la fecha o se inserten filas nuevas al principio.
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from gym_manager.models.member import Miembro
+from gym_manager.models.payment import Pago
+from gym_manager.utils.keyset import decode_cursor, encode_cursor, keyset_paginate
+
+COLUMNS = [Pago.fecha_pago, Pago.id_pago]
+START = datetime(2024, 3, 1, 9, 30, 15, 250)
+
+
+def add_payments(session, dates):
+    session.add_all(Pago(fecha_pago=fecha, monto=100, id_miembro=1, id_metodo_pago=1) for fecha in dates)
+    session.commit()
+
+
+@pytest.fixture
+def payments(session):
+    # Tres fechas repetidas en grupos de 3: los empates se resuelven por id
+    add_payments(session, [START + timedelta(days=i // 3) for i in range(9)])
+    return session.query(Pago).order_by(Pago.fecha_pago.desc(), Pago.id_pago.desc()).all()
+
+
+def page(session, cursor=None, limit=2):
+    return keyset_paginate(session.query(Pago), COLUMNS, cursor, limit)
+
+
+def ids(result):
+    return [pago.id_pago for pago in result['items']]
+
+
+def test_next_walks_all_rows_across_ties(session, payments):
+    seen = []
+    result = page(session)
+    assert result['prev_cursor'] is None
+    while True:
+        seen.extend(ids(result))
+        if result['next_cursor'] is None:
+            break
+        result = page(session, result['next_cursor'])
+    assert seen == [pago.id_pago for pago in payments]
+
+
+def test_prev_returns_the_same_pages(session, payments):
+    pages = [page(session)]
+    while pages[-1]['next_cursor']:
+        pages.append(page(session, pages[-1]['next_cursor']))
+
+    # Retroceder desde la última página devuelve exactamente las anteriores
+    for previous, current in zip(reversed(pages[:-1]), reversed(pages[1:])):
+        back = page(session, current['prev_cursor'])
+        assert ids(back) == ids(previous)
+        assert back['next_cursor'] is not None
+    assert page(session, pages[1]['prev_cursor'])['prev_cursor'] is None
+
+
+def test_pages_are_stable_when_rows_are_inserted_at_head(session, payments):
+    first = page(session, limit=3)
+    second = page(session, first['next_cursor'], limit=3)
+    # Pagos nuevos (más recientes y con la misma fecha que la primera fila)
+    add_payments(session, [payments[0].fecha_pago, START + timedelta(days=10)])
+
+    assert ids(page(session, first['next_cursor'], limit=3)) == ids(second)
+    assert ids(page(session, second['prev_cursor'], limit=3)) == ids(first)
+
+
+def test_cursor_decodes_datetime_and_date():
+    fecha = datetime(2024, 12, 31, 23, 59, 59, 999999)
+    values, direction = decode_cursor(encode_cursor([fecha, 7], 'prev'), COLUMNS)
+    assert values == [fecha, 7] and isinstance(values[0], datetime)
+    assert direction == 'prev'
+
+    columns = [Miembro.fecha_nacimiento, Miembro.id_miembro]
+    values, _ = decode_cursor(encode_cursor([date(2024, 2, 29), 3], 'next'), columns)
+    assert values == [date(2024, 2, 29), 3]
+    assert decode_cursor(encode_cursor([None, 3], 'next'), COLUMNS)[0] == [None, 3]
+
+
+@pytest.mark.parametrize('cursor', [
+    'no es base64',
+    encode_cursor([START], 'next'),
+    encode_cursor([START, 1], 'arriba'),
+    'e30=',
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match='Cursor de paginación inválido'):
+        decode_cursor(cursor, COLUMNS)
@@ -0,0 +1,132 @@
+"""
+El resumen diario de pagos (pagos_resumen_diario) se mantiene de forma
+incremental al registrar, anular o cambiar de tipo de membresía; en todo
+momento debe coincidir con agrupar los pagos activos por día, método y tipo.
+"""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import func
+
+from gym_manager.controllers.member_controller import MemberController
+from gym_manager.models.member import Miembro
+from gym_manager.models.payment import Pago
+from gym_manager.models.payment_daily_summary import PagoResumenDiario
+from gym_manager.models.payment_method import MetodoPago
+from gym_manager.services.payment_rollup_service import PaymentRollupService
+
+
+def member_data(tipo_membresia='Mensual', **changes):
+    data = {
+        'nombre': 'Ana', 'apellido': 'Pérez', 'documento': '1', 'fecha_nacimiento': date(1990, 1, 1),
+        'genero': 'F', 'correo_electronico': 'ana@example.com', 'tipo_membresia': tipo_membresia,
+    }
+    data.update(changes)
+    return data
+
+
+LUIS = member_data('Anual', nombre='Luis', documento='2', correo_electronico='luis@example.com')
+
+
+@pytest.fixture
+def members(session):
+    session.add_all([MetodoPago(descripcion='Efectivo'), MetodoPago(descripcion='Tarjeta')])
+    session.add_all([
+        Miembro(fecha_registro=datetime(2024, 1, 1), **member_data('Mensual')),
+        Miembro(fecha_registro=datetime(2024, 1, 1), **LUIS),
+    ])
+    session.commit()
+    return session.query(Miembro).order_by(Miembro.id_miembro).all()
+
+
+def add_payment(session, id_miembro, fecha, monto, id_metodo_pago=1, estado=True):
+    pago = Pago(fecha_pago=fecha, monto=monto, id_miembro=id_miembro, id_metodo_pago=id_metodo_pago, estado=estado)
+    session.add(pago)
+    session.flush()
+    PaymentRollupService(session).add_payment(pago)
+    session.commit()
+    return pago
+
+
+def rollup(session):
+    """Filas del resumen como {(fecha, método, tipo): (cantidad, total)}"""
+    return {
+        (row.fecha, row.id_metodo_pago, row.tipo_membresia): (row.cantidad, round(row.total, 2))
+        for row in session.query(PagoResumenDiario)
+    }
+
+
+def grouped_payments(session):
+    """La misma agregación calculada directamente sobre pagos"""
+    day = func.date(Pago.fecha_pago)
+    rows = session.query(
+        day, Pago.id_metodo_pago, Miembro.tipo_membresia, func.count(Pago.id_pago), func.sum(Pago.monto)
+    ).join(Miembro, Pago.id_miembro == Miembro.id_miembro).filter(
+        Pago.estado == True
+    ).group_by(day, Pago.id_metodo_pago, Miembro.tipo_membresia).all()
+    return {
+        (date.fromisoformat(fecha), id_metodo_pago, tipo): (cantidad, round(total, 2))
+        for fecha, id_metodo_pago, tipo, cantidad, total in rows
+    }
+
+
+def test_add_and_remove_payment(session, members):
+    ana = members[0]
+    first = add_payment(session, ana.id_miembro, datetime(2024, 5, 1, 9), 100.10)
+    add_payment(session, ana.id_miembro, datetime(2024, 5, 1, 20), 50.25)
+    add_payment(session, ana.id_miembro, datetime(2024, 5, 1, 21), 999, estado=False)
+    assert rollup(session) == {(date(2024, 5, 1), 1, 'Mensual'): (2, 150.35)}
+
+    PaymentRollupService(session).remove_payment(first)
+    session.commit()
+    assert rollup(session) == {(date(2024, 5, 1), 1, 'Mensual'): (1, 50.25)}
+
+    # La fila se elimina cuando se queda sin pagos
+    PaymentRollupService(session).remove_payment(session.query(Pago).filter_by(monto=50.25).one())
+    session.commit()
+    assert rollup(session) == {}
+
+
+def test_update_member_moves_payments_to_new_type(session, members):
+    ana, luis = members
+    add_payment(session, ana.id_miembro, datetime(2024, 5, 1), 100)
+    add_payment(session, ana.id_miembro, datetime(2024, 5, 2), 80, id_metodo_pago=2)
+    add_payment(session, luis.id_miembro, datetime(2024, 5, 1), 300)
+
+    assert MemberController(session).update_member(ana.id_miembro, member_data('Anual')) == \
+        (True, "Miembro actualizado exitosamente")
+    assert rollup(session) == {
+        (date(2024, 5, 1), 1, 'Anual'): (2, 400),
+        (date(2024, 5, 2), 2, 'Anual'): (1, 80),
+    }
+    assert rollup(session) == grouped_payments(session)
+
+
+@pytest.mark.parametrize('data', [
+    member_data(None),
+    {key: value for key, value in member_data().items() if key != 'tipo_membresia'},
+], ids=['none', 'missing'])
+def test_update_member_without_type_keeps_it(session, members, data):
+    ana = members[0]
+    add_payment(session, ana.id_miembro, datetime(2024, 5, 1), 100)
+    before = rollup(session)
+
+    success, _ = MemberController(session).update_member(ana.id_miembro, dict(data, nombre='Ana María'))
+    assert success
+    session.refresh(ana)
+    assert (ana.nombre, ana.tipo_membresia) == ('Ana María', 'Mensual')
+    assert rollup(session) == before
+
+
+def test_rebuild_matches_group_by(session, members):
+    ana, luis = members
+    for day in range(1, 6):
+        add_payment(session, ana.id_miembro, datetime(2024, 5, day, 10), 10.1 * day, id_metodo_pago=day % 2 + 1)
+        add_payment(session, luis.id_miembro, datetime(2024, 5, day, 23, 59), 33.33)
+    add_payment(session, luis.id_miembro, datetime(2024, 5, 3), 500, estado=False)
+    assert MemberController(session).update_member(luis.id_miembro, dict(LUIS, tipo_membresia='Trimestral'))[0]
+    incremental = rollup(session)
+
+    assert PaymentRollupService(session).rebuild() == len(incremental)
+    session.commit()
+    assert rollup(session) == incremental == grouped_payments(session)
@@ -0,0 +1,135 @@
+"""
+QueryCache: desalojo LRU, expiración por TTL e invalidación por tablas al
+confirmar una transacción. Un resultado cargado mientras se invalidaban sus
+tablas no debe quedar guardado.
+"""
+import pytest
+
+from gym_manager.models.payment_method import MetodoPago
+from gym_manager.utils.cache import QueryCache, query_cache
+
+
+@pytest.fixture
+def shared_cache():
+    """La cache del proceso, que es la que invalidan los eventos de la sesión"""
+    query_cache.clear()
+    yield query_cache
+    query_cache.clear()
+
+
+class Loader:
+    """Loader que cuenta sus llamadas y devuelve un valor distinto cada vez"""
+
+    def __init__(self, on_call=None):
+        self.calls = 0
+        self.on_call = on_call
+
+    def __call__(self):
+        self.calls += 1
+        if self.on_call:
+            self.on_call()
+        return self.calls
+
+
+def test_hit_after_first_load():
+    cache = QueryCache()
+    loader = Loader()
+    assert cache.get_or_load('q', loader, params={'b': 2, 'a': 1}) == 1
+    assert cache.get_or_load('q', loader, params={'a': 1, 'b': 2}) == 1
+    assert cache.get_or_load('q', loader, params={'a': 2}) == 2
+    assert cache.stats() == {'size': 2, 'hits': 1, 'misses': 2, 'evictions': 0}
+
+
+def test_lru_eviction():
+    cache = QueryCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # Leer 'a' la vuelve la más reciente: se desaloja 'b'
+    assert cache.get_or_load('a', Loader()) == 1
+    cache.set('c', 3)
+    loader = Loader()
+    assert cache.get_or_load('b', loader) == 1 and loader.calls == 1
+    assert cache.get_or_load('c', Loader()) == 3
+    assert cache.stats()['evictions'] == 2
+
+
+def test_ttl_expiry():
+    cache = QueryCache()
+    loader = Loader()
+    assert cache.get_or_load('q', loader, ttl=0) == 1
+    assert cache.get_or_load('q', loader, ttl=60) == 2
+    assert cache.get_or_load('q', loader, ttl=60) == 2
+    assert loader.calls == 2
+
+
+def test_invalidate_by_tag():
+    cache = QueryCache()
+    cache.set('pagos_mes', 1, tags=['pagos'])
+    cache.set('miembros', 2, tags=['miembros'])
+    assert cache.invalidate('pagos', 'rutinas') == 1
+    assert cache.get_or_load('pagos_mes', Loader()) == 1
+    assert cache.get_or_load('miembros', Loader()) == 2
+
+
+def test_commit_invalidates_modified_tables(session, shared_cache):
+    shared_cache.set('metodos', 'viejo', tags=['metodos_pago'])
+    shared_cache.set('miembros', 'sin cambios', tags=['miembros'])
+    session.add(MetodoPago(descripcion='Efectivo'))
+    session.flush()
+    # Hasta el commit otras sesiones siguen viendo los datos anteriores
+    assert shared_cache.get_or_load('metodos', Loader()) == 'viejo'
+    session.commit()
+    assert shared_cache.get_or_load('metodos', Loader()) == 1
+    assert shared_cache.get_or_load('miembros', Loader()) == 'sin cambios'
+
+
+def test_bulk_update_invalidates_on_commit(session, shared_cache):
+    session.add(MetodoPago(descripcion='Efectivo'))
+    session.commit()
+    shared_cache.set('metodos', 'viejo', tags=['metodos_pago'])
+    session.query(MetodoPago).update({MetodoPago.estado: False})
+    session.commit()
+    assert shared_cache.get_or_load('metodos', Loader()) == 1
+
+
+def test_rollback_does_not_invalidate(session, shared_cache):
+    shared_cache.set('metodos', 'vigente', tags=['metodos_pago'])
+    session.add(MetodoPago(descripcion='Efectivo'))
+    session.flush()
+    session.rollback()
+    # Las tablas pendientes se descartan: un commit posterior sin cambios no invalida
+    session.commit()
+    assert shared_cache.get_or_load('metodos', Loader()) == 'vigente'
+
+
+@pytest.mark.parametrize('invalidate', [
+    lambda cache: cache.invalidate('pagos'),
+    lambda cache: cache.invalidate_name('q'),
+    lambda cache: cache.clear(),
+])
+def test_invalidation_during_load_discards_result(invalidate):
+    cache = QueryCache()
+    # Otra sesión confirma cambios mientras el loader consulta la base
+    racing = Loader(on_call=lambda: invalidate(cache))
+    assert cache.get_or_load('q', racing, tags=['pagos', 'miembros']) == 1
+    loader = Loader()
+    assert cache.get_or_load('q', loader, tags=['pagos', 'miembros']) == 1
+    assert loader.calls == 1
+
+
+def test_unrelated_invalidation_during_load_keeps_result():
+    cache = QueryCache()
+    racing = Loader(on_call=lambda: cache.invalidate('rutinas'))
+    assert cache.get_or_load('q', racing, tags=['pagos']) == 1
+    assert cache.get_or_load('q', Loader(), tags=['pagos']) == 1
+
+
+def test_loader_error_is_not_cached():
+    cache = QueryCache()
+
+    def failing():
+        raise RuntimeError('sin conexión')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load('q', failing)
+    assert cache.get_or_load('q', Loader()) == 1
@@ -0,0 +1,91 @@
+"""
+Los filtros más frecuentes de pagos, miembros y comprobantes deben
+resolverse con los índices declarados en los modelos (idx_pagos_*,
+idx_miembros_*, idx_comprobantes_*).
+
+Se crea el esquema en SQLite, se ejecutan las consultas reales de los
+controladores y se revisa el plan de cada SELECT con EXPLAIN QUERY PLAN.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from gym_manager.controllers import payment_receipt_controller
+from gym_manager.controllers.member_controller import MemberController
+from gym_manager.controllers.payment_controller import PaymentController
+from gym_manager.models.payment import Pago
+from gym_manager.utils.date_ranges import month_range
+
+
+@pytest.fixture
+def query_plans(session, captured_selects):
+    """Función que ejecuta una acción y devuelve el plan de cada SELECT que emitió"""
+    def plans_of(action):
+        statements = captured_selects(action)
+        with session.get_bind().connect() as conn:
+            return [
+                ' | '.join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+                for statement, parameters in statements
+            ]
+
+    return plans_of
+
+
+def test_payments_sum_uses_fecha_pago_index(session, query_plans):
+    plans = query_plans(lambda: PaymentController(session).get_payments_sum(*month_range()))
+    assert any('USING INDEX idx_pagos_' in plan for plan in plans), plans
+    assert not any('SCAN pagos' in plan for plan in plans), plans
+
+
+def test_payment_filters_use_estado_fecha_index(session, query_plans):
+    filters = {'estado': True, 'date_from': datetime.now() - timedelta(days=30), 'date_to': datetime.now()}
+    plans = query_plans(lambda: PaymentController(session).count_payments(filters))
+    assert any('idx_pagos_estado_fecha' in plan for plan in plans), plans
+
+
+def test_expired_memberships_use_miembro_estado_fecha_index(session, query_plans):
+    # Con estadísticas reales (casi todos los pagos activos) el índice por estado
+    # no filtra nada: el último pago por miembro sale del índice compuesto
+    session.add_all(
+        Pago(fecha_pago=datetime(2024, 1, 1) + timedelta(days=i), monto=100,
+             id_miembro=i % 50 + 1, id_metodo_pago=1, estado=True)
+        for i in range(500)
+    )
+    session.commit()
+    session.execute(text("ANALYZE"))
+    plans = query_plans(lambda: MemberController(session).get_expired_memberships_count())
+    assert any('COVERING INDEX idx_pagos_miembro_estado_fecha' in plan for plan in plans), plans
+
+
+def test_member_filters_use_estado_tipo_index(session, query_plans):
+    filters = {'status': True, 'membership_type': 'Mensual'}
+    plans = query_plans(lambda: MemberController(session).count_members(filters))
+    assert any('idx_miembros_estado_tipo' in plan for plan in plans), plans
+
+
+def test_new_members_count_uses_fecha_registro_index(session, query_plans):
+    plans = query_plans(lambda: MemberController(session).get_new_members_count(*month_range()))
+    assert any('idx_miembros_fecha_registro' in plan for plan in plans), plans
+
+
+@pytest.fixture
+def receipt_controller(session, monkeypatch):
+    """PaymentReceiptController sobre la sesión de prueba en lugar de la sesión global"""
+    monkeypatch.setattr(payment_receipt_controller, 'session_scope', contextmanager(lambda: (yield session)))
+    return payment_receipt_controller.PaymentReceiptController()
+
+
+def test_receipt_filters_use_fecha_emision_index(receipt_controller, query_plans):
+    filters = {'fecha_desde': datetime.now() - timedelta(days=30), 'fecha_hasta': datetime.now(), 'limit': 20}
+    plans = query_plans(lambda: receipt_controller.count_receipts(filters))
+    plans += query_plans(lambda: receipt_controller.get_receipts(filters))
+    assert all('SEARCH comprobantes_pago USING' in plan and 'idx_comprobantes_fecha_emision' in plan
+               for plan in plans), plans
+
+
+def test_receipt_list_is_ordered_by_fecha_emision_index(receipt_controller, query_plans):
+    plans = query_plans(lambda: receipt_controller.get_receipts({'limit': 20}))
+    assert any('idx_comprobantes_fecha_emision' in plan for plan in plans), plans
+    assert not any('TEMP B-TREE FOR ORDER BY' in plan for plan in plans), plans
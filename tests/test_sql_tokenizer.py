@@ -0,0 +1,98 @@
+"""
+El tokenizador SQL es lo único entre un archivo de backup y cursor.execute:
+debe cortar solo en los ';' reales aunque estén en valores, comentarios o en
+el límite entre dos bloques leídos.
+"""
+import io
+
+import pytest
+
+from gym_manager.utils.sql_tokenizer import (
+    count_insert_rows, iter_sql_statements, statement_table, wrap_insert_values
+)
+
+
+def split(sql, chunk_size=1024):
+    return list(iter_sql_statements(io.StringIO(sql), chunk_size=chunk_size))
+
+
+def test_semicolons_inside_quotes_do_not_split():
+    sql = ("INSERT INTO `t` (`a`) VALUES ('a;b');\n"
+           'INSERT INTO `t` (`a`) VALUES ("c;d");\n'
+           "CREATE TABLE `x;y` (`id` int);\n")
+    assert split(sql) == [
+        "INSERT INTO `t` (`a`) VALUES ('a;b');",
+        'INSERT INTO `t` (`a`) VALUES ("c;d");',
+        "CREATE TABLE `x;y` (`id` int);",
+    ]
+
+
+def test_comments_are_skipped_and_do_not_split():
+    sql = ("-- Backup; encabezado\n"
+           "# otro; comentario\n"
+           "/* bloque; con ; varios */\n"
+           "SET FOREIGN_KEY_CHECKS=0;\n"
+           "SELECT 1 /* en medio; */ + 1;\n")
+    assert split(sql) == [
+        "SET FOREIGN_KEY_CHECKS=0;",
+        "SELECT 1 /* en medio; */ + 1;",
+    ]
+
+
+def test_backslash_and_doubled_quote_escapes():
+    sql = ("INSERT INTO `t` (`a`) VALUES ('it\\'s; ok');\n"
+           "INSERT INTO `t` (`a`) VALUES ('it''s; ok');\n"
+           "INSERT INTO `t` (`a`) VALUES ('barra\\\\');\n"
+           "SELECT 2;\n")
+    assert split(sql) == [
+        "INSERT INTO `t` (`a`) VALUES ('it\\'s; ok');",
+        "INSERT INTO `t` (`a`) VALUES ('it''s; ok');",
+        "INSERT INTO `t` (`a`) VALUES ('barra\\\\');",
+        "SELECT 2;",
+    ]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 16])
+def test_statements_split_across_chunks(chunk_size):
+    sql = ("-- encabezado\n"
+           "INSERT INTO `t` (`a`, `b`) VALUES ('x;''y', 'z\\'w'), (NULL, '--no');\n"
+           "/* c */ DELETE FROM `t`;\n"
+           "SELECT 'ultima'")
+    assert split(sql, chunk_size) == split(sql, 1024) == [
+        "INSERT INTO `t` (`a`, `b`) VALUES ('x;''y', 'z\\'w'), (NULL, '--no');",
+        "DELETE FROM `t`;",
+        "SELECT 'ultima'",
+    ]
+
+
+@pytest.mark.parametrize('stmt, table', [
+    ("CREATE TABLE `miembros` (`id` int)", 'miembros'),
+    ("CREATE TABLE IF NOT EXISTS `pagos` (`id` int)", 'pagos'),
+    ("create table if not exists rutinas (id int)", 'rutinas'),
+    ("DELETE FROM `pagos` WHERE `id_pago` > 10", 'pagos'),
+    ("INSERT INTO `comprobantes_pago` (`id`) VALUES (1)", 'comprobantes_pago'),
+    ("SET FOREIGN_KEY_CHECKS=0", None),
+])
+def test_statement_table(stmt, table):
+    assert statement_table(stmt) == table
+
+
+def test_wrap_insert_values_only_blob_columns():
+    stmt = ("INSERT INTO `rutinas` (`id`, `nombre`, `documento`) VALUES "
+            "(1, 'a, (b)', 'QUJD'), (2, 'it''s', NULL), (3, 'x\\'y', 'REVG');")
+    assert wrap_insert_values(stmt, {'documento'}, 'FROM_BASE64') == (
+        "INSERT INTO `rutinas` (`id`, `nombre`, `documento`) VALUES "
+        "(1, 'a, (b)', FROM_BASE64('QUJD')), (2, 'it''s', NULL), (3, 'x\\'y', FROM_BASE64('REVG'));"
+    )
+
+
+def test_wrap_insert_values_leaves_other_statements():
+    stmt = "INSERT INTO `t` (`a`) VALUES ('x');"
+    assert wrap_insert_values(stmt, {'b'}, 'FROM_BASE64') == stmt
+    assert wrap_insert_values("DELETE FROM `t`;", {'a'}, 'FROM_BASE64') == "DELETE FROM `t`;"
+
+
+def test_count_insert_rows():
+    assert count_insert_rows("INSERT INTO `t` (`a`, `b`) VALUES (1, '(x)'), (2, 'y),('), (3, NULL);") == 3
+    assert count_insert_rows("INSERT INTO `t` (`a`) VALUES ('it''s');") == 1
+    assert count_insert_rows("DELETE FROM `t`;") == 0
@@ -0,0 +1,78 @@
+"""
+UnitOfWork solo renueva la sesión en expire(); las vistas descartan en
+refresh() los objetos que quedaron desasociados y vuelven a consultarlos.
+"""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+from gym_manager.models import Base
+from gym_manager.models.member import Miembro
+from gym_manager.utils.database import UnitOfWork
+from gym_manager.views.module_views import ModuleView
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        session.add(Miembro(nombre='Ana', apellido='Pérez', documento='1', fecha_nacimiento=date(1990, 1, 1),
+                            genero='F', correo_electronico='ana@example.com', tipo_membresia='Mensual',
+                            fecha_registro=datetime(2024, 1, 1)))
+        session.commit()
+    yield factory
+    engine.dispose()
+
+
+class MemberDetailView(ModuleView):
+    """Vista mínima que conserva el miembro seleccionado y lo recarga al refrescar"""
+
+    def __init__(self, uow: UnitOfWork):
+        self.db_session = uow
+        self.selected_member = None
+        self.members = []
+        super().__init__(None, "Miembro")
+
+    def refresh(self):
+        super().refresh()
+        self.members = self.db_session.query(Miembro).all()
+
+
+def test_session_access_does_not_renew(session_factory):
+    uow = UnitOfWork(max_age=0, idle_expiry=0, session_factory=session_factory)
+    member = uow.query(Miembro).one()
+    session = uow.session
+
+    # Vida máxima superada: acceder a la sesión no la cierra, solo expira la lectura
+    assert uow.session is session
+    assert member.nombre == 'Ana'
+    assert not inspect(member).detached
+
+
+def test_expire_renews_when_too_old(session_factory):
+    uow = UnitOfWork(session_factory=session_factory)
+    member = uow.query(Miembro).one()
+    assert uow.expire() is False
+    assert not inspect(member).detached
+
+    uow.max_age = 0
+    assert uow.expire() is True
+    assert inspect(member).detached
+    assert uow.query(Miembro).one() is not member
+
+
+def test_refresh_drops_detached_instances(session_factory):
+    uow = UnitOfWork(max_age=0, session_factory=session_factory)
+    view = MemberDetailView(uow)
+    view.members = uow.query(Miembro).all()
+    view.selected_member = view.members[0]
+
+    view.refresh()
+
+    assert view.selected_member is None
+    assert [m.nombre for m in view.members] == ['Ana']
+    assert not inspect(view.members[0]).detached